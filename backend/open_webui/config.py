@@ -1984,6 +1984,42 @@ Ensure that the tools are effectively utilized to achieve the highest-quality an
 
 VECTOR_DB = os.environ.get("VECTOR_DB", "chroma")
 
+# Store file chunks once in a shared collection instead of one collection per
+# file plus a copy in every knowledge base
+ENABLE_CONSOLIDATED_VECTOR_COLLECTION = (
+    os.environ.get("ENABLE_CONSOLIDATED_VECTOR_COLLECTION", "false").lower() == "true"
+)
+CONSOLIDATED_VECTOR_COLLECTION_NAME = os.environ.get(
+    "CONSOLIDATED_VECTOR_COLLECTION_NAME", "consolidated-files"
+)
+
+# Native async clients serve vector DB reads on request paths where the
+# backend supports them, other calls run in a dedicated thread pool
+ENABLE_ASYNC_VECTOR_DB_CLIENT = (
+    os.environ.get("ENABLE_ASYNC_VECTOR_DB_CLIENT", "true").lower() == "true"
+)
+VECTOR_DB_THREAD_POOL_SIZE = int(os.environ.get("VECTOR_DB_THREAD_POOL_SIZE", "16"))
+
+# Reduced-precision vector storage: "" (full float32), "float16", "int8" or
+# "binary". Only used by backends that support the chosen setting.
+VECTOR_DB_QUANTIZATION = os.environ.get("VECTOR_DB_QUANTIZATION", "").lower()
+# Re-rank the nearest quantized candidates with full-precision vectors
+VECTOR_DB_QUANTIZATION_RESCORE = (
+    os.environ.get("VECTOR_DB_QUANTIZATION_RESCORE", "true").lower() == "true"
+)
+# Candidates fetched per requested result before rescoring
+VECTOR_DB_QUANTIZATION_OVERSAMPLING = os.environ.get(
+    "VECTOR_DB_QUANTIZATION_OVERSAMPLING", "2.0"
+)
+
+try:
+    VECTOR_DB_QUANTIZATION_OVERSAMPLING = float(VECTOR_DB_QUANTIZATION_OVERSAMPLING)
+except ValueError:
+    log.warning(
+        f"VECTOR_DB_QUANTIZATION_OVERSAMPLING is not a valid number: {VECTOR_DB_QUANTIZATION_OVERSAMPLING}. Defaulting to 2.0."
+    )
+    VECTOR_DB_QUANTIZATION_OVERSAMPLING = 2.0
+
 # Chroma
 CHROMA_DATA_PATH = f"{DATA_DIR}/vector_db"
 
@@ -2120,6 +2156,101 @@ else:
     except Exception:
         PGVECTOR_POOL_RECYCLE = 3600
 
+# Approximate nearest neighbour index: "ivfflat" or "hnsw"
+PGVECTOR_INDEX_METHOD = os.environ.get("PGVECTOR_INDEX_METHOD", "ivfflat").lower()
+PGVECTOR_HNSW_M = os.environ.get("PGVECTOR_HNSW_M", "16")
+
+try:
+    PGVECTOR_HNSW_M = int(PGVECTOR_HNSW_M)
+except ValueError:
+    log.warning(
+        f"PGVECTOR_HNSW_M is not a valid integer: {PGVECTOR_HNSW_M}. Defaulting to 16."
+    )
+    PGVECTOR_HNSW_M = 16
+
+PGVECTOR_HNSW_EF_CONSTRUCTION = os.environ.get("PGVECTOR_HNSW_EF_CONSTRUCTION", "64")
+
+try:
+    PGVECTOR_HNSW_EF_CONSTRUCTION = int(PGVECTOR_HNSW_EF_CONSTRUCTION)
+except ValueError:
+    log.warning(
+        f"PGVECTOR_HNSW_EF_CONSTRUCTION is not a valid integer: {PGVECTOR_HNSW_EF_CONSTRUCTION}. Defaulting to 64."
+    )
+    PGVECTOR_HNSW_EF_CONSTRUCTION = 64
+
+PGVECTOR_HNSW_EF_SEARCH = os.environ.get("PGVECTOR_HNSW_EF_SEARCH", "40")
+
+try:
+    PGVECTOR_HNSW_EF_SEARCH = int(PGVECTOR_HNSW_EF_SEARCH)
+except ValueError:
+    log.warning(
+        f"PGVECTOR_HNSW_EF_SEARCH is not a valid integer: {PGVECTOR_HNSW_EF_SEARCH}. Defaulting to 40."
+    )
+    PGVECTOR_HNSW_EF_SEARCH = 40
+
+# "relaxed_order" or "strict_order" (pgvector >= 0.8) keeps scanning the HNSW
+# index until enough rows pass the collection filter
+PGVECTOR_HNSW_ITERATIVE_SCAN = os.environ.get("PGVECTOR_HNSW_ITERATIVE_SCAN", "")
+
+PGVECTOR_IVFFLAT_LISTS = os.environ.get("PGVECTOR_IVFFLAT_LISTS", "100")
+
+try:
+    PGVECTOR_IVFFLAT_LISTS = int(PGVECTOR_IVFFLAT_LISTS)
+except ValueError:
+    log.warning(
+        f"PGVECTOR_IVFFLAT_LISTS is not a valid integer: {PGVECTOR_IVFFLAT_LISTS}. Defaulting to 100."
+    )
+    PGVECTOR_IVFFLAT_LISTS = 100
+
+PGVECTOR_IVFFLAT_PROBES = os.environ.get("PGVECTOR_IVFFLAT_PROBES", "1")
+
+try:
+    PGVECTOR_IVFFLAT_PROBES = int(PGVECTOR_IVFFLAT_PROBES)
+except ValueError:
+    log.warning(
+        f"PGVECTOR_IVFFLAT_PROBES is not a valid integer: {PGVECTOR_IVFFLAT_PROBES}. Defaulting to 1."
+    )
+    PGVECTOR_IVFFLAT_PROBES = 1
+
+# Collections with fewer chunks are searched exactly instead of through the
+# shared ANN index, which may return too few matches after filtering
+PGVECTOR_EXACT_SEARCH_THRESHOLD = os.environ.get(
+    "PGVECTOR_EXACT_SEARCH_THRESHOLD", "10000"
+)
+
+try:
+    PGVECTOR_EXACT_SEARCH_THRESHOLD = int(PGVECTOR_EXACT_SEARCH_THRESHOLD)
+except ValueError:
+    log.warning(
+        f"PGVECTOR_EXACT_SEARCH_THRESHOLD is not a valid integer: {PGVECTOR_EXACT_SEARCH_THRESHOLD}. Defaulting to 10000."
+    )
+    PGVECTOR_EXACT_SEARCH_THRESHOLD = 10000
+
+# Collections reaching this many chunks get their own partial ANN index
+# (0 disables)
+PGVECTOR_PARTIAL_INDEX_THRESHOLD = os.environ.get(
+    "PGVECTOR_PARTIAL_INDEX_THRESHOLD", "0"
+)
+
+try:
+    PGVECTOR_PARTIAL_INDEX_THRESHOLD = int(PGVECTOR_PARTIAL_INDEX_THRESHOLD)
+except ValueError:
+    log.warning(
+        f"PGVECTOR_PARTIAL_INDEX_THRESHOLD is not a valid integer: {PGVECTOR_PARTIAL_INDEX_THRESHOLD}. Defaulting to 0."
+    )
+    PGVECTOR_PARTIAL_INDEX_THRESHOLD = 0
+
+# Rows per statement when inserting, upserting or deleting chunks by id
+PGVECTOR_WRITE_BATCH_SIZE = os.environ.get("PGVECTOR_WRITE_BATCH_SIZE", "500")
+
+try:
+    PGVECTOR_WRITE_BATCH_SIZE = max(int(PGVECTOR_WRITE_BATCH_SIZE), 1)
+except ValueError:
+    log.warning(
+        f"PGVECTOR_WRITE_BATCH_SIZE is not a valid integer: {PGVECTOR_WRITE_BATCH_SIZE}. Defaulting to 500."
+    )
+    PGVECTOR_WRITE_BATCH_SIZE = 500
+
 # Pinecone
 PINECONE_API_KEY = os.environ.get("PINECONE_API_KEY", None)
 PINECONE_ENVIRONMENT = os.environ.get("PINECONE_ENVIRONMENT", None)
@@ -2427,6 +2558,18 @@ MISTRAL_OCR_API_KEY = PersistentConfig(
     os.getenv("MISTRAL_OCR_API_KEY", ""),
 )
 
+# Documents extracted by Tika, Docling, Datalab Marker, Document Intelligence,
+# Mistral OCR or the external loader are cached under CACHE_DIR/documents by
+# file content and extraction settings, so re-processing a file does not send
+# it again. The least recently used documents are evicted past the size limit.
+ENABLE_DOCUMENT_CACHE = (
+    os.environ.get("ENABLE_DOCUMENT_CACHE", "True").lower() == "true"
+)
+DOCUMENT_CACHE_DIR = os.environ.get("DOCUMENT_CACHE_DIR", f"{CACHE_DIR}/documents")
+DOCUMENT_CACHE_MAX_SIZE = int(
+    os.environ.get("DOCUMENT_CACHE_MAX_SIZE", str(1024 * 1024 * 1024))
+)
+
 BYPASS_EMBEDDING_AND_RETRIEVAL = PersistentConfig(
     "BYPASS_EMBEDDING_AND_RETRIEVAL",
     "rag.bypass_embedding_and_retrieval",
@@ -2528,6 +2671,16 @@ PDF_EXTRACT_IMAGES = PersistentConfig(
     os.environ.get("PDF_EXTRACT_IMAGES", "False").lower() == "true",
 )
 
+# PDFs loaded by the default engine are split into page ranges extracted by a
+# pool of up to PDF_LOADER_WORKERS processes, with at least
+# PDF_LOADER_MIN_PAGES_PER_WORKER pages per process.
+PDF_LOADER_WORKERS = int(
+    os.environ.get("PDF_LOADER_WORKERS", str(min(os.cpu_count() or 1, 8)))
+)
+PDF_LOADER_MIN_PAGES_PER_WORKER = int(
+    os.environ.get("PDF_LOADER_MIN_PAGES_PER_WORKER", "32")
+)
+
 RAG_EMBEDDING_MODEL = PersistentConfig(
     "RAG_EMBEDDING_MODEL",
     "rag.embedding_model",
@@ -2561,6 +2714,34 @@ RAG_EMBEDDING_PREFIX_FIELD_NAME = os.environ.get(
     "RAG_EMBEDDING_PREFIX_FIELD_NAME", None
 )
 
+# Maximum tokens of full context documents added to a prompt, 0 for no limit.
+# Models can override it with the "full_context_token_budget" param.
+RAG_FULL_CONTEXT_TOKEN_BUDGET = int(
+    os.environ.get("RAG_FULL_CONTEXT_TOKEN_BUDGET", "0")
+)
+
+# Attached items (files, knowledge bases, URLs, ...) resolved concurrently per message
+RAG_ITEM_CONCURRENCY = int(os.environ.get("RAG_ITEM_CONCURRENCY", "8"))
+
+# Cache of retrieval results, invalidated when a searched collection changes.
+# Stored in Redis when REDIS_URL is set, otherwise in each worker process, and
+# disabled with multiple UVICORN_WORKERS. Deployments with multiple replicas
+# must set REDIS_URL or disable the cache: a replica only sees the writes made
+# through other replicas once its cached results expire after the TTL.
+ENABLE_RAG_RETRIEVAL_CACHE = (
+    os.environ.get("ENABLE_RAG_RETRIEVAL_CACHE", "True").lower() == "true"
+)
+RAG_RETRIEVAL_CACHE_SIZE = int(os.environ.get("RAG_RETRIEVAL_CACHE_SIZE", "1000"))
+RAG_RETRIEVAL_CACHE_TTL = int(os.environ.get("RAG_RETRIEVAL_CACHE_TTL", "3600"))
+
+# Users with up to MEMORY_INDEX_MAX_MEMORIES memories (0 to disable) have them
+# searched in a per-user index of their embeddings instead of the vector DB.
+# The index holds MEMORY_INDEX_CACHE_SIZE users in each worker process, or is
+# stored in Redis when REDIS_URL is set, for MEMORY_INDEX_TTL seconds.
+MEMORY_INDEX_MAX_MEMORIES = int(os.environ.get("MEMORY_INDEX_MAX_MEMORIES", "1000"))
+MEMORY_INDEX_CACHE_SIZE = int(os.environ.get("MEMORY_INDEX_CACHE_SIZE", "1000"))
+MEMORY_INDEX_TTL = int(os.environ.get("MEMORY_INDEX_TTL", "86400"))
+
 RAG_RERANKING_ENGINE = PersistentConfig(
     "RAG_RERANKING_ENGINE",
     "rag.reranking_engine",
@@ -2585,6 +2766,14 @@ RAG_RERANKING_MODEL_TRUST_REMOTE_CODE = (
     os.environ.get("RAG_RERANKING_MODEL_TRUST_REMOTE_CODE", "True").lower() == "true"
 )
 
+# Document token embeddings kept in memory by the ColBERT reranker. They are
+# also stored on disk under CACHE_DIR/colbert when
+# ENABLE_RAG_COLBERT_DISK_CACHE is set, and survive restarts.
+RAG_COLBERT_CACHE_SIZE = int(os.environ.get("RAG_COLBERT_CACHE_SIZE", "10000"))
+ENABLE_RAG_COLBERT_DISK_CACHE = (
+    os.environ.get("ENABLE_RAG_COLBERT_DISK_CACHE", "False").lower() == "true"
+)
+
 RAG_EXTERNAL_RERANKER_URL = PersistentConfig(
     "RAG_EXTERNAL_RERANKER_URL",
     "rag.external_reranker_url",
@@ -2597,6 +2786,21 @@ RAG_EXTERNAL_RERANKER_API_KEY = PersistentConfig(
     os.environ.get("RAG_EXTERNAL_RERANKER_API_KEY", ""),
 )
 
+# Documents per request to the external reranker, and requests sent at once
+RAG_EXTERNAL_RERANKER_BATCH_SIZE = int(
+    os.environ.get("RAG_EXTERNAL_RERANKER_BATCH_SIZE", "64")
+)
+RAG_EXTERNAL_RERANKER_CONCURRENCY = int(
+    os.environ.get("RAG_EXTERNAL_RERANKER_CONCURRENCY", "4")
+)
+RAG_EXTERNAL_RERANKER_TIMEOUT = float(
+    os.environ.get("RAG_EXTERNAL_RERANKER_TIMEOUT", "30")
+)
+# (query, document) scores kept in memory, 0 to disable the cache
+RAG_EXTERNAL_RERANKER_CACHE_SIZE = int(
+    os.environ.get("RAG_EXTERNAL_RERANKER_CACHE_SIZE", "10000")
+)
+
 
 RAG_TEXT_SPLITTER = PersistentConfig(
     "RAG_TEXT_SPLITTER",
@@ -2790,12 +2994,37 @@ ENABLE_WEB_LOADER_SSL_VERIFICATION = PersistentConfig(
     os.environ.get("ENABLE_WEB_LOADER_SSL_VERIFICATION", "True").lower() == "true",
 )
 
+# Concurrent requests to a single host, across all web searches
+WEB_LOADER_CONCURRENT_REQUESTS_PER_HOST = int(
+    os.environ.get("WEB_LOADER_CONCURRENT_REQUESTS_PER_HOST", "2")
+)
+# Seconds to load the pages of a web search; slower pages are dropped. 0 to wait for all.
+WEB_LOADER_TIMEOUT = float(os.environ.get("WEB_LOADER_TIMEOUT", "10"))
+# Return as soon as this many pages of a web search are loaded, 0 to load all
+WEB_LOADER_MAX_PAGES = int(os.environ.get("WEB_LOADER_MAX_PAGES", "0"))
+# Bytes of HTML read per page; text past it is not extracted. 0 for no limit.
+WEB_LOADER_MAX_PAGE_BYTES = int(
+    os.environ.get("WEB_LOADER_MAX_PAGE_BYTES", str(2 * 1024 * 1024))
+)
+
 WEB_SEARCH_TRUST_ENV = PersistentConfig(
     "WEB_SEARCH_TRUST_ENV",
     "rag.web.search.trust_env",
     os.getenv("WEB_SEARCH_TRUST_ENV", "False").lower() == "true",
 )
 
+# Cache of search results and loaded pages. Repeated searches within
+# WEB_SEARCH_CACHE_TTL also reuse the web-search-* collection of the first one.
+ENABLE_WEB_SEARCH_CACHE = (
+    os.environ.get("ENABLE_WEB_SEARCH_CACHE", "True").lower() == "true"
+)
+WEB_SEARCH_CACHE_TTL = int(os.environ.get("WEB_SEARCH_CACHE_TTL", "3600"))
+WEB_SEARCH_CACHE_SIZE = int(os.environ.get("WEB_SEARCH_CACHE_SIZE", "1000"))
+
+# How long loaded pages are kept to be revalidated with ETag/Last-Modified, and
+# web-search-* collections are kept for follow-up messages, before being dropped
+WEB_SEARCH_CACHE_MAX_AGE = int(os.environ.get("WEB_SEARCH_CACHE_MAX_AGE", "86400"))
+
 
 OLLAMA_CLOUD_WEB_SEARCH_API_KEY = PersistentConfig(
     "OLLAMA_CLOUD_WEB_SEARCH_API_KEY",
@@ -568,6 +568,118 @@ else:
     except Exception:
         CHAT_RESPONSE_MAX_TOOL_CALL_RETRIES = 30
 
+# Tool calls of a response that are executed at the same time, 1 to execute
+# them one by one
+CHAT_RESPONSE_MAX_CONCURRENT_TOOL_CALLS = os.environ.get(
+    "CHAT_RESPONSE_MAX_CONCURRENT_TOOL_CALLS", "5"
+)
+
+if CHAT_RESPONSE_MAX_CONCURRENT_TOOL_CALLS == "":
+    CHAT_RESPONSE_MAX_CONCURRENT_TOOL_CALLS = 5
+else:
+    try:
+        CHAT_RESPONSE_MAX_CONCURRENT_TOOL_CALLS = max(
+            int(CHAT_RESPONSE_MAX_CONCURRENT_TOOL_CALLS), 1
+        )
+    except Exception:
+        CHAT_RESPONSE_MAX_CONCURRENT_TOOL_CALLS = 5
+
+# Seconds a tool call may take before it fails, unless the tool sets its own
+# `timeout`. No timeout when empty
+CHAT_RESPONSE_TOOL_CALL_TIMEOUT = os.environ.get("CHAT_RESPONSE_TOOL_CALL_TIMEOUT", "")
+
+if CHAT_RESPONSE_TOOL_CALL_TIMEOUT == "":
+    CHAT_RESPONSE_TOOL_CALL_TIMEOUT = None
+else:
+    try:
+        CHAT_RESPONSE_TOOL_CALL_TIMEOUT = int(CHAT_RESPONSE_TOOL_CALL_TIMEOUT)
+    except Exception:
+        CHAT_RESPONSE_TOOL_CALL_TIMEOUT = None
+
+
+####################################
+# FILES
+####################################
+
+# Reuse the stored blob, extracted content and vectors of identical uploads
+ENABLE_FILE_DEDUPLICATION = (
+    os.environ.get("ENABLE_FILE_DEDUPLICATION", "True").lower() == "true"
+)
+
+####################################
+# FILE PROCESSING QUEUE
+####################################
+
+# local | redis
+FILE_PROCESSING_QUEUE = os.environ.get("FILE_PROCESSING_QUEUE", "local").lower()
+if FILE_PROCESSING_QUEUE == "redis" and not REDIS_URL:
+    log.warning("FILE_PROCESSING_QUEUE is 'redis' but REDIS_URL is not set")
+    FILE_PROCESSING_QUEUE = "local"
+
+FILE_PROCESSING_QUEUE_WORKERS = os.environ.get("FILE_PROCESSING_QUEUE_WORKERS", "2")
+try:
+    FILE_PROCESSING_QUEUE_WORKERS = int(FILE_PROCESSING_QUEUE_WORKERS)
+    if FILE_PROCESSING_QUEUE_WORKERS < 1:
+        FILE_PROCESSING_QUEUE_WORKERS = 2
+except ValueError:
+    FILE_PROCESSING_QUEUE_WORKERS = 2
+
+FILE_PROCESSING_QUEUE_MAX_RETRIES = os.environ.get(
+    "FILE_PROCESSING_QUEUE_MAX_RETRIES", "2"
+)
+try:
+    FILE_PROCESSING_QUEUE_MAX_RETRIES = max(int(FILE_PROCESSING_QUEUE_MAX_RETRIES), 0)
+except ValueError:
+    FILE_PROCESSING_QUEUE_MAX_RETRIES = 2
+
+FILE_PROCESSING_QUEUE_JOB_TIMEOUT = os.environ.get(
+    "FILE_PROCESSING_QUEUE_JOB_TIMEOUT", "3600"
+)
+try:
+    FILE_PROCESSING_QUEUE_JOB_TIMEOUT = int(FILE_PROCESSING_QUEUE_JOB_TIMEOUT)
+except ValueError:
+    FILE_PROCESSING_QUEUE_JOB_TIMEOUT = 3600
+
+
+####################################
+# CODE INTERPRETER JUPYTER KERNEL POOL
+####################################
+
+# Kernels started ahead of time on each Jupyter server, 0 to start a kernel
+# for every execution
+JUPYTER_KERNEL_POOL_SIZE = os.environ.get("JUPYTER_KERNEL_POOL_SIZE", "2")
+try:
+    JUPYTER_KERNEL_POOL_SIZE = max(int(JUPYTER_KERNEL_POOL_SIZE), 0)
+except ValueError:
+    JUPYTER_KERNEL_POOL_SIZE = 2
+
+# Kernels kept on each Jupyter server, started ahead of time or used by chats
+JUPYTER_KERNEL_POOL_MAX_KERNELS = os.environ.get(
+    "JUPYTER_KERNEL_POOL_MAX_KERNELS", "16"
+)
+try:
+    JUPYTER_KERNEL_POOL_MAX_KERNELS = max(int(JUPYTER_KERNEL_POOL_MAX_KERNELS), 1)
+except ValueError:
+    JUPYTER_KERNEL_POOL_MAX_KERNELS = 16
+
+# Seconds after which the kernel of an inactive chat is shut down
+JUPYTER_KERNEL_POOL_IDLE_TIMEOUT = os.environ.get(
+    "JUPYTER_KERNEL_POOL_IDLE_TIMEOUT", "600"
+)
+try:
+    JUPYTER_KERNEL_POOL_IDLE_TIMEOUT = int(JUPYTER_KERNEL_POOL_IDLE_TIMEOUT)
+except ValueError:
+    JUPYTER_KERNEL_POOL_IDLE_TIMEOUT = 600
+
+# Executions after which a kernel is replaced by a new one
+JUPYTER_KERNEL_POOL_MAX_EXECUTIONS = os.environ.get(
+    "JUPYTER_KERNEL_POOL_MAX_EXECUTIONS", "100"
+)
+try:
+    JUPYTER_KERNEL_POOL_MAX_EXECUTIONS = max(int(JUPYTER_KERNEL_POOL_MAX_EXECUTIONS), 1)
+except ValueError:
+    JUPYTER_KERNEL_POOL_MAX_EXECUTIONS = 100
+
 
 ####################################
 # WEBSOCKET SUPPORT
@@ -644,6 +756,25 @@ AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL = (
     os.environ.get("AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL", "True").lower() == "true"
 )
 
+# MCP server sessions are kept open and reused by chats until they have been
+# idle for this many seconds, 0 to open a session for every chat
+MCP_SESSION_IDLE_TIMEOUT = os.environ.get("MCP_SESSION_IDLE_TIMEOUT", "300")
+
+try:
+    MCP_SESSION_IDLE_TIMEOUT = int(MCP_SESSION_IDLE_TIMEOUT)
+except Exception:
+    MCP_SESSION_IDLE_TIMEOUT = 300
+
+# Sessions idle for this many seconds are pinged before they are reused
+MCP_SESSION_HEALTH_CHECK_INTERVAL = os.environ.get(
+    "MCP_SESSION_HEALTH_CHECK_INTERVAL", "30"
+)
+
+try:
+    MCP_SESSION_HEALTH_CHECK_INTERVAL = int(MCP_SESSION_HEALTH_CHECK_INTERVAL)
+except Exception:
+    MCP_SESSION_HEALTH_CHECK_INTERVAL = 30
+
 
 ####################################
 # SENTENCE TRANSFORMERS
@@ -66,6 +66,7 @@ from open_webui.socket.main import (
     get_event_emitter,
     get_models_in_use,
     get_active_user_ids,
+    FILE_STATUS_BROADCASTER,
 )
 from open_webui.routers import (
     audio,
@@ -451,6 +452,10 @@ from open_webui.env import (
     EXTERNAL_PWA_MANIFEST_URL,
     AIOHTTP_CLIENT_SESSION_SSL,
     ENABLE_STAR_SESSIONS_MIDDLEWARE,
+    FILE_PROCESSING_QUEUE,
+    FILE_PROCESSING_QUEUE_WORKERS,
+    FILE_PROCESSING_QUEUE_MAX_RETRIES,
+    FILE_PROCESSING_QUEUE_JOB_TIMEOUT,
 )
 
 
@@ -467,6 +472,8 @@ from open_webui.utils.chat import (
 )
 from open_webui.utils.embeddings import generate_embeddings
 from open_webui.utils.middleware import process_chat_payload, process_chat_response
+from open_webui.utils.mcp.pool import MCP_SESSION_POOL
+from open_webui.utils.code_interpreter import close_jupyter_kernel_pools
 from open_webui.utils.access_control import has_access
 
 from open_webui.utils.auth import (
@@ -485,6 +492,10 @@ from open_webui.utils.oauth import (
 )
 from open_webui.utils.security_headers import SecurityHeadersMiddleware
 from open_webui.utils.redis import get_redis_connection
+from open_webui.utils.job_queue import get_job_queue
+from open_webui.retrieval.vector.factory import ASYNC_VECTOR_DB_CLIENT
+from open_webui.retrieval.web.cache import periodic_web_search_collection_cleanup
+from open_webui.retrieval.web.crawl import close_crawl_sessions
 
 from open_webui.tasks import (
     redis_task_command_listener,
@@ -575,7 +586,34 @@ async def lifespan(app: FastAPI):
         limiter = anyio.to_thread.current_default_thread_limiter()
         limiter.total_tokens = THREAD_POOL_SIZE
 
+    await FILE_STATUS_BROADCASTER.start()
+
+    app.state.file_processing_queue = get_job_queue(
+        FILE_PROCESSING_QUEUE,
+        "files",
+        redis_url=REDIS_URL,
+        redis_sentinels=get_sentinels_from_env(
+            REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+        ),
+        redis_cluster=REDIS_CLUSTER,
+        workers=FILE_PROCESSING_QUEUE_WORKERS,
+        max_retries=FILE_PROCESSING_QUEUE_MAX_RETRIES,
+        job_timeout=FILE_PROCESSING_QUEUE_JOB_TIMEOUT,
+    )
+    app.state.file_processing_queue.register(
+        "process_file",
+        files.process_file_job,
+        on_failure=files.process_file_job_failed,
+    )
+    app.state.file_processing_queue.register(
+        "consolidate_vector_db",
+        retrieval.consolidate_vector_db_job,
+        on_failure=retrieval.consolidate_vector_db_job_failed,
+    )
+    await app.state.file_processing_queue.start(app)
+
     asyncio.create_task(periodic_usage_pool_cleanup())
+    asyncio.create_task(periodic_web_search_collection_cleanup(ASYNC_VECTOR_DB_CLIENT))
 
     if app.state.config.ENABLE_BASE_MODELS_CACHE:
         await get_all_models(
@@ -603,6 +641,14 @@ async def lifespan(app: FastAPI):
     if hasattr(app.state, "redis_task_command_listener"):
         app.state.redis_task_command_listener.cancel()
 
+    if app.state.file_processing_queue:
+        await app.state.file_processing_queue.stop()
+
+    await FILE_STATUS_BROADCASTER.stop()
+    await close_crawl_sessions()
+    await MCP_SESSION_POOL.close()
+    await close_jupyter_kernel_pools()
+
 
 app = FastAPI(
     title="Open WebUI",
@@ -628,6 +674,7 @@ app.state.config = AppConfig(
     redis_key_prefix=REDIS_KEY_PREFIX,
 )
 app.state.redis = None
+app.state.file_processing_queue = None
 
 app.state.WEBUI_NAME = WEBUI_NAME
 app.state.LICENSE_METADATA = None
@@ -791,9 +838,14 @@ app.state.USER_COUNT = None
 
 app.state.TOOLS = {}
 app.state.TOOL_CONTENTS = {}
+app.state.TOOL_VERSIONS = {}
+app.state.TOOL_SPECS = {}
+app.state.TOOL_SPEC_VERSIONS = {}
 
 app.state.FUNCTIONS = {}
 app.state.FUNCTION_CONTENTS = {}
+app.state.FUNCTION_VERSIONS = {}
+app.state.FILTER_PIPELINES = {}
 
 ########################################
 #
@@ -1582,9 +1634,9 @@ async def chat_completion(
                     pass
         finally:
             try:
-                if mcp_clients := metadata.get("mcp_clients"):
-                    for client in mcp_clients.values():
-                        await client.disconnect()
+                if mcp_sessions := metadata.get("mcp_sessions"):
+                    for session in mcp_sessions.values():
+                        await MCP_SESSION_POOL.release(session)
             except Exception as e:
                 log.debug(f"Error cleaning up: {e}")
                 pass
@@ -0,0 +1,29 @@
+"""Add blob_hash column to file
+
+Revision ID: 4b1c2d3e5f60
+Revises: a5c220713937
+Create Date: 2025-10-06 10:12:44.519831
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "4b1c2d3e5f60"
+down_revision: Union[str, None] = "a5c220713937"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # sha256 of the uploaded bytes, used to deduplicate identical uploads
+    op.add_column("file", sa.Column("blob_hash", sa.Text(), nullable=True))
+    op.create_index("file_blob_hash_idx", "file", ["blob_hash"])
+
+
+def downgrade() -> None:
+    op.drop_index("file_blob_hash_idx", table_name="file")
+    op.drop_column("file", "blob_hash")
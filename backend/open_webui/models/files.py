@@ -5,7 +5,7 @@ from typing import Optional
 from open_webui.internal.db import Base, JSONField, get_db
 from open_webui.env import SRC_LOG_LEVELS
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON
+from sqlalchemy import BigInteger, Column, Index, String, Text, JSON, func
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -20,6 +20,7 @@ class File(Base):
     id = Column(String, primary_key=True)
     user_id = Column(String)
     hash = Column(Text, nullable=True)
+    blob_hash = Column(Text, nullable=True)
 
     filename = Column(Text)
     path = Column(Text, nullable=True)
@@ -32,6 +33,8 @@ class File(Base):
     created_at = Column(BigInteger)
     updated_at = Column(BigInteger)
 
+    __table_args__ = (Index("file_blob_hash_idx", "blob_hash"),)
+
 
 class FileModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -39,6 +42,7 @@ class FileModel(BaseModel):
     id: str
     user_id: str
     hash: Optional[str] = None
+    blob_hash: Optional[str] = None
 
     filename: str
     path: Optional[str] = None
@@ -87,9 +91,25 @@ class FileMetadataResponse(BaseModel):
     updated_at: int  # timestamp in epoch
 
 
+class FileContentResponse(BaseModel):
+    id: str
+    filename: str
+    content: Optional[str] = None
+
+
+class FileReferenceResponse(BaseModel):
+    id: str
+    user_id: str
+    path: Optional[str] = None
+    meta: Optional[dict] = None
+    status: Optional[str] = None
+    fingerprint: Optional[str] = None
+
+
 class FileForm(BaseModel):
     id: str
     hash: Optional[str] = None
+    blob_hash: Optional[str] = None
     filename: str
     path: str
     data: dict = {}
@@ -194,6 +214,79 @@ class FilesTable:
                 .all()
             ]
 
+    def get_file_contents_by_ids(self, ids: list[str]) -> list[FileContentResponse]:
+        """
+        Extracted text and filename of the given files, in the order of ids.
+        Only the content is read out of the data column.
+        """
+        with get_db() as db:
+            files = {
+                file.id: FileContentResponse(
+                    id=file.id, filename=file.filename, content=file.content
+                )
+                for file in db.query(
+                    File.id,
+                    File.filename,
+                    File.data["content"].as_string().label("content"),
+                )
+                .filter(File.id.in_(ids))
+                .all()
+            }
+            return [files[id] for id in ids if id in files]
+
+    def get_file_metadatas(
+        self, after_id: Optional[str] = None, limit: Optional[int] = None
+    ) -> list[FileMetadataResponse]:
+        """Metadata of all files, or of the next `limit` files by id after `after_id`."""
+        with get_db() as db:
+            query = db.query(File.id, File.meta, File.created_at, File.updated_at)
+            if after_id is not None:
+                query = query.filter(File.id > after_id)
+            if limit is not None:
+                query = query.order_by(File.id).limit(limit)
+
+            return [
+                FileMetadataResponse(
+                    id=file.id,
+                    meta=file.meta,
+                    created_at=file.created_at,
+                    updated_at=file.updated_at,
+                )
+                for file in query.all()
+            ]
+
+    def get_file_count(self) -> int:
+        with get_db() as db:
+            return db.query(func.count()).select_from(File).scalar()
+
+    def get_files_by_blob_hash(self, blob_hash: str) -> list[FileReferenceResponse]:
+        """
+        Files stored under the same blob, oldest first. Only the processing
+        status and fingerprint are read out of the data column.
+        """
+        with get_db() as db:
+            return [
+                FileReferenceResponse(
+                    id=file.id,
+                    user_id=file.user_id,
+                    path=file.path,
+                    meta=file.meta,
+                    status=file.status,
+                    fingerprint=file.fingerprint,
+                )
+                for file in db.query(
+                    File.id,
+                    File.user_id,
+                    File.path,
+                    File.meta,
+                    File.data["status"].as_string().label("status"),
+                    File.data["fingerprint"].as_string().label("fingerprint"),
+                )
+                .filter_by(blob_hash=blob_hash)
+                .order_by(File.created_at.asc())
+                .all()
+            ]
+
     def get_files_by_user_id(self, user_id: str) -> list[FileModel]:
         with get_db() as db:
             return [
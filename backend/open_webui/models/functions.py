@@ -7,6 +7,7 @@ from open_webui.models.users import Users, UserModel
 from open_webui.env import SRC_LOG_LEVELS
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Boolean, Column, String, Text, Index
+from sqlalchemy import func as sa_func
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -187,6 +188,14 @@ class FunctionsTable:
         except Exception:
             return None
 
+    def get_function_updated_at_by_id(self, id: str) -> Optional[int]:
+        """Return when the function was last updated, without loading it."""
+        try:
+            with get_db() as db:
+                return db.query(Function.updated_at).filter_by(id=id).scalar()
+        except Exception:
+            return None
+
     def get_functions(
         self, active_only=False, include_valves=False
     ) -> list[FunctionModel | FunctionWithValvesModel]:
@@ -246,6 +255,19 @@ class FunctionsTable:
                     for function in db.query(Function).filter_by(type=type).all()
                 ]
 
+    def get_functions_version_by_type(self, type: str) -> tuple[int, int]:
+        """
+        Return the number of functions of a type and when one was last
+        updated, which change whenever one is added, updated or deleted.
+        """
+        with get_db() as db:
+            count, updated_at = (
+                db.query(sa_func.count(Function.id), sa_func.max(Function.updated_at))
+                .filter_by(type=type)
+                .one()
+            )
+            return count, updated_at or 0
+
     def get_global_filter_functions(self) -> list[FunctionModel]:
         with get_db() as db:
             return [
@@ -182,6 +182,24 @@ class KnowledgeTable:
         except Exception:
             return None
 
+    def get_knowledge_updated_at_by_id(self, id: str) -> Optional[int]:
+        """Return when the knowledge base was last updated, without loading it."""
+        try:
+            with get_db() as db:
+                return db.query(Knowledge.updated_at).filter_by(id=id).scalar()
+        except Exception:
+            return None
+
+    def get_knowledge_ids_by_file_ids(self, file_ids: list[str]) -> list[str]:
+        """Return the ids of the knowledge bases that include any of the files."""
+        file_ids = set(file_ids)
+        with get_db() as db:
+            return [
+                knowledge.id
+                for knowledge in db.query(Knowledge.id, Knowledge.data).all()
+                if file_ids.intersection((knowledge.data or {}).get("file_ids", []))
+            ]
+
     def update_knowledge_by_id(
         self, id: str, form_data: KnowledgeForm, overwrite: bool = False
     ) -> Optional[KnowledgeModel]:
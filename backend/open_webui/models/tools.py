@@ -146,6 +146,14 @@ class ToolsTable:
         except Exception:
             return None
 
+    def get_tool_updated_at_by_id(self, id: str) -> Optional[int]:
+        """Return when the tool was last updated, without loading it."""
+        try:
+            with get_db() as db:
+                return db.query(Tool.updated_at).filter_by(id=id).scalar()
+        except Exception:
+            return None
+
     def get_tools(self) -> list[ToolUserModel]:
         with get_db() as db:
             all_tools = db.query(Tool).order_by(Tool.updated_at.desc()).all()
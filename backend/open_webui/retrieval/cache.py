@@ -0,0 +1,240 @@
+import copy
+import functools
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from open_webui.config import (
+    ENABLE_RAG_RETRIEVAL_CACHE,
+    RAG_RETRIEVAL_CACHE_SIZE,
+    RAG_RETRIEVAL_CACHE_TTL,
+)
+from open_webui.env import (
+    REDIS_CLUSTER,
+    REDIS_KEY_PREFIX,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    REDIS_URL,
+    SRC_LOG_LEVELS,
+    UVICORN_WORKERS,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+# Vector DB client methods that change the contents of a collection
+VERSIONED_METHODS = ("insert", "upsert", "delete", "delete_collection")
+
+# Version bumped by `reset`, which changes every collection at once
+RESET_VERSION = ""
+
+
+def to_json(value: Any):
+    # Reranker scores are numpy floats
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+class RetrievalCache:
+    """
+    In-process LRU cache of retrieval results.
+
+    Every collection has a version that is bumped whenever it is written to
+    through a tracked vector DB client. Results are cached under the versions
+    of the collections they were retrieved from, so a write makes the earlier
+    results of that collection unreachable and they age out of the cache.
+
+    Collections that are views over other collections, such as knowledge bases
+    in a consolidated vector DB, are invalidated along with the collections
+    they view when the client provides `get_dependent_collection_names`, and
+    must be invalidated when the view itself changes.
+    """
+
+    def __init__(self, size: int, ttl: int):
+        self.size = size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._versions: dict[str, int] = {}
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def track(self, client):
+        """Bump the version of a collection on every write made through `client`."""
+
+        def versioned(method):
+            @functools.wraps(method)
+            def wrapper(*args, **kwargs):
+                collection_name = kwargs.get(
+                    "collection_name", args[0] if args else None
+                )
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    # Bumped after the write, so a search that raced with it
+                    # can only store its result under the old version
+                    self.invalidate(collection_name)
+                    if hasattr(client, "get_dependent_collection_names"):
+                        try:
+                            for name in client.get_dependent_collection_names(
+                                collection_name
+                            ):
+                                self.invalidate(name)
+                        except Exception as e:
+                            log.error(
+                                f"Failed to invalidate retrieval cache of views of {collection_name}: {e}"
+                            )
+
+            return wrapper
+
+        for name in VERSIONED_METHODS:
+            setattr(client, name, versioned(getattr(client, name)))
+
+        reset = client.reset
+
+        @functools.wraps(reset)
+        def reset_wrapper():
+            try:
+                return reset()
+            finally:
+                self.invalidate(RESET_VERSION)
+
+        client.reset = reset_wrapper
+
+    def invalidate(self, collection_name: str):
+        """Make the cached results of a collection unreachable, logging failures."""
+        try:
+            self.bump_version(collection_name)
+        except Exception as e:
+            log.error(f"Failed to invalidate retrieval cache of {collection_name}: {e}")
+
+    def bump_version(self, collection_name: str):
+        with self._lock:
+            self._versions[collection_name] = self._versions.get(collection_name, 0) + 1
+
+    async def get_versions(self, collection_names: list[str]) -> list[int]:
+        return [self._versions.get(name, 0) for name in collection_names]
+
+    async def get_key(self, collection_names: list[str], **params) -> str:
+        """
+        Key of the results of searching `collection_names` with `params`, at
+        the current version of each collection.
+        """
+        collection_names = sorted(collection_names)
+        versions = await self.get_versions([RESET_VERSION, *collection_names])
+        return hashlib.sha256(
+            json.dumps(
+                {
+                    "versions": list(zip([RESET_VERSION, *collection_names], versions)),
+                    **params,
+                },
+                sort_keys=True,
+                default=to_json,
+            ).encode()
+        ).hexdigest()
+
+    async def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+
+        self._entries.move_to_end(key)
+        # Callers annotate the metadata of returned results
+        return copy.deepcopy(value)
+
+    async def set(self, key: str, value: dict):
+        self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+
+class RedisRetrievalCache(RetrievalCache):
+    """
+    Retrieval cache shared by all instances through Redis. Entries expire after
+    the TTL; the number of entries is bounded by Redis' own eviction policy.
+    """
+
+    def __init__(
+        self,
+        *args,
+        redis_url: str,
+        redis_sentinels: Optional[list] = [],
+        redis_cluster: bool = False,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self._key = f"{REDIS_KEY_PREFIX}:retrieval"
+        # All versions live in one hash so they can be read in one round trip,
+        # also in cluster mode
+        self._versions_key = f"{self._key}:versions"
+        # Sync client for the writes, which are made from sync code
+        self._sync_redis = get_redis_connection(
+            redis_url, redis_sentinels, redis_cluster, decode_responses=True
+        )
+        self._redis = get_redis_connection(
+            redis_url,
+            redis_sentinels,
+            redis_cluster,
+            async_mode=True,
+            decode_responses=True,
+        )
+
+    def bump_version(self, collection_name: str):
+        self._sync_redis.hincrby(self._versions_key, collection_name, 1)
+
+    async def get_versions(self, collection_names: list[str]) -> list[int]:
+        versions = await self._redis.hmget(self._versions_key, collection_names)
+        return [int(version or 0) for version in versions]
+
+    async def get(self, key: str) -> Optional[dict]:
+        value = await self._redis.get(f"{self._key}:results:{key}")
+        return json.loads(value) if value else None
+
+    async def set(self, key: str, value: dict):
+        await self._redis.set(
+            f"{self._key}:results:{key}",
+            json.dumps(value, default=to_json),
+            ex=self.ttl,
+        )
+
+
+def get_retrieval_cache() -> Optional[RetrievalCache]:
+    if not ENABLE_RAG_RETRIEVAL_CACHE:
+        return None
+
+    if REDIS_URL:
+        return RedisRetrievalCache(
+            RAG_RETRIEVAL_CACHE_SIZE,
+            RAG_RETRIEVAL_CACHE_TTL,
+            redis_url=REDIS_URL,
+            redis_sentinels=get_sentinels_from_env(
+                REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+            ),
+            redis_cluster=REDIS_CLUSTER,
+        )
+
+    if UVICORN_WORKERS > 1:
+        # A write handled by one worker could not invalidate the others
+        log.warning(
+            "ENABLE_RAG_RETRIEVAL_CACHE needs REDIS_URL with multiple UVICORN_WORKERS, disabling the retrieval cache"
+        )
+        return None
+
+    # Other replicas can't be detected: without Redis, their writes only reach
+    # this process once the results cached here expire
+
+    return RetrievalCache(RAG_RETRIEVAL_CACHE_SIZE, RAG_RETRIEVAL_CACHE_TTL)
+
+
+RETRIEVAL_CACHE = get_retrieval_cache()
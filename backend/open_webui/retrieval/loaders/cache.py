@@ -0,0 +1,188 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from langchain_core.documents import Document
+
+from open_webui.config import (
+    DOCUMENT_CACHE_DIR,
+    DOCUMENT_CACHE_MAX_SIZE,
+    ENABLE_DOCUMENT_CACHE,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+EVICTION_LOCK_FILENAME = ".evict.lock"
+# An eviction lock older than this was left behind by a crashed process
+EVICTION_LOCK_TIMEOUT = 600
+
+
+def calculate_file_sha256(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class DocumentCache:
+    """
+    On-disk cache of the documents extracted from files by remote loaders,
+    keyed by the file's content and the settings of the loader.
+
+    Documents are stored as JSON files under `directory`. Reading a document
+    marks it as recently used; once the cache grows past `max_size` bytes,
+    the least recently used documents are removed.
+
+    Each process keeps a running total of the cache size, from a scan of the
+    directory plus the documents it stored since. Only when that total passes
+    `max_size` is the directory scanned again and evicted from, by one
+    process at a time. Writes of other processes are picked up by the next
+    scan, so the cache can exceed `max_size` by what they stored meanwhile.
+    """
+
+    def __init__(self, directory: str, max_size: int):
+        self.directory = directory
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+
+    def get_key(self, file_path: str, **params) -> str:
+        return hashlib.sha256(
+            json.dumps(
+                {"file": calculate_file_sha256(file_path), **params},
+                sort_keys=True,
+                default=str,
+            ).encode()
+        ).hexdigest()
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[list[Document]]:
+        path = self._get_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                docs = json.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.warning(f"Failed to read cached document {path}: {e}")
+            return None
+
+        return [
+            Document(page_content=doc["page_content"], metadata=doc["metadata"])
+            for doc in docs
+        ]
+
+    def set(self, key: str, docs: list[Document]):
+        path = self._get_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                replaced_size = os.path.getsize(path)
+            except FileNotFoundError:
+                replaced_size = 0
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=os.path.dirname(path), delete=False
+            ) as f:
+                json.dump(
+                    [
+                        {"page_content": doc.page_content, "metadata": doc.metadata}
+                        for doc in docs
+                    ],
+                    f,
+                    default=str,
+                )
+            os.replace(f.name, path)
+            size = os.path.getsize(path)
+        except Exception as e:
+            log.warning(f"Failed to cache document {path}: {e}")
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = self.get_size()
+            else:
+                self._size += size - replaced_size
+            over_size = self._size > self.max_size
+
+        if over_size:
+            self.evict()
+
+    def _get_entries(self) -> list[tuple[float, int, str]]:
+        entries = []
+        for root, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if filename == EVICTION_LOCK_FILENAME:
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def get_size(self) -> int:
+        return sum(entry[1] for entry in self._get_entries())
+
+    def _acquire_eviction_lock(self, lock_path: str) -> bool:
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            pass
+
+        try:
+            if time.time() - os.path.getmtime(lock_path) < EVICTION_LOCK_TIMEOUT:
+                return False
+            os.remove(lock_path)
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except (FileNotFoundError, FileExistsError):
+            return False
+
+    def evict(self):
+        """Remove the least recently used documents past `max_size` bytes."""
+        lock_path = os.path.join(self.directory, EVICTION_LOCK_FILENAME)
+        if not self._acquire_eviction_lock(lock_path):
+            # Another process is evicting
+            return
+
+        try:
+            entries = self._get_entries()
+            size = sum(entry[1] for entry in entries)
+            if size > self.max_size:
+                for _, file_size, path in sorted(entries):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                    size -= file_size
+                    if size <= self.max_size:
+                        break
+
+            with self._lock:
+                self._size = size
+        finally:
+            try:
+                os.remove(lock_path)
+            except FileNotFoundError:
+                pass
+
+
+DOCUMENT_CACHE = (
+    DocumentCache(DOCUMENT_CACHE_DIR, DOCUMENT_CACHE_MAX_SIZE)
+    if ENABLE_DOCUMENT_CACHE
+    else None
+)
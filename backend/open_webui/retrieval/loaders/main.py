@@ -3,6 +3,7 @@ import logging
 import ftfy
 import sys
 import json
+from typing import Optional
 
 from azure.identity import DefaultAzureCredential
 from langchain_community.document_loaders import (
@@ -11,7 +12,6 @@ from langchain_community.document_loaders import (
     CSVLoader,
     Docx2txtLoader,
     OutlookMessageLoader,
-    PyPDFLoader,
     TextLoader,
     UnstructuredEPubLoader,
     UnstructuredExcelLoader,
@@ -27,8 +27,11 @@ from open_webui.retrieval.loaders.external_document import ExternalDocumentLoade
 
 from open_webui.retrieval.loaders.mistral import MistralLoader
 from open_webui.retrieval.loaders.datalab_marker import DatalabMarkerLoader
+from open_webui.retrieval.loaders.cache import DOCUMENT_CACHE
+from open_webui.retrieval.loaders.pdf import ParallelPyPDFLoader
 
 
+from open_webui.config import PDF_LOADER_MIN_PAGES_PER_WORKER, PDF_LOADER_WORKERS
 from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL
 
 logging.basicConfig(stream=sys.stdout, level=GLOBAL_LOG_LEVEL)
@@ -224,6 +227,18 @@ class DoclingLoader:
             raise Exception(f"Error calling Docling: {error_msg}")
 
 
+# Loaders that send the file to an extraction service, with the prefixes of
+# the settings that change what they extract
+CACHED_LOADERS = {
+    TikaLoader: ("TIKA_", "PDF_EXTRACT_IMAGES"),
+    DoclingLoader: ("DOCLING_",),
+    DatalabMarkerLoader: ("DATALAB_MARKER_",),
+    AzureAIDocumentIntelligenceLoader: ("DOCUMENT_INTELLIGENCE_",),
+    MistralLoader: ("MISTRAL_OCR_",),
+    ExternalDocumentLoader: ("EXTERNAL_DOCUMENT_LOADER_",),
+}
+
+
 class Loader:
     def __init__(self, engine: str = "", **kwargs):
         self.engine = engine
@@ -233,7 +248,15 @@ class Loader:
         self, filename: str, file_content_type: str, file_path: str
     ) -> list[Document]:
         loader = self._get_loader(filename, file_content_type, file_path)
-        docs = loader.load()
+
+        cache_key = self._get_cache_key(loader, filename, file_content_type, file_path)
+        docs = DOCUMENT_CACHE.get(cache_key) if cache_key else None
+        if docs is not None:
+            log.debug(f"Using cached extraction of {filename}")
+        else:
+            docs = loader.load()
+            if cache_key:
+                DOCUMENT_CACHE.set(cache_key, docs)
 
         return [
             Document(
@@ -242,6 +265,34 @@ class Loader:
             for doc in docs
         ]
 
+    def _get_cache_key(
+        self, loader, filename: str, file_content_type: str, file_path: str
+    ) -> Optional[str]:
+        prefixes = CACHED_LOADERS.get(type(loader))
+        if not DOCUMENT_CACHE or not prefixes:
+            return None
+        if self.kwargs.get("DATALAB_MARKER_SKIP_CACHE") and isinstance(
+            loader, DatalabMarkerLoader
+        ):
+            return None
+
+        try:
+            return DOCUMENT_CACHE.get_key(
+                file_path,
+                loader=type(loader).__name__,
+                file_ext=filename.split(".")[-1].lower(),
+                content_type=file_content_type,
+                # Credentials don't change the extracted document
+                params={
+                    key: value
+                    for key, value in self.kwargs.items()
+                    if key.startswith(prefixes) and not key.endswith("_KEY")
+                },
+            )
+        except Exception as e:
+            log.warning(f"Failed to compute document cache key for {filename}: {e}")
+            return None
+
     def _is_text_file(self, file_ext: str, file_content_type: str) -> bool:
         return file_ext in known_source_ext or (
             file_content_type
@@ -387,8 +438,11 @@ class Loader:
             )
         else:
             if file_ext == "pdf":
-                loader = PyPDFLoader(
-                    file_path, extract_images=self.kwargs.get("PDF_EXTRACT_IMAGES")
+                loader = ParallelPyPDFLoader(
+                    file_path,
+                    extract_images=self.kwargs.get("PDF_EXTRACT_IMAGES"),
+                    workers=PDF_LOADER_WORKERS,
+                    min_pages_per_worker=PDF_LOADER_MIN_PAGES_PER_WORKER,
                 )
             elif file_ext == "csv":
                 loader = CSVLoader(file_path, autodetect_encoding=True)
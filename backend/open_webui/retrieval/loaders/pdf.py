@@ -0,0 +1,212 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Any, Iterator, Optional
+
+import pypdf
+from langchain_community.document_loaders.base import BaseLoader
+from langchain_community.document_loaders.parsers.pdf import PyPDFParser
+from langchain_core.documents import Document
+
+# This module is imported by the worker processes, so it must not import
+# open_webui.config or anything else that sets up the application.
+
+log = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def get_pdf_executor(workers: int) -> ProcessPoolExecutor:
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            # Workers are spawned rather than forked from the threaded server
+            _executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            _executor_workers = workers
+        return _executor
+
+
+def reset_pdf_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+####################
+# Helpers of langchain_community's PyPDFParser, which are private there
+####################
+
+# Positions where extracted images are inserted into the text of a page
+PARAGRAPH_DELIMITERS = ["\n\n\n", "\n\n"]
+
+
+def purge_metadata(metadata: dict[str, Any]) -> dict[str, Any]:
+    """Normalize the keys and values of PDF metadata like `PyPDFLoader`."""
+    new_metadata = {}
+    map_key = {"page_count": "total_pages", "file_path": "source"}
+    for k, v in metadata.items():
+        if type(v) not in [str, int]:
+            v = str(v)
+        if k.startswith("/"):
+            k = k[1:]
+        k = k.lower()
+        if k in ["creationdate", "moddate"]:
+            try:
+                new_metadata[k] = datetime.strptime(
+                    v.replace("'", ""), "D:%Y%m%d%H%M%S%z"
+                ).isoformat("T")
+            except ValueError:
+                new_metadata[k] = v
+        elif k in map_key:
+            new_metadata[map_key[k]] = v
+            new_metadata[k] = v
+        elif isinstance(v, str):
+            new_metadata[k] = v.strip()
+        elif isinstance(v, int):
+            new_metadata[k] = v
+    return new_metadata
+
+
+def merge_text_and_extras(extras: list[str], text: str) -> str:
+    """
+    Insert extras (text of images) before the last paragraph of a page that
+    isn't its footer, or at the end of the page, like `PyPDFLoader`.
+    """
+
+    def merge(extras: list[str], text: str, recurse: bool) -> Optional[str]:
+        if not extras:
+            return text
+
+        for delimiter in PARAGRAPH_DELIMITERS:
+            pos = text.rfind(delimiter)
+            if pos == -1:
+                continue
+
+            # Try the penultimate paragraph first, to skip a footer
+            previous_text = merge(extras, text[:pos], False) if recurse else None
+            if previous_text:
+                return previous_text + text[pos:]
+
+            all_extras = "\n\n".join(filter(None, extras))
+            if all_extras:
+                all_extras = delimiter + all_extras
+            return text[:pos] + all_extras + text[pos:]
+        return None
+
+    all_text = merge(extras, text, True)
+    if not all_text:
+        all_extras = "\n\n".join(filter(None, extras))
+        if all_extras:
+            all_extras = PARAGRAPH_DELIMITERS[-1] + all_extras
+        all_text = text + all_extras
+    return all_text
+
+
+####################
+# Parallel extraction
+####################
+
+
+def load_pdf_pages(
+    file_path: str, start: int, end: int, extract_images: bool = False
+) -> list[Document]:
+    """
+    Extract pages `start` to `end` (exclusive) of a PDF, with the same content
+    and metadata as `PyPDFLoader`.
+    """
+    parser = PyPDFParser(extract_images=extract_images, mode="page")
+    reader = pypdf.PdfReader(file_path)
+    page_labels = reader.page_labels
+
+    metadata = purge_metadata(
+        {"producer": "PyPDF", "creator": "PyPDF", "creationdate": ""}
+        | dict(reader.metadata or {})
+        | {"source": str(file_path), "total_pages": len(reader.pages)}
+    )
+
+    docs = []
+    for page_number in range(start, end):
+        page = reader.pages[page_number]
+        text = page.extract_text(
+            extraction_mode=parser.extraction_mode, **parser.extraction_kwargs
+        )
+        images = parser.extract_images_from_page(page)
+        docs.append(
+            Document(
+                page_content=merge_text_and_extras([images], text).strip(),
+                metadata=metadata
+                | {"page": page_number, "page_label": page_labels[page_number]},
+            )
+        )
+    return docs
+
+
+class ParallelPyPDFLoader(BaseLoader):
+    """
+    Load a PDF one document per page like `PyPDFLoader`, splitting it into
+    page ranges that are extracted in a pool of `workers` processes.
+
+    Every worker opens and parses the whole file, so a range is never smaller
+    than `min_pages_per_worker` pages, and smaller PDFs are extracted in this
+    process. Pages are yielded in order as soon as their range is extracted.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        extract_images: bool = False,
+        workers: int = 1,
+        min_pages_per_worker: int = 32,
+    ):
+        self.file_path = file_path
+        self.extract_images = extract_images
+        self.workers = workers
+        self.min_pages_per_worker = max(min_pages_per_worker, 1)
+
+    def lazy_load(self) -> Iterator[Document]:
+        total_pages = len(pypdf.PdfReader(self.file_path).pages)
+        pages_per_worker = max(
+            self.min_pages_per_worker, -(-total_pages // max(self.workers, 1))
+        )
+        ranges = [
+            (start, min(start + pages_per_worker, total_pages))
+            for start in range(0, total_pages, pages_per_worker)
+        ]
+
+        if len(ranges) <= 1:
+            yield from load_pdf_pages(
+                self.file_path, 0, total_pages, self.extract_images
+            )
+            return
+
+        log.debug(
+            f"Extracting {total_pages} pages of {self.file_path} in {len(ranges)} processes"
+        )
+        executor = get_pdf_executor(self.workers)
+        futures = [
+            executor.submit(
+                load_pdf_pages, self.file_path, start, end, self.extract_images
+            )
+            for start, end in ranges
+        ]
+        try:
+            for future in futures:
+                yield from future.result()
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory), start a new pool next time
+            reset_pdf_executor()
+            raise
+        finally:
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,321 @@
+import base64
+import json
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from open_webui.config import (
+    MEMORY_INDEX_CACHE_SIZE,
+    MEMORY_INDEX_MAX_MEMORIES,
+    MEMORY_INDEX_TTL,
+)
+from open_webui.env import (
+    REDIS_CLUSTER,
+    REDIS_KEY_PREFIX,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    REDIS_URL,
+    SRC_LOG_LEVELS,
+)
+from open_webui.retrieval.vector.main import SearchResult
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+class MemoryIndexEntry:
+    """The memories of a user, as vector items by id."""
+
+    def __init__(self, items: dict[str, dict]):
+        self.items = items
+        self._ids = list(items)
+        self._vectors: Optional[np.ndarray] = None
+
+    @property
+    def vectors(self) -> np.ndarray:
+        if self._vectors is None:
+            vectors = np.array(
+                [self.items[id]["vector"] for id in self._ids], dtype=np.float32
+            ).reshape(len(self._ids), -1)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            self._vectors = vectors / np.where(norms == 0, 1, norms)
+        return self._vectors
+
+    def search(self, vector: list[float], limit: int) -> SearchResult:
+        """
+        Return the `limit` memories closest to `vector` by cosine similarity,
+        with the distances normalized to 0 (worst) -> 1 (best) like the
+        vector DB search results.
+        """
+        if not self._ids:
+            return SearchResult(
+                ids=[[]], documents=[[]], metadatas=[[]], distances=[[]]
+            )
+
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1)
+        scores = self.vectors @ query
+
+        limit = min(max(limit, 1), len(self._ids))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+
+        ids = [self._ids[i] for i in top]
+        return SearchResult(
+            ids=[ids],
+            documents=[[self.items[id]["text"] for id in ids]],
+            metadatas=[[self.items[id]["metadata"] for id in ids]],
+            distances=[[float((1 + scores[i]) / 2) for i in top]],
+        )
+
+
+class MemoryIndex:
+    """
+    In-process index of the memory embeddings of up to `size` users, searched
+    with a dot product instead of a vector DB query.
+
+    Entries are kept per embedding model, so changing the model doesn't mix
+    vectors from different models. Callers reconcile an entry with the
+    memories in the database before searching it, so an entry that another
+    worker didn't update is only missing recent changes until then. Users
+    with more than `max_memories` memories are searched in the vector DB
+    instead.
+    """
+
+    def __init__(self, size: int, max_memories: int):
+        self.size = size
+        self.max_memories = max_memories
+        self._entries: OrderedDict[tuple[str, str], MemoryIndexEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, user_id: str, embedding: str) -> Optional[MemoryIndexEntry]:
+        with self._lock:
+            entry = self._entries.get((user_id, embedding))
+            if entry is not None:
+                self._entries.move_to_end((user_id, embedding))
+            return entry
+
+    async def set(self, user_id: str, embedding: str, items: list[dict]):
+        with self._lock:
+            # Only one embedding model is in use at a time
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+            self._entries[(user_id, embedding)] = MemoryIndexEntry(
+                {item["id"]: item for item in items}
+            )
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    async def upsert(self, user_id: str, embedding: str, items: list[dict]):
+        """Add or replace memories of a user whose memories are indexed."""
+        with self._lock:
+            entry = self._entries.get((user_id, embedding))
+            if entry is not None:
+                self._entries[(user_id, embedding)] = MemoryIndexEntry(
+                    {**entry.items, **{item["id"]: item for item in items}}
+                )
+
+    async def delete(self, user_id: str, ids: list[str]):
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if key[0] == user_id:
+                    self._entries[key] = MemoryIndexEntry(
+                        {id: item for id, item in entry.items.items() if id not in ids}
+                    )
+
+    async def drop(self, user_id: str):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+
+class RedisMemoryIndex(MemoryIndex):
+    """
+    Memory index shared by all instances through Redis, with a hash of packed
+    float32 vectors per user. A user's hash expires `ttl` seconds after the
+    last search.
+
+    Every write stores a new version stamp in the hash. Instances keep the
+    decoded entries of up to `size` users, and only read a user's hash again
+    when its stamp no longer matches the one they decoded.
+    """
+
+    EMBEDDING_FIELD = "embedding"
+    VERSION_FIELD = "version"
+
+    def __init__(
+        self,
+        *args,
+        ttl: int,
+        redis_url: str,
+        redis_sentinels: Optional[list] = [],
+        redis_cluster: bool = False,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.ttl = ttl
+        self._redis = get_redis_connection(
+            redis_url,
+            redis_sentinels,
+            redis_cluster,
+            async_mode=True,
+            decode_responses=True,
+        )
+        # User id -> (embedding, version, decoded entry)
+        self._decoded: OrderedDict[str, tuple[str, str, MemoryIndexEntry]] = (
+            OrderedDict()
+        )
+
+    def _key(self, user_id: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:memory_index:{user_id}"
+
+    def _dump(self, items: list[dict]) -> dict[str, str]:
+        return {
+            f"m:{item['id']}": json.dumps(
+                {
+                    "text": item["text"],
+                    "metadata": item["metadata"],
+                    "vector": base64.b64encode(
+                        np.asarray(item["vector"], dtype=np.float32).tobytes()
+                    ).decode(),
+                }
+            )
+            for item in items
+        }
+
+    def _cache(
+        self, user_id: str, embedding: str, version: str, entry: MemoryIndexEntry
+    ):
+        with self._lock:
+            self._decoded[user_id] = (embedding, version, entry)
+            self._decoded.move_to_end(user_id)
+            while len(self._decoded) > self.size:
+                self._decoded.popitem(last=False)
+
+    async def get(self, user_id: str, embedding: str) -> Optional[MemoryIndexEntry]:
+        key = self._key(user_id)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.hmget(key, [self.EMBEDDING_FIELD, self.VERSION_FIELD])
+            pipe.expire(key, self.ttl)
+            (stored_embedding, version), _ = await pipe.execute()
+        if stored_embedding != embedding:
+            return None
+
+        cached = self._decoded.get(user_id)
+        if cached is not None and cached[:2] == (embedding, version):
+            with self._lock:
+                self._decoded.move_to_end(user_id)
+            return cached[2]
+
+        fields = await self._redis.hgetall(key)
+        if fields.pop(self.EMBEDDING_FIELD, None) != embedding:
+            return None
+        version = fields.pop(self.VERSION_FIELD, None)
+
+        items = {}
+        for field, value in fields.items():
+            item = json.loads(value)
+            id = field.removeprefix("m:")
+            items[id] = {
+                "id": id,
+                "text": item["text"],
+                "metadata": item["metadata"],
+                "vector": np.frombuffer(
+                    base64.b64decode(item["vector"]), dtype=np.float32
+                ),
+            }
+        entry = MemoryIndexEntry(items)
+        if version is not None:
+            self._cache(user_id, embedding, version, entry)
+        return entry
+
+    async def set(self, user_id: str, embedding: str, items: list[dict]):
+        key = self._key(user_id)
+        version = uuid.uuid4().hex
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(
+                key,
+                mapping={
+                    self.EMBEDDING_FIELD: embedding,
+                    self.VERSION_FIELD: version,
+                    **self._dump(items),
+                },
+            )
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+        self._cache(
+            user_id,
+            embedding,
+            version,
+            MemoryIndexEntry({item["id"]: item for item in items}),
+        )
+
+    # Changes that fail to reach Redis are caught up with when the user's
+    # memories are next searched, so they don't fail the memory update
+
+    async def upsert(self, user_id: str, embedding: str, items: list[dict]):
+        key = self._key(user_id)
+        try:
+            # Without the embedding field, a partial hash is never searched
+            if await self._redis.hget(key, self.EMBEDDING_FIELD) == embedding:
+                async with self._redis.pipeline(transaction=True) as pipe:
+                    pipe.hset(
+                        key,
+                        mapping={
+                            self.VERSION_FIELD: uuid.uuid4().hex,
+                            **self._dump(items),
+                        },
+                    )
+                    pipe.expire(key, self.ttl)
+                    await pipe.execute()
+        except Exception as e:
+            log.warning(f"Failed to update the memory index of {user_id}: {e}")
+
+    async def delete(self, user_id: str, ids: list[str]):
+        key = self._key(user_id)
+        try:
+            if await self._redis.exists(key):
+                async with self._redis.pipeline(transaction=True) as pipe:
+                    pipe.hdel(key, *[f"m:{id}" for id in ids])
+                    pipe.hset(key, self.VERSION_FIELD, uuid.uuid4().hex)
+                    pipe.expire(key, self.ttl)
+                    await pipe.execute()
+        except Exception as e:
+            log.warning(f"Failed to update the memory index of {user_id}: {e}")
+
+    async def drop(self, user_id: str):
+        with self._lock:
+            self._decoded.pop(user_id, None)
+        try:
+            await self._redis.delete(self._key(user_id))
+        except Exception as e:
+            log.warning(f"Failed to drop the memory index of {user_id}: {e}")
+
+
+def get_memory_index() -> Optional[MemoryIndex]:
+    if MEMORY_INDEX_MAX_MEMORIES <= 0:
+        return None
+
+    if REDIS_URL:
+        return RedisMemoryIndex(
+            MEMORY_INDEX_CACHE_SIZE,
+            MEMORY_INDEX_MAX_MEMORIES,
+            ttl=MEMORY_INDEX_TTL,
+            redis_url=REDIS_URL,
+            redis_sentinels=get_sentinels_from_env(
+                REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+            ),
+            redis_cluster=REDIS_CLUSTER,
+        )
+
+    return MemoryIndex(MEMORY_INDEX_CACHE_SIZE, MEMORY_INDEX_MAX_MEMORIES)
+
+
+MEMORY_INDEX = get_memory_index()
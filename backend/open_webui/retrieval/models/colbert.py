@@ -1,5 +1,10 @@
 import os
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
 import torch
 import numpy as np
 from colbert.infra import ColBERTConfig
@@ -35,7 +40,75 @@ class ColBERT(BaseReranker):
             name,
             colbert_config=ColBERTConfig(model_name=name),
         ).to(self.device)
-        pass
+
+        # Token embeddings of documents by text hash, so chunks that are
+        # reranked again are not encoded again
+        self.cache_size = kwargs.get("cache_size", 10000)
+        self.cache_dir = kwargs.get("cache_dir")
+        if self.cache_dir:
+            self.cache_dir = os.path.join(
+                self.cache_dir, hashlib.sha256(name.encode()).hexdigest()[:16]
+            )
+            os.makedirs(self.cache_dir, exist_ok=True)
+        self._cache: OrderedDict[str, torch.Tensor] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def _get_cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pt")
+
+    def _get_cached(self, key: str) -> Optional[torch.Tensor]:
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        if self.cache_dir and os.path.exists(self._get_cache_path(key)):
+            try:
+                embeddings = torch.load(self._get_cache_path(key))
+                self._set_cached(key, embeddings, persist=False)
+                return embeddings
+            except Exception as e:
+                log.warning(f"ColBERT: ignoring unreadable cache entry {key}: {e}")
+        return None
+
+    def _set_cached(self, key: str, embeddings: torch.Tensor, persist: bool = True):
+        if self.cache_size:
+            with self._cache_lock:
+                self._cache[key] = embeddings
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        if persist and self.cache_dir:
+            path = self._get_cache_path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Written aside and renamed, so readers never see a partial file
+                torch.save(embeddings, f"{path}.{os.getpid()}.tmp")
+                os.replace(f"{path}.{os.getpid()}.tmp", path)
+            except Exception as e:
+                log.warning(f"ColBERT: failed to store cache entry {key}: {e}")
+
+    def embed_documents(self, docs: list[str]) -> torch.Tensor:
+        """
+        Return the token embeddings of `docs`, zero padded to the longest one.
+        Only documents missing from the cache are encoded, in one batch.
+        """
+        keys = [hashlib.sha256(doc.encode()).hexdigest() for doc in docs]
+        embeddings = [self._get_cached(key) for key in keys]
+
+        missing = [idx for idx, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            encoded = self.ckpt.docFromText([docs[idx] for idx in missing], bsize=32)[0]
+            for idx, doc_embeddings in zip(missing, encoded):
+                # Stored on the CPU without the zero padding; token embeddings
+                # are normalized so never zero themselves
+                doc_embeddings = doc_embeddings[doc_embeddings.abs().sum(dim=-1) > 0]
+                doc_embeddings = doc_embeddings.cpu()
+                embeddings[idx] = doc_embeddings
+                self._set_cached(keys[idx], doc_embeddings)
+
+        return torch.nn.utils.rnn.pad_sequence(embeddings, batch_first=True)
 
     def calculate_similarity_scores(self, query_embeddings, document_embeddings):
 
@@ -76,7 +149,7 @@ class ColBERT(BaseReranker):
         docs = [i[1] for i in sentences]
 
         # Embedding the documents
-        embedded_docs = self.ckpt.docFromText(docs, bsize=32)[0]
+        embedded_docs = self.embed_documents(docs)
         # Embedding the queries
         embedded_queries = self.ckpt.queryFromText([query], bsize=32)
         embedded_query = embedded_queries[0]
@@ -1,8 +1,14 @@
+import hashlib
 import logging
-import requests
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Tuple
 from urllib.parse import quote
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from open_webui.env import ENABLE_FORWARD_USER_INFO_HEADERS, SRC_LOG_LEVELS
 from open_webui.retrieval.models.base_reranker import BaseReranker
@@ -11,17 +17,119 @@ from open_webui.retrieval.models.base_reranker import BaseReranker
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def get_reranker_executor(workers: int) -> ThreadPoolExecutor:
+    """
+    Thread pool shared by the external rerankers, so replacing the reranker
+    on a config change doesn't leave the threads of the previous one behind.
+    """
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                # Batches already submitted still run
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="reranker"
+            )
+            _executor_workers = workers
+        return _executor
+
 
 class ExternalReranker(BaseReranker):
+    """
+    Reranker backed by a Cohere/Jina compatible `/rerank` endpoint.
+
+    Documents are sent in batches of `batch_size`, up to `concurrency` batches
+    at a time over a pooled session that retries rate limited and failed
+    requests with backoff. Scores are cached by (model, query, document), so
+    documents found again by a later search are not sent again.
+    """
+
     def __init__(
         self,
         api_key: str,
         url: str = "http://localhost:8080/v1/rerank",
         model: str = "reranker",
+        batch_size: int = 64,
+        concurrency: int = 4,
+        timeout: float = 30,
+        max_retries: int = 3,
+        cache_size: int = 10000,
     ):
         self.api_key = api_key
         self.url = url
         self.model = model
+        self.batch_size = max(batch_size, 1)
+        self.timeout = timeout
+        self.cache_size = cache_size
+
+        self.session = requests.Session()
+        self.session.mount(
+            self.url,
+            HTTPAdapter(
+                pool_maxsize=concurrency,
+                max_retries=Retry(
+                    total=max_retries,
+                    backoff_factor=0.5,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=None,
+                ),
+            ),
+        )
+        self.concurrency = max(concurrency, 1)
+
+        self._cache: OrderedDict[str, float] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def close(self):
+        """Close the pooled connections; requests in flight still complete."""
+        self.session.close()
+
+    def _get_cache_key(self, query: str, doc: str) -> str:
+        return hashlib.sha256("\0".join((self.model, query, doc)).encode()).hexdigest()
+
+    def _rerank(self, query: str, docs: List[str], user=None) -> List[float]:
+        r = self.session.post(
+            self.url,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {self.api_key}",
+                **(
+                    {
+                        "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
+                        "X-OpenWebUI-User-Id": user.id,
+                        "X-OpenWebUI-User-Email": user.email,
+                        "X-OpenWebUI-User-Role": user.role,
+                    }
+                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
+                    else {}
+                ),
+            },
+            json={
+                "model": self.model,
+                "query": query,
+                "documents": docs,
+                "top_n": len(docs),
+            },
+            timeout=self.timeout,
+        )
+        r.raise_for_status()
+        data = r.json()
+
+        if "results" not in data:
+            raise ValueError("No results found in external reranking response")
+
+        scores = [None] * len(docs)
+        for result in data["results"]:
+            scores[result["index"]] = result["relevance_score"]
+        if None in scores:
+            raise ValueError("External reranking response is missing documents")
+        return scores
 
     def predict(
         self, sentences: List[Tuple[str, str]], user=None
@@ -29,46 +137,49 @@ class ExternalReranker(BaseReranker):
         query = sentences[0][0]
         docs = [i[1] for i in sentences]
 
-        payload = {
-            "model": self.model,
-            "query": query,
-            "documents": docs,
-            "top_n": len(docs),
-        }
+        keys = [self._get_cache_key(query, doc) for doc in docs]
+        scores = [None] * len(docs)
+        if self.cache_size:
+            with self._cache_lock:
+                for idx, key in enumerate(keys):
+                    if key in self._cache:
+                        self._cache.move_to_end(key)
+                        scores[idx] = self._cache[key]
+
+        missing = [idx for idx, score in enumerate(scores) if score is None]
+        if not missing:
+            return scores
 
         try:
             log.info(f"ExternalReranker:predict:model {self.model}")
-            log.info(f"ExternalReranker:predict:query {query}")
-
-            r = requests.post(
-                f"{self.url}",
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {self.api_key}",
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": quote(user.name, safe=" "),
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                        else {}
-                    ),
-                },
-                json=payload,
+            log.info(
+                f"ExternalReranker:predict:query {query} ({len(missing)}/{len(docs)} documents)"
             )
 
-            r.raise_for_status()
-            data = r.json()
-
-            if "results" in data:
-                sorted_results = sorted(data["results"], key=lambda x: x["index"])
-                return [result["relevance_score"] for result in sorted_results]
-            else:
-                log.error("No results found in external reranking response")
-                return None
-
+            batches = [
+                missing[i : i + self.batch_size]
+                for i in range(0, len(missing), self.batch_size)
+            ]
+            batch_scores = list(
+                get_reranker_executor(self.concurrency).map(
+                    lambda batch: self._rerank(
+                        query, [docs[idx] for idx in batch], user=user
+                    ),
+                    batches,
+                )
+            )
         except Exception as e:
             log.exception(f"Error in external reranking: {e}")
             return None
+
+        with self._cache_lock:
+            for batch, results in zip(batches, batch_scores):
+                for idx, score in zip(batch, results):
+                    scores[idx] = score
+                    if self.cache_size:
+                        self._cache[keys[idx]] = score
+
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return scores
@@ -0,0 +1,97 @@
+import os
+from typing import Iterable
+
+import tiktoken
+from langchain_core.documents import Document
+
+# UTF-8 continuation bytes, which don't start a character
+_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+
+
+class TokenTextSplitter:
+    """
+    Split documents into chunks of `chunk_size` tiktoken tokens, with
+    `chunk_overlap` tokens shared by consecutive chunks.
+
+    Produces the same chunks as LangChain's `TokenTextSplitter`, but encodes
+    all documents at once with tiktoken's batch API, and computes each chunk's
+    `start_index` from its token offset rather than by searching the text for
+    it.
+    """
+
+    def __init__(
+        self,
+        encoding_name: str = "cl100k_base",
+        chunk_size: int = 4000,
+        chunk_overlap: int = 200,
+        add_start_index: bool = False,
+        num_threads: int = min(os.cpu_count() or 1, 8),
+    ):
+        if chunk_overlap >= chunk_size:
+            raise ValueError(
+                f"Got a larger chunk overlap ({chunk_overlap}) than chunk size "
+                f"({chunk_size}), should be smaller."
+            )
+        self.encoding = tiktoken.get_encoding(encoding_name)
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.add_start_index = add_start_index
+        self.num_threads = num_threads
+
+    def _get_chunk_starts(self, tokens: list[int]) -> list[int]:
+        step = self.chunk_size - self.chunk_overlap
+        starts = [0]
+        while starts[-1] + self.chunk_size < len(tokens):
+            starts.append(starts[-1] + step)
+        return starts if tokens else []
+
+    def _get_start_indexes(self, tokens: list[int], starts: list[int]) -> list[int]:
+        """Character offsets of the tokens at `starts` in the encoded text."""
+        indexes = [0]
+        for start, end in zip(starts, starts[1:]):
+            segment = self.encoding.decode_bytes(tokens[start:end])
+            indexes.append(
+                indexes[-1] + len(segment.translate(None, _CONTINUATION_BYTES))
+            )
+        return indexes
+
+    def split_texts(self, texts: list[str]) -> list[list[tuple[str, int]]]:
+        """Return the chunks of every text, with their start index."""
+        # Special tokens are encoded as plain text, so documents that contain
+        # them (e.g. "<|endoftext|>") are split instead of being rejected
+        encoded = self.encoding.encode_ordinary_batch(
+            texts, num_threads=self.num_threads
+        )
+
+        chunk_starts = [self._get_chunk_starts(tokens) for tokens in encoded]
+        # Chunks are decoded one by one: they are too small for a thread pool
+        chunks = [
+            self.encoding.decode(tokens[start : start + self.chunk_size])
+            for tokens, starts in zip(encoded, chunk_starts)
+            for start in starts
+        ]
+
+        results = []
+        offset = 0
+        for tokens, starts in zip(encoded, chunk_starts):
+            indexes = (
+                self._get_start_indexes(tokens, starts)
+                if self.add_start_index
+                else [None] * len(starts)
+            )
+            results.append(list(zip(chunks[offset : offset + len(starts)], indexes)))
+            offset += len(starts)
+        return results
+
+    def split_documents(self, documents: Iterable[Document]) -> list[Document]:
+        documents = list(documents)
+        chunks = []
+        for doc, doc_chunks in zip(
+            documents, self.split_texts([doc.page_content for doc in documents])
+        ):
+            for chunk, start_index in doc_chunks:
+                metadata = {**doc.metadata}
+                if self.add_start_index:
+                    metadata["start_index"] = start_index
+                chunks.append(Document(page_content=chunk, metadata=metadata))
+        return chunks
@@ -2,9 +2,9 @@ import logging
 import os
 from typing import Optional, Union
 
+import asyncio
 import requests
 import hashlib
-from concurrent.futures import ThreadPoolExecutor
 import time
 import re
 
@@ -15,16 +15,21 @@ from langchain_community.retrievers import BM25Retriever
 from langchain_core.documents import Document
 
 from open_webui.config import VECTOR_DB
-from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.vector.factory import (
+    ASYNC_VECTOR_DB_CLIENT,
+    VECTOR_DB_CLIENT,
+)
+from fastapi.concurrency import run_in_threadpool
 
 
 from open_webui.models.users import UserModel
-from open_webui.models.files import Files
+from open_webui.models.files import FileModel, FileReferenceResponse, Files
 from open_webui.models.knowledge import Knowledges
 
 from open_webui.models.chats import Chats
 from open_webui.models.notes import Notes
 
+from open_webui.retrieval.cache import RETRIEVAL_CACHE
 from open_webui.retrieval.vector.main import GetResult
 from open_webui.utils.access_control import has_access
 from open_webui.utils.misc import get_message_list
@@ -42,6 +47,7 @@ from open_webui.config import (
     RAG_EMBEDDING_QUERY_PREFIX,
     RAG_EMBEDDING_CONTENT_PREFIX,
     RAG_EMBEDDING_PREFIX_FIELD_NAME,
+    RAG_ITEM_CONCURRENCY,
 )
 
 log = logging.getLogger(__name__)
@@ -50,7 +56,10 @@ log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 from typing import Any
 
-from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
 from langchain_core.retrievers import BaseRetriever
 
 
@@ -98,6 +107,25 @@ class VectorSearchRetriever(BaseRetriever):
             limit=self.top_k,
         )
 
+        return self._to_documents(result)
+
+    async def _aget_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: AsyncCallbackManagerForRetrieverRun,
+    ) -> list[Document]:
+        query_embedding = await run_in_threadpool(
+            self.embedding_function, query, RAG_EMBEDDING_QUERY_PREFIX
+        )
+        result = await ASYNC_VECTOR_DB_CLIENT.search(
+            collection_name=self.collection_name,
+            vectors=[query_embedding],
+            limit=self.top_k,
+        )
+        return self._to_documents(result)
+
+    def _to_documents(self, result) -> list[Document]:
         ids = result.ids[0]
         metadatas = result.metadatas[0]
         documents = result.documents[0]
@@ -113,12 +141,12 @@ class VectorSearchRetriever(BaseRetriever):
         return results
 
 
-def query_doc(
+async def query_doc(
     collection_name: str, query_embedding: list[float], k: int, user: UserModel = None
 ):
     try:
         log.debug(f"query_doc:doc {collection_name}")
-        result = VECTOR_DB_CLIENT.search(
+        result = await ASYNC_VECTOR_DB_CLIENT.search(
             collection_name=collection_name,
             vectors=[query_embedding],
             limit=k,
@@ -133,10 +161,10 @@ def query_doc(
         raise e
 
 
-def get_doc(collection_name: str, user: UserModel = None):
+async def get_doc(collection_name: str, user: UserModel = None):
     try:
         log.debug(f"get_doc:doc {collection_name}")
-        result = VECTOR_DB_CLIENT.get(collection_name=collection_name)
+        result = await ASYNC_VECTOR_DB_CLIENT.get(collection_name=collection_name)
 
         if result:
             log.info(f"query_doc:result {result.ids} {result.metadatas}")
@@ -147,7 +175,7 @@ def get_doc(collection_name: str, user: UserModel = None):
         raise e
 
 
-def query_doc_with_hybrid_search(
+async def query_doc_with_hybrid_search(
     collection_name: str,
     collection_result: GetResult,
     query: str,
@@ -171,7 +199,9 @@ def query_doc_with_hybrid_search(
 
         log.debug(f"query_doc_with_hybrid_search:doc {collection_name}")
 
-        bm25_retriever = BM25Retriever.from_texts(
+        # Tokenizing the whole collection would block the event loop
+        bm25_retriever = await run_in_threadpool(
+            BM25Retriever.from_texts,
             texts=collection_result.documents[0],
             metadatas=collection_result.metadatas[0],
         )
@@ -208,7 +238,7 @@ def query_doc_with_hybrid_search(
             base_compressor=compressor, base_retriever=ensemble_retriever
         )
 
-        result = compression_retriever.invoke(query)
+        result = await compression_retriever.ainvoke(query)
 
         distances = [d.metadata.get("score") for d in result]
         documents = [d.page_content for d in result]
@@ -303,24 +333,24 @@ def merge_and_sort_query_results(query_results: list[dict], k: int) -> dict:
     }
 
 
-def get_all_items_from_collections(collection_names: list[str]) -> dict:
-    results = []
-
-    for collection_name in collection_names:
-        if collection_name:
-            try:
-                result = get_doc(collection_name=collection_name)
+async def get_all_items_from_collections(collection_names: list[str]) -> dict:
+    async def process_collection(collection_name):
+        try:
+            if collection_name:
+                result = await get_doc(collection_name=collection_name)
                 if result is not None:
-                    results.append(result.model_dump())
-            except Exception as e:
-                log.exception(f"Error when querying the collection: {e}")
-        else:
-            pass
+                    return result.model_dump()
+        except Exception as e:
+            log.exception(f"Error when querying the collection: {e}")
+        return None
 
-    return merge_get_results(results)
+    results = await asyncio.gather(
+        *[process_collection(collection_name) for collection_name in collection_names]
+    )
+    return merge_get_results([result for result in results if result is not None])
 
 
-def query_collection(
+async def query_collection(
     collection_names: list[str],
     queries: list[str],
     embedding_function,
@@ -329,10 +359,10 @@ def query_collection(
     results = []
     error = False
 
-    def process_query_collection(collection_name, query_embedding):
+    async def process_query_collection(collection_name, query_embedding):
         try:
             if collection_name:
-                result = query_doc(
+                result = await query_doc(
                     collection_name=collection_name,
                     k=k,
                     query_embedding=query_embedding,
@@ -345,20 +375,20 @@ def query_collection(
             return None, e
 
     # Generate all query embeddings (in one call)
-    query_embeddings = embedding_function(queries, prefix=RAG_EMBEDDING_QUERY_PREFIX)
+    query_embeddings = await run_in_threadpool(
+        embedding_function, queries, prefix=RAG_EMBEDDING_QUERY_PREFIX
+    )
     log.debug(
         f"query_collection: processing {len(queries)} queries across {len(collection_names)} collections"
     )
 
-    with ThreadPoolExecutor() as executor:
-        future_results = []
-        for query_embedding in query_embeddings:
-            for collection_name in collection_names:
-                result = executor.submit(
-                    process_query_collection, collection_name, query_embedding
-                )
-                future_results.append(result)
-        task_results = [future.result() for future in future_results]
+    task_results = await asyncio.gather(
+        *[
+            process_query_collection(collection_name, query_embedding)
+            for query_embedding in query_embeddings
+            for collection_name in collection_names
+        ]
+    )
 
     for result, err in task_results:
         if err is not None:
@@ -372,7 +402,7 @@ def query_collection(
     return merge_and_sort_query_results(results, k=k)
 
 
-def query_collection_with_hybrid_search(
+async def query_collection_with_hybrid_search(
     collection_names: list[str],
     queries: list[str],
     embedding_function,
@@ -384,28 +414,39 @@ def query_collection_with_hybrid_search(
 ) -> dict:
     results = []
     error = False
-    # Fetch collection data once per collection sequentially
+
+    # Fetch collection data once per collection
     # Avoid fetching the same data multiple times later
-    collection_results = {}
-    for collection_name in collection_names:
+    async def fetch_collection(collection_name):
         try:
             log.debug(
                 f"query_collection_with_hybrid_search:VECTOR_DB_CLIENT.get:collection {collection_name}"
             )
-            collection_results[collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=collection_name
-            )
+            return await ASYNC_VECTOR_DB_CLIENT.get(collection_name=collection_name)
         except Exception as e:
             log.exception(f"Failed to fetch collection {collection_name}: {e}")
-            collection_results[collection_name] = None
+            return None
+
+    collection_names = list(collection_names)
+    collection_results = dict(
+        zip(
+            collection_names,
+            await asyncio.gather(
+                *[
+                    fetch_collection(collection_name)
+                    for collection_name in collection_names
+                ]
+            ),
+        )
+    )
 
     log.info(
         f"Starting hybrid search for {len(queries)} queries in {len(collection_names)} collections..."
     )
 
-    def process_query(collection_name, query):
+    async def process_query(collection_name, query):
         try:
-            result = query_doc_with_hybrid_search(
+            result = await query_doc_with_hybrid_search(
                 collection_name=collection_name,
                 collection_result=collection_results[collection_name],
                 query=query,
@@ -430,9 +471,7 @@ def query_collection_with_hybrid_search(
         for q in queries
     ]
 
-    with ThreadPoolExecutor() as executor:
-        future_results = [executor.submit(process_query, cn, q) for cn, q in tasks]
-        task_results = [future.result() for future in future_results]
+    task_results = await asyncio.gather(*[process_query(cn, q) for cn, q in tasks])
 
     for result, err in task_results:
         if err is not None:
@@ -507,7 +546,90 @@ def get_reranking_function(reranking_engine, reranking_model, reranking_function
         return lambda sentences, user=None: reranking_function.predict(sentences)
 
 
-def get_sources_from_items(
+def get_file_collection_name(file: FileModel) -> str:
+    # Deduplicated uploads reuse the vectors of the file they were copied from
+    return f"file-{(file.meta or {}).get('source_file_id') or file.id}"
+
+
+def get_file_references(file: FileModel) -> list[FileReferenceResponse]:
+    """Other files stored under the same content hash as the given file."""
+    if not file.blob_hash:
+        return []
+    return [f for f in Files.get_files_by_blob_hash(file.blob_hash) if f.id != file.id]
+
+
+def delete_file_collection(file: FileModel):
+    """Delete a file's vectors unless other deduplicated files still use them."""
+    collection_name = get_file_collection_name(file)
+    if any(
+        get_file_collection_name(f) == collection_name
+        for f in get_file_references(file)
+    ):
+        log.debug(f"keeping shared collection {collection_name}")
+        return
+
+    if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
+        VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+
+
+def apply_token_budget(
+    query_results: list[dict], token_budget: int, encoding_name: str
+) -> list[dict]:
+    """
+    Fit full context documents into token_budget tokens, keeping them in
+    order and truncating the one that crosses the budget. Search results are
+    already bounded by k and left as they are.
+    """
+    full_context_results = [
+        query_result
+        for query_result in query_results
+        if not query_result.get("distances")
+    ]
+    documents = [
+        document or ""
+        for query_result in full_context_results
+        for document in query_result["documents"][0]
+    ]
+
+    # A token is at least one byte, so most prompts fit without tokenizing
+    if sum(len(document.encode()) for document in documents) <= token_budget:
+        return query_results
+
+    import tiktoken
+
+    encoding = tiktoken.get_encoding(encoding_name)
+    tokens = iter(encoding.encode_ordinary_batch(documents))
+
+    remaining = token_budget
+    for query_result in full_context_results:
+        kept_documents = []
+        kept_metadatas = []
+        for document, metadata in zip(
+            query_result["documents"][0], query_result["metadatas"][0]
+        ):
+            document_tokens = next(tokens)
+            if remaining <= 0:
+                continue
+            if len(document_tokens) > remaining:
+                document = encoding.decode(document_tokens[:remaining])
+            remaining -= len(document_tokens)
+            kept_documents.append(document)
+            kept_metadatas.append(metadata)
+
+        if len(kept_documents) < len(query_result["documents"][0]):
+            log.info(
+                f"full context token budget of {token_budget} exceeded, "
+                f"dropped {len(query_result['documents'][0]) - len(kept_documents)} documents"
+            )
+        query_result["documents"] = [kept_documents]
+        query_result["metadatas"] = [kept_metadatas]
+
+    return [
+        query_result for query_result in query_results if query_result["documents"][0]
+    ]
+
+
+async def get_sources_from_items(
     request,
     items,
     queries,
@@ -520,17 +642,17 @@ def get_sources_from_items(
     hybrid_search,
     full_context=False,
     user: Optional[UserModel] = None,
+    token_budget: Optional[int] = None,
 ):
     log.debug(
         f"items: {items} {queries} {embedding_function} {reranking_function} {full_context}"
     )
 
-    extracted_collections = []
-    query_results = []
-
-    for item in items:
+    def resolve_item(item):
+        """Load the content of an item, or the collections to search for it."""
         query_result = None
         collection_names = []
+        shared_file = None
 
         if item.get("type") == "text":
             # Raw Text
@@ -658,7 +780,12 @@ def get_sources_from_items(
                 if item.get("legacy"):
                     collection_names.append(f"{item['id']}")
                 else:
-                    collection_names.append(f"file-{item['id']}")
+                    file_object = Files.get_file_by_id(item["id"])
+                    if file_object and (file_object.meta or {}).get("source_file_id"):
+                        shared_file = file_object
+                        collection_names.append(get_file_collection_name(file_object))
+                    else:
+                        collection_names.append(f"file-{item['id']}")
 
         elif item.get("type") == "collection":
             if (
@@ -678,18 +805,15 @@ def get_sources_from_items(
 
                     documents = []
                     metadatas = []
-                    for file_id in file_ids:
-                        file_object = Files.get_file_by_id(file_id)
-
-                        if file_object:
-                            documents.append(file_object.data.get("content", ""))
-                            metadatas.append(
-                                {
-                                    "file_id": file_id,
-                                    "name": file_object.filename,
-                                    "source": file_object.filename,
-                                }
-                            )
+                    for file in Files.get_file_contents_by_ids(file_ids):
+                        documents.append(file.content or "")
+                        metadatas.append(
+                            {
+                                "file_id": file.id,
+                                "name": file.filename,
+                                "source": file.filename,
+                            }
+                        )
 
                     query_result = {
                         "documents": [documents],
@@ -715,54 +839,132 @@ def get_sources_from_items(
             # Collection Names List
             collection_names.extend(item["collection_names"])
 
-        # If query_result is None
-        # Fallback to collection names and vector search the collections
+        return query_result, collection_names, shared_file
+
+    semaphore = asyncio.Semaphore(RAG_ITEM_CONCURRENCY)
+
+    async def bounded(func, *args):
+        async with semaphore:
+            return await func(*args)
+
+    # Items are independent: notes, chats, URLs and full context files load
+    # concurrently, in threads since their loaders are blocking
+    resolved_items = await asyncio.gather(
+        *[bounded(run_in_threadpool, resolve_item, item) for item in items]
+    )
+
+    async def search_collections(collection_names):
+        try:
+            if full_context:
+                return await get_all_items_from_collections(collection_names)
+
+            cache_key = None
+            if RETRIEVAL_CACHE:
+                try:
+                    cache_key = await RETRIEVAL_CACHE.get_key(
+                        list(collection_names),
+                        queries=queries,
+                        embedding_model=request.app.state.config.RAG_EMBEDDING_MODEL,
+                        reranking_model=request.app.state.config.RAG_RERANKING_MODEL,
+                        hybrid_search=hybrid_search,
+                        k=k,
+                        k_reranker=k_reranker,
+                        r=r,
+                        hybrid_bm25_weight=hybrid_bm25_weight,
+                    )
+                    query_result = await RETRIEVAL_CACHE.get(cache_key)
+                    if query_result is not None:
+                        log.debug(f"retrieval cache hit for {collection_names}")
+                        return query_result
+                except Exception as e:
+                    log.warning(f"Retrieval cache unavailable: {e}")
+                    cache_key = None
+
+            query_result = None
+            if hybrid_search:
+                try:
+                    query_result = await query_collection_with_hybrid_search(
+                        collection_names=collection_names,
+                        queries=queries,
+                        embedding_function=embedding_function,
+                        k=k,
+                        reranking_function=reranking_function,
+                        k_reranker=k_reranker,
+                        r=r,
+                        hybrid_bm25_weight=hybrid_bm25_weight,
+                    )
+                except Exception as e:
+                    log.debug(
+                        "Error when using hybrid search, using non hybrid search as fallback."
+                    )
+
+            # fallback to non-hybrid search
+            if not hybrid_search and query_result is None:
+                query_result = await query_collection(
+                    collection_names=collection_names,
+                    queries=queries,
+                    embedding_function=embedding_function,
+                    k=k,
+                )
+
+            if cache_key and query_result is not None:
+                try:
+                    await RETRIEVAL_CACHE.set(cache_key, query_result)
+                except Exception as e:
+                    log.warning(f"Retrieval cache unavailable: {e}")
+            return query_result
+        except Exception as e:
+            log.exception(e)
+            return None
+
+    # Assign collections in item order, so a collection shared by several
+    # items is always searched for the first of them
+    extracted_collections = []
+    searches = {}
+    for idx, (query_result, collection_names, _) in enumerate(resolved_items):
         if query_result is None and collection_names:
             collection_names = set(collection_names).difference(extracted_collections)
             if not collection_names:
-                log.debug(f"skipping {item} as it has already been extracted")
+                log.debug(f"skipping {items[idx]} as it has already been extracted")
                 continue
+            extracted_collections.extend(collection_names)
+            searches[idx] = bounded(search_collections, collection_names)
 
-            try:
-                if full_context:
-                    query_result = get_all_items_from_collections(collection_names)
-                else:
-                    query_result = None  # Initialize to None
-                    if hybrid_search:
-                        try:
-                            query_result = query_collection_with_hybrid_search(
-                                collection_names=collection_names,
-                                queries=queries,
-                                embedding_function=embedding_function,
-                                k=k,
-                                reranking_function=reranking_function,
-                                k_reranker=k_reranker,
-                                r=r,
-                                hybrid_bm25_weight=hybrid_bm25_weight,
-                            )
-                        except Exception as e:
-                            log.debug(
-                                "Error when using hybrid search, using non hybrid search as fallback."
-                            )
-
-                    # fallback to non-hybrid search
-                    if not hybrid_search and query_result is None:
-                        query_result = query_collection(
-                            collection_names=collection_names,
-                            queries=queries,
-                            embedding_function=embedding_function,
-                            k=k,
-                        )
-            except Exception as e:
-                log.exception(e)
+    # Vector searches of different items also run concurrently
+    search_results = dict(
+        zip(searches.keys(), await asyncio.gather(*searches.values()))
+    )
 
-            extracted_collections.extend(collection_names)
+    query_results = []
+    for idx, (query_result, _, shared_file) in enumerate(resolved_items):
+        item = items[idx]
+        if idx in search_results:
+            query_result = search_results[idx]
+
+            if query_result and shared_file:
+                # Attribute chunks from a shared collection to the attached file
+                for metadatas in query_result.get("metadatas", []):
+                    for metadata in metadatas:
+                        metadata.update(
+                            {
+                                "file_id": shared_file.id,
+                                "name": shared_file.filename,
+                                "source": shared_file.filename,
+                            }
+                        )
 
         if query_result:
             if "data" in item:
                 del item["data"]
             query_results.append({**query_result, "file": item})
 
+    if token_budget:
+        query_results = apply_token_budget(
+            query_results,
+            token_budget,
+            str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
+        )
+
     sources = []
     for query_result in query_results:
         try:
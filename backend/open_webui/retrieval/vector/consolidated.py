@@ -0,0 +1,284 @@
+import logging
+import time
+from typing import Dict, List, Optional, Union
+
+from open_webui.models.files import Files
+from open_webui.models.knowledge import Knowledges
+from open_webui.retrieval.vector.main import (
+    GetResult,
+    SearchResult,
+    VectorDBBase,
+    VectorItem,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+FILE_COLLECTION_PREFIX = "file-"
+
+# Collections that are never knowledge bases
+NON_KNOWLEDGE_COLLECTION_PREFIXES = ("user-memory-", "web-search-")
+
+
+def is_knowledge_collection_name(collection_name: str) -> bool:
+    if collection_name.startswith(NON_KNOWLEDGE_COLLECTION_PREFIXES):
+        return False
+    # Processed URLs and text are stored under (truncated) sha256 hashes
+    return not all(c in "0123456789abcdef" for c in collection_name)
+
+
+class ConsolidatedVectorDBClient(VectorDBBase):
+    """
+    Stores the chunks of every file once, in a single shared collection tagged
+    with the file_id of each chunk.
+
+    `file-<id>` collections and knowledge base collections become views over
+    the shared collection: a file collection selects the chunks of that file,
+    and a knowledge base selects the chunks of the files listed in its
+    `data.file_ids`, so adding a file to a knowledge base stores nothing new.
+    All other collections (web search results, memories, ...) are passed
+    through to the underlying client unchanged.
+    """
+
+    def __init__(self, client: VectorDBBase, collection_name: str):
+        self.client = client
+        self.collection_name = collection_name
+
+        # Knowledge base id -> (updated_at, checked_at, file ids)
+        self._knowledge_file_ids: dict[str, tuple[int, int, List[str]]] = {}
+
+    def get_file_ids(self, collection_name: str) -> Optional[List[str]]:
+        """
+        Return the ids of the files whose chunks make up a collection, or None
+        if the collection is not stored in the shared collection.
+        """
+        if collection_name.startswith(FILE_COLLECTION_PREFIX):
+            return [collection_name[len(FILE_COLLECTION_PREFIX) :]]
+
+        if not is_knowledge_collection_name(collection_name):
+            return None
+
+        updated_at = Knowledges.get_knowledge_updated_at_by_id(collection_name)
+        if updated_at is None:
+            self._knowledge_file_ids.pop(collection_name, None)
+            return None
+
+        # updated_at has a resolution of seconds, so file ids read in the same
+        # second as the last update could predate another update in that second
+        cached = self._knowledge_file_ids.get(collection_name)
+        if cached is not None and cached[0] == updated_at and updated_at < cached[1]:
+            return list(cached[2])
+
+        checked_at = int(time.time())
+        knowledge = Knowledges.get_knowledge_by_id(collection_name)
+        if knowledge is None:
+            return None
+
+        file_ids = (knowledge.data or {}).get("file_ids", [])
+        file_ids = list(
+            {
+                # Deduplicated uploads are stored under the original file
+                file.meta.get("source_file_id") or file.id
+                for file in Files.get_file_metadatas_by_ids(file_ids)
+            }
+        )
+        self._knowledge_file_ids[collection_name] = (
+            knowledge.updated_at,
+            checked_at,
+            file_ids,
+        )
+        return list(file_ids)
+
+    def get_dependent_collection_names(self, collection_name: str) -> List[str]:
+        """
+        Return the knowledge bases that view the chunks of a `file-<id>`
+        collection, including through deduplicated uploads of the file.
+        """
+        if not collection_name.startswith(FILE_COLLECTION_PREFIX):
+            return []
+
+        file_id = collection_name[len(FILE_COLLECTION_PREFIX) :]
+        file_ids = [file_id]
+        file = Files.get_file_by_id(file_id)
+        if file and file.blob_hash:
+            file_ids += [
+                reference.id
+                for reference in Files.get_files_by_blob_hash(file.blob_hash)
+                if (reference.meta or {}).get("source_file_id") == file_id
+            ]
+
+        return Knowledges.get_knowledge_ids_by_file_ids(file_ids)
+
+    def _get_filter(self, file_ids: List[str], filter: Optional[Dict] = None):
+        return {
+            **(filter or {}),
+            "file_id": file_ids[0] if len(file_ids) == 1 else {"$in": file_ids},
+        }
+
+    def has_file_vectors(self, file_id: str) -> bool:
+        result = self.client.query(
+            collection_name=self.collection_name,
+            filter={"file_id": file_id},
+            limit=1,
+        )
+        return bool(result and result.ids and result.ids[0])
+
+    def has_collection(self, collection_name: str) -> bool:
+        file_ids = self.get_file_ids(collection_name)
+        if file_ids is None:
+            return self.client.has_collection(collection_name=collection_name)
+        if not file_ids:
+            return False
+
+        result = self.client.query(
+            collection_name=self.collection_name,
+            filter=self._get_filter(file_ids),
+            limit=1,
+        )
+        return bool(result and result.ids and result.ids[0])
+
+    def delete_collection(self, collection_name: str) -> None:
+        file_ids = self.get_file_ids(collection_name)
+        if file_ids is None:
+            return self.client.delete_collection(collection_name=collection_name)
+
+        if collection_name.startswith(FILE_COLLECTION_PREFIX):
+            self.client.delete(
+                collection_name=self.collection_name,
+                filter=self._get_filter(file_ids),
+            )
+        else:
+            # Knowledge bases only reference file chunks; membership is
+            # tracked in the knowledge base itself
+            log.debug(f"not deleting shared chunks of {collection_name}")
+
+    def insert(self, collection_name: str, items: List[VectorItem]) -> None:
+        items_to_store = self._get_items_to_store(collection_name, items)
+        if items_to_store is None:
+            return self.client.insert(collection_name=collection_name, items=items)
+        if items_to_store:
+            self.client.insert(
+                collection_name=self.collection_name, items=items_to_store
+            )
+
+    def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        items_to_store = self._get_items_to_store(collection_name, items)
+        if items_to_store is None:
+            return self.client.upsert(collection_name=collection_name, items=items)
+        if items_to_store:
+            self.client.upsert(
+                collection_name=self.collection_name, items=items_to_store
+            )
+
+    def _get_items_to_store(
+        self, collection_name: str, items: List[VectorItem]
+    ) -> Optional[List[VectorItem]]:
+        if collection_name.startswith(FILE_COLLECTION_PREFIX):
+            file_id = collection_name[len(FILE_COLLECTION_PREFIX) :]
+            return [
+                {**item, "metadata": {**item["metadata"], "file_id": file_id}}
+                for item in items
+            ]
+
+        if self.get_file_ids(collection_name) is None:
+            return None
+
+        # Items added to a knowledge base are only stored for files that don't
+        # have chunks of their own yet
+        stored = {}
+        items_to_store = []
+        for item in items:
+            file_id = item["metadata"].get("file_id")
+            if not file_id:
+                log.warning(
+                    f"dropping chunk without file_id added to {collection_name}"
+                )
+                continue
+            if file_id not in stored:
+                stored[file_id] = self.has_file_vectors(file_id)
+            if not stored[file_id]:
+                items_to_store.append(item)
+        return items_to_store
+
+    def search(
+        self,
+        collection_name: str,
+        vectors: List[List[Union[float, int]]],
+        limit: int,
+        filter: Optional[Dict] = None,
+    ) -> Optional[SearchResult]:
+        file_ids = self.get_file_ids(collection_name)
+        if file_ids is None:
+            return self.client.search(
+                collection_name=collection_name,
+                vectors=vectors,
+                limit=limit,
+                filter=filter,
+            )
+        if not file_ids:
+            return None
+
+        return self.client.search(
+            collection_name=self.collection_name,
+            vectors=vectors,
+            limit=limit,
+            filter=self._get_filter(file_ids, filter),
+        )
+
+    def query(
+        self, collection_name: str, filter: Dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        # Leave the limit to the backend's own default when not given
+        kwargs = {"limit": limit} if limit is not None else {}
+
+        file_ids = self.get_file_ids(collection_name)
+        if file_ids is None:
+            return self.client.query(
+                collection_name=collection_name, filter=filter, **kwargs
+            )
+        if not file_ids:
+            return None
+
+        return self.client.query(
+            collection_name=self.collection_name,
+            filter=self._get_filter(file_ids, filter),
+            **kwargs,
+        )
+
+    def get(self, collection_name: str) -> Optional[GetResult]:
+        file_ids = self.get_file_ids(collection_name)
+        if file_ids is None:
+            return self.client.get(collection_name=collection_name)
+        if not file_ids:
+            return None
+
+        return self.client.query(
+            collection_name=self.collection_name,
+            filter=self._get_filter(file_ids),
+        )
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ) -> None:
+        file_ids = self.get_file_ids(collection_name)
+        if file_ids is None:
+            return self.client.delete(
+                collection_name=collection_name, ids=ids, filter=filter
+            )
+
+        if collection_name.startswith(FILE_COLLECTION_PREFIX):
+            self.client.delete(
+                collection_name=self.collection_name,
+                ids=ids,
+                filter=self._get_filter(file_ids, filter),
+            )
+        else:
+            log.debug(f"not deleting shared chunks of {collection_name}")
+
+    def reset(self) -> None:
+        return self.client.reset()
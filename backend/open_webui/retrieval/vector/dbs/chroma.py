@@ -30,6 +30,15 @@ log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
+def get_where(filter: Optional[dict]) -> Optional[dict]:
+    # Chroma only accepts a single condition unless they are combined explicitly
+    if not filter:
+        return None
+    if len(filter) == 1:
+        return filter
+    return {"$and": [{key: value} for key, value in filter.items()]}
+
+
 class ChromaClient(VectorDBBase):
     def __init__(self):
         settings_dict = {
@@ -71,7 +80,11 @@ class ChromaClient(VectorDBBase):
         return self.client.delete_collection(name=collection_name)
 
     def search(
-        self, collection_name: str, vectors: list[list[float | int]], limit: int
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        limit: int,
+        filter: Optional[dict] = None,
     ) -> Optional[SearchResult]:
         # Search for the nearest neighbor items based on the vectors and return 'limit' number of results.
         try:
@@ -80,6 +93,7 @@ class ChromaClient(VectorDBBase):
                 result = collection.query(
                     query_embeddings=vectors,
                     n_results=limit,
+                    where=get_where(filter),
                 )
 
                 # chromadb has cosine distance, 2 (worst) -> 0 (best). Re-odering to 0 -> 1
@@ -108,7 +122,7 @@ class ChromaClient(VectorDBBase):
             collection = self.client.get_collection(name=collection_name)
             if collection:
                 result = collection.get(
-                    where=filter,
+                    where=get_where(filter),
                     limit=limit,
                 )
 
@@ -185,7 +199,7 @@ class ChromaClient(VectorDBBase):
                 if ids:
                     collection.delete(ids=ids)
                 elif filter:
-                    collection.delete(where=filter)
+                    collection.delete(where=get_where(filter))
         except Exception as e:
             # If collection doesn't exist, that's fine - nothing to delete
             log.debug(
@@ -1,10 +1,11 @@
-from elasticsearch import Elasticsearch, BadRequestError
+from elasticsearch import AsyncElasticsearch, Elasticsearch, BadRequestError
 from typing import Optional
 import ssl
-from elasticsearch.helpers import bulk, scan
+from elasticsearch.helpers import async_scan, bulk, scan
 
 from open_webui.retrieval.vector.utils import process_metadata
 from open_webui.retrieval.vector.main import (
+    AsyncVectorDBAdapter,
     VectorDBBase,
     VectorItem,
     SearchResult,
@@ -32,7 +33,7 @@ class ElasticsearchClient(VectorDBBase):
 
     def __init__(self):
         self.index_prefix = ELASTICSEARCH_INDEX_PREFIX
-        self.client = Elasticsearch(
+        self.connection_kwargs = dict(
             hosts=[ELASTICSEARCH_URL],
             ca_certs=ELASTICSEARCH_CA_CERTS,
             api_key=ELASTICSEARCH_API_KEY,
@@ -44,6 +45,7 @@ class ElasticsearchClient(VectorDBBase):
             ),
             ssl_assert_fingerprint=SSL_ASSERT_FINGERPRINT,
         )
+        self.client = Elasticsearch(**self.connection_kwargs)
 
     # Status: works
     def _get_index_name(self, dimension: int) -> str:
@@ -133,12 +135,48 @@ class ElasticsearchClient(VectorDBBase):
         for i in range(0, len(items), batch_size):
             yield items[i : min(i + batch_size, len(items))]
 
-    # Status: works
-    def has_collection(self, collection_name) -> bool:
-        query_body = {"query": {"bool": {"filter": []}}}
+    def _collection_query(self, collection_name: str) -> dict:
+        return {
+            "query": {"bool": {"filter": [{"term": {"collection": collection_name}}]}}
+        }
+
+    def _search_query(
+        self, collection_name: str, vectors: list[list[float]], limit: int
+    ) -> dict:
+        return {
+            "size": limit,
+            "_source": ["text", "metadata"],
+            "query": {
+                "script_score": {
+                    "query": {
+                        "bool": {"filter": [{"term": {"collection": collection_name}}]}
+                    },
+                    "script": {
+                        "source": "cosineSimilarity(params.vector, 'vector') + 1.0",
+                        "params": {
+                            "vector": vectors[0]
+                        },  # Assuming single query vector
+                    },
+                }
+            },
+        }
+
+    def _filter_query(self, collection_name: str, filter: dict) -> dict:
+        query_body = {
+            "query": {"bool": {"filter": []}},
+            "_source": ["text", "metadata"],
+        }
+
+        for field, value in filter.items():
+            query_body["query"]["bool"]["filter"].append({"term": {field: value}})
         query_body["query"]["bool"]["filter"].append(
             {"term": {"collection": collection_name}}
         )
+        return query_body
+
+    # Status: works
+    def has_collection(self, collection_name) -> bool:
+        query_body = self._collection_query(collection_name)
 
         try:
             result = self.client.count(index=f"{self.index_prefix}*", body=query_body)
@@ -155,23 +193,7 @@ class ElasticsearchClient(VectorDBBase):
     def search(
         self, collection_name: str, vectors: list[list[float]], limit: int
     ) -> Optional[SearchResult]:
-        query = {
-            "size": limit,
-            "_source": ["text", "metadata"],
-            "query": {
-                "script_score": {
-                    "query": {
-                        "bool": {"filter": [{"term": {"collection": collection_name}}]}
-                    },
-                    "script": {
-                        "source": "cosineSimilarity(params.vector, 'vector') + 1.0",
-                        "params": {
-                            "vector": vectors[0]
-                        },  # Assuming single query vector
-                    },
-                }
-            },
-        }
+        query = self._search_query(collection_name, vectors, limit)
 
         result = self.client.search(
             index=self._get_index_name(len(vectors[0])), body=query
@@ -186,16 +208,7 @@ class ElasticsearchClient(VectorDBBase):
         if not self.has_collection(collection_name):
             return None
 
-        query_body = {
-            "query": {"bool": {"filter": []}},
-            "_source": ["text", "metadata"],
-        }
-
-        for field, value in filter.items():
-            query_body["query"]["bool"]["filter"].append({"term": {field: value}})
-        query_body["query"]["bool"]["filter"].append(
-            {"term": {"collection": collection_name}}
-        )
+        query_body = self._filter_query(collection_name, filter)
         size = limit if limit else 10
 
         try:
@@ -224,7 +237,7 @@ class ElasticsearchClient(VectorDBBase):
     def get(self, collection_name: str) -> Optional[GetResult]:
         # Get all the items in the collection.
         query = {
-            "query": {"bool": {"filter": [{"term": {"collection": collection_name}}]}},
+            **self._collection_query(collection_name),
             "_source": ["text", "metadata"],
         }
         results = list(scan(self.client, index=f"{self.index_prefix}*", query=query))
@@ -300,3 +313,67 @@ class ElasticsearchClient(VectorDBBase):
         indices = self.client.indices.get(index=f"{self.index_prefix}*")
         for index in indices:
             self.client.indices.delete(index=index)
+
+
+class AsyncElasticsearchClient(AsyncVectorDBAdapter):
+    """
+    Reads through AsyncElasticsearch. Writes happen in background jobs and
+    keep going through the synchronous client.
+    """
+
+    def __init__(self, client: ElasticsearchClient, max_workers: int):
+        super().__init__(client, max_workers)
+        self.index_prefix = client.index_prefix
+        self.async_client = AsyncElasticsearch(**client.connection_kwargs)
+
+    async def has_collection(self, collection_name) -> bool:
+        try:
+            result = await self.async_client.count(
+                index=f"{self.index_prefix}*",
+                body=self.client._collection_query(collection_name),
+            )
+            return result.body["count"] > 0
+        except Exception:
+            return None
+
+    async def search(
+        self,
+        collection_name: str,
+        vectors: list[list[float]],
+        limit: int,
+        filter: Optional[dict] = None,
+    ) -> Optional[SearchResult]:
+        result = await self.async_client.search(
+            index=self.client._get_index_name(len(vectors[0])),
+            body=self.client._search_query(collection_name, vectors, limit),
+        )
+        return self.client._result_to_search_result(result)
+
+    async def query(
+        self, collection_name: str, filter: dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        if not await self.has_collection(collection_name):
+            return None
+
+        try:
+            result = await self.async_client.search(
+                index=f"{self.index_prefix}*",
+                body=self.client._filter_query(collection_name, filter),
+                size=limit if limit else 10,
+            )
+            return self.client._result_to_get_result(result)
+        except Exception:
+            return None
+
+    async def get(self, collection_name: str) -> Optional[GetResult]:
+        query = {
+            **self.client._collection_query(collection_name),
+            "_source": ["text", "metadata"],
+        }
+        results = [
+            hit
+            async for hit in async_scan(
+                self.async_client, index=f"{self.index_prefix}*", query=query
+            )
+        ]
+        return self.client._scan_result_to_get_result(results)
@@ -24,6 +24,9 @@ from open_webui.config import (
     MILVUS_IVF_FLAT_NLIST,
     MILVUS_DISKANN_MAX_DEGREE,
     MILVUS_DISKANN_SEARCH_LIST_SIZE,
+    VECTOR_DB_QUANTIZATION,
+    VECTOR_DB_QUANTIZATION_RESCORE,
+    VECTOR_DB_QUANTIZATION_OVERSAMPLING,
 )
 from open_webui.env import SRC_LOG_LEVELS
 
@@ -31,7 +34,30 @@ log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
+def get_filter_expression(filter: dict) -> str:
+    conditions = []
+    for key, value in filter.items():
+        if isinstance(value, dict) and "$in" in value:
+            conditions.append(f'metadata["{key}"] in {json.dumps(value["$in"])}')
+        else:
+            conditions.append(f'metadata["{key}"] == {json.dumps(value)}')
+    return " && ".join(conditions)
+
+
+def get_index_type() -> str:
+    index_type = MILVUS_INDEX_TYPE.upper()
+    if VECTOR_DB_QUANTIZATION == "int8":
+        # Scalar quantized variants of the configured index
+        if index_type == "HNSW":
+            return "HNSW_SQ"
+        if index_type == "IVF_FLAT":
+            return "IVF_SQ8"
+    return index_type
+
+
 class MilvusClient(VectorDBBase):
+    supported_quantizations = ("int8",)
+
     def __init__(self):
         self.collection_prefix = "open_webui"
         if MILVUS_TOKEN is None:
@@ -118,7 +144,7 @@ class MilvusClient(VectorDBBase):
         index_params = self.client.prepare_index_params()
 
         # Use configurations from config.py
-        index_type = MILVUS_INDEX_TYPE.upper()
+        index_type = get_index_type()
         metric_type = MILVUS_METRIC_TYPE.upper()
 
         log.info(f"Using Milvus index type: {index_type}, metric type: {metric_type}")
@@ -130,9 +156,19 @@ class MilvusClient(VectorDBBase):
                 "efConstruction": MILVUS_HNSW_EFCONSTRUCTION,
             }
             log.info(f"HNSW params: {index_creation_params}")
-        elif index_type == "IVF_FLAT":
+        elif index_type == "HNSW_SQ":
+            index_creation_params = {
+                "M": MILVUS_HNSW_M,
+                "efConstruction": MILVUS_HNSW_EFCONSTRUCTION,
+                "sq_type": "SQ8",
+                # Keep full precision vectors to rescore candidates with
+                "refine": VECTOR_DB_QUANTIZATION_RESCORE,
+                **({"refine_type": "FP32"} if VECTOR_DB_QUANTIZATION_RESCORE else {}),
+            }
+            log.info(f"HNSW_SQ params: {index_creation_params}")
+        elif index_type in ["IVF_FLAT", "IVF_SQ8"]:
             index_creation_params = {"nlist": MILVUS_IVF_FLAT_NLIST}
-            log.info(f"IVF_FLAT params: {index_creation_params}")
+            log.info(f"{index_type} params: {index_creation_params}")
         elif index_type == "DISKANN":
             index_creation_params = {
                 "max_degree": MILVUS_DISKANN_MAX_DEGREE,
@@ -144,7 +180,7 @@ class MilvusClient(VectorDBBase):
         else:
             log.warning(
                 f"Unsupported MILVUS_INDEX_TYPE: '{index_type}'. "
-                f"Supported types: HNSW, IVF_FLAT, DISKANN, FLAT, AUTOINDEX. "
+                f"Supported types: HNSW, HNSW_SQ, IVF_FLAT, IVF_SQ8, DISKANN, FLAT, AUTOINDEX. "
                 f"Milvus will use its default for the collection if this type is not directly supported for index creation."
             )
             # For unsupported types, pass the type directly to Milvus; it might handle it or use a default.
@@ -181,19 +217,29 @@ class MilvusClient(VectorDBBase):
         )
 
     def search(
-        self, collection_name: str, vectors: list[list[float | int]], limit: int
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        limit: int,
+        filter: Optional[dict] = None,
     ) -> Optional[SearchResult]:
         # Search for the nearest neighbor items based on the vectors and return 'limit' number of results.
         collection_name = collection_name.replace("-", "_")
         # For some index types like IVF_FLAT, search params like nprobe can be set.
         # Example: search_params = {"nprobe": 10} if using IVF_FLAT
         # For simplicity, not adding configurable search_params here, but could be extended.
+        search_params = {}
+        if get_index_type() == "HNSW_SQ" and VECTOR_DB_QUANTIZATION_RESCORE:
+            search_params = {
+                "params": {"refine_k": VECTOR_DB_QUANTIZATION_OVERSAMPLING}
+            }
         result = self.client.search(
             collection_name=f"{self.collection_prefix}_{collection_name}",
             data=vectors,
             limit=limit,
+            filter=get_filter_expression(filter) if filter else "",
             output_fields=["data", "metadata"],
-            # search_params=search_params # Potentially add later if needed
+            search_params=search_params,
         )
         return self._result_to_search_result(result)
 
@@ -207,12 +253,7 @@ class MilvusClient(VectorDBBase):
                 f"Query attempted on non-existent collection: {self.collection_prefix}_{collection_name}"
             )
             return None
-        filter_string = " && ".join(
-            [
-                f'metadata["{key}"] == {json.dumps(value)}'
-                for key, value in filter.items()
-            ]
-        )
+        filter_string = get_filter_expression(filter)
 
         collection = Collection(f"{self.collection_prefix}_{collection_name}")
         collection.load()
@@ -354,12 +395,7 @@ class MilvusClient(VectorDBBase):
                 ids=ids,
             )
         elif filter:
-            filter_string = " && ".join(
-                [
-                    f'metadata["{key}"] == {json.dumps(value)}'
-                    for key, value in filter.items()
-                ]
-            )
+            filter_string = get_filter_expression(filter)
             log.info(
                 f"Deleting items by filter from {self.collection_prefix}_{collection_name}. Filter: {filter_string}"
             )
@@ -1,9 +1,10 @@
-from opensearchpy import OpenSearch
+from opensearchpy import AsyncOpenSearch, OpenSearch
 from opensearchpy.helpers import bulk
 from typing import Optional
 
 from open_webui.retrieval.vector.utils import process_metadata
 from open_webui.retrieval.vector.main import (
+    AsyncVectorDBAdapter,
     VectorDBBase,
     VectorItem,
     SearchResult,
@@ -21,12 +22,13 @@ from open_webui.config import (
 class OpenSearchClient(VectorDBBase):
     def __init__(self):
         self.index_prefix = "open_webui"
-        self.client = OpenSearch(
+        self.connection_kwargs = dict(
             hosts=[OPENSEARCH_URI],
             use_ssl=OPENSEARCH_SSL,
             verify_certs=OPENSEARCH_CERT_VERIFY,
             http_auth=(OPENSEARCH_USERNAME, OPENSEARCH_PASSWORD),
         )
+        self.client = OpenSearch(**self.connection_kwargs)
 
     def _get_index_name(self, collection_name: str) -> str:
         return f"{self.index_prefix}_{collection_name}"
@@ -102,6 +104,36 @@ class OpenSearchClient(VectorDBBase):
         for i in range(0, len(items), batch_size):
             yield items[i : i + batch_size]
 
+    def _search_query(self, vectors: list[list[float | int]], limit: int) -> dict:
+        return {
+            "size": limit,
+            "_source": ["text", "metadata"],
+            "query": {
+                "script_score": {
+                    "query": {"match_all": {}},
+                    "script": {
+                        "source": "(cosineSimilarity(params.query_value, doc[params.field]) + 1.0) / 2.0",
+                        "params": {
+                            "field": "vector",
+                            "query_value": vectors[0],
+                        },  # Assuming single query vector
+                    },
+                }
+            },
+        }
+
+    def _filter_query(self, filter: dict) -> dict:
+        query_body = {
+            "query": {"bool": {"filter": []}},
+            "_source": ["text", "metadata"],
+        }
+
+        for field, value in filter.items():
+            query_body["query"]["bool"]["filter"].append(
+                {"term": {"metadata." + str(field) + ".keyword": value}}
+            )
+        return query_body
+
     def has_collection(self, collection_name: str) -> bool:
         # has_collection here means has index.
         # We are simply adapting to the norms of the other DBs.
@@ -119,22 +151,7 @@ class OpenSearchClient(VectorDBBase):
             if not self.has_collection(collection_name):
                 return None
 
-            query = {
-                "size": limit,
-                "_source": ["text", "metadata"],
-                "query": {
-                    "script_score": {
-                        "query": {"match_all": {}},
-                        "script": {
-                            "source": "(cosineSimilarity(params.query_value, doc[params.field]) + 1.0) / 2.0",
-                            "params": {
-                                "field": "vector",
-                                "query_value": vectors[0],
-                            },  # Assuming single query vector
-                        },
-                    }
-                },
-            }
+            query = self._search_query(vectors, limit)
 
             result = self.client.search(
                 index=self._get_index_name(collection_name), body=query
@@ -151,16 +168,7 @@ class OpenSearchClient(VectorDBBase):
         if not self.has_collection(collection_name):
             return None
 
-        query_body = {
-            "query": {"bool": {"filter": []}},
-            "_source": ["text", "metadata"],
-        }
-
-        for field, value in filter.items():
-            query_body["query"]["bool"]["filter"].append(
-                {"term": {"metadata." + str(field) + ".keyword": value}}
-            )
-
+        query_body = self._filter_query(filter)
         size = limit if limit else 10000
 
         try:
@@ -265,3 +273,61 @@ class OpenSearchClient(VectorDBBase):
         indices = self.client.indices.get(index=f"{self.index_prefix}_*")
         for index in indices:
             self.client.indices.delete(index=index)
+
+
+class AsyncOpenSearchClient(AsyncVectorDBAdapter):
+    """
+    Reads through AsyncOpenSearch. Writes happen in background jobs and keep
+    going through the synchronous client.
+    """
+
+    def __init__(self, client: OpenSearchClient, max_workers: int):
+        super().__init__(client, max_workers)
+        self.async_client = AsyncOpenSearch(**client.connection_kwargs)
+
+    async def has_collection(self, collection_name: str) -> bool:
+        return await self.async_client.indices.exists(
+            index=self.client._get_index_name(collection_name)
+        )
+
+    async def search(
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        limit: int,
+        filter: Optional[dict] = None,
+    ) -> Optional[SearchResult]:
+        try:
+            if not await self.has_collection(collection_name):
+                return None
+
+            result = await self.async_client.search(
+                index=self.client._get_index_name(collection_name),
+                body=self.client._search_query(vectors, limit),
+            )
+            return self.client._result_to_search_result(result)
+        except Exception:
+            return None
+
+    async def query(
+        self, collection_name: str, filter: dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        if not await self.has_collection(collection_name):
+            return None
+
+        try:
+            result = await self.async_client.search(
+                index=self.client._get_index_name(collection_name),
+                body=self.client._filter_query(filter),
+                size=limit if limit else 10000,
+            )
+            return self.client._result_to_get_result(result)
+        except Exception:
+            return None
+
+    async def get(self, collection_name: str) -> Optional[GetResult]:
+        result = await self.async_client.search(
+            index=self.client._get_index_name(collection_name),
+            body={"query": {"match_all": {}}, "_source": ["text", "metadata"]},
+        )
+        return self.client._result_to_get_result(result)
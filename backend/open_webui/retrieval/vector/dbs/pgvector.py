@@ -1,4 +1,6 @@
 from typing import Optional, List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import logging
 import json
 from sqlalchemy import (
@@ -19,16 +21,20 @@ from sqlalchemy import (
 )
 from sqlalchemy.sql import true
 from sqlalchemy.pool import NullPool, QueuePool
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy import event
 
 from sqlalchemy.orm import declarative_base, scoped_session, sessionmaker
-from sqlalchemy.dialects.postgresql import JSONB, array
-from pgvector.sqlalchemy import Vector
+from sqlalchemy.dialects.postgresql import JSONB, array, insert as pg_insert
+from pgvector.sqlalchemy import BIT, HALFVEC, Vector
 from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.exc import NoSuchTableError
 
 
 from open_webui.retrieval.vector.utils import process_metadata
 from open_webui.retrieval.vector.main import (
+    AsyncVectorDBAdapter,
     VectorDBBase,
     VectorItem,
     SearchResult,
@@ -44,6 +50,19 @@ from open_webui.config import (
     PGVECTOR_POOL_MAX_OVERFLOW,
     PGVECTOR_POOL_TIMEOUT,
     PGVECTOR_POOL_RECYCLE,
+    PGVECTOR_WRITE_BATCH_SIZE,
+    PGVECTOR_INDEX_METHOD,
+    PGVECTOR_HNSW_M,
+    PGVECTOR_HNSW_EF_CONSTRUCTION,
+    PGVECTOR_HNSW_EF_SEARCH,
+    PGVECTOR_HNSW_ITERATIVE_SCAN,
+    PGVECTOR_IVFFLAT_LISTS,
+    PGVECTOR_IVFFLAT_PROBES,
+    PGVECTOR_EXACT_SEARCH_THRESHOLD,
+    PGVECTOR_PARTIAL_INDEX_THRESHOLD,
+    VECTOR_DB_QUANTIZATION,
+    VECTOR_DB_QUANTIZATION_RESCORE,
+    VECTOR_DB_QUANTIZATION_OVERSAMPLING,
 )
 
 from open_webui.env import SRC_LOG_LEVELS
@@ -63,6 +82,79 @@ def pgcrypto_decrypt(col, key, outtype="text"):
     return func.cast(func.pgp_sym_decrypt(col, literal(key)), outtype)
 
 
+def metadata_conditions(vmetadata, filter: Dict[str, Any]) -> list:
+    conditions = []
+    for key, value in filter.items():
+        if isinstance(value, dict) and "$in" in value:
+            conditions.append(
+                vmetadata[key].astext.in_([str(item) for item in value["$in"]])
+            )
+        else:
+            conditions.append(vmetadata[key].astext == str(value))
+    return conditions
+
+
+def get_quantization() -> str:
+    if VECTOR_DB_QUANTIZATION in PgvectorClient.supported_quantizations:
+        return VECTOR_DB_QUANTIZATION
+    return ""
+
+
+def quantize(vector):
+    """
+    Reduced-precision form of a vector column or expression. Vectors are
+    always stored in full precision; only the index is built over this form.
+    """
+    quantization = get_quantization()
+    if quantization == "float16":
+        return cast(vector, HALFVEC(VECTOR_LENGTH))
+    if quantization == "binary":
+        return cast(func.binary_quantize(vector), BIT(VECTOR_LENGTH))
+    return vector
+
+
+def quantized_distance(vector, query_vector):
+    if get_quantization() == "binary":
+        return quantize(vector).hamming_distance(quantize(query_vector))
+    return quantize(vector).cosine_distance(quantize(query_vector))
+
+
+def get_vector_index_method() -> str:
+    quantization = get_quantization()
+    if quantization == "float16":
+        operator_class = f"(vector::halfvec({VECTOR_LENGTH})) halfvec_cosine_ops"
+    elif quantization == "binary":
+        operator_class = (
+            f"(binary_quantize(vector)::bit({VECTOR_LENGTH})) bit_hamming_ops"
+        )
+    else:
+        operator_class = "vector vector_cosine_ops"
+
+    if PGVECTOR_INDEX_METHOD == "hnsw":
+        return (
+            f"hnsw ({operator_class}) "
+            f"WITH (m = {PGVECTOR_HNSW_M}, ef_construction = {PGVECTOR_HNSW_EF_CONSTRUCTION})"
+        )
+    return f"ivfflat ({operator_class}) WITH (lists = {PGVECTOR_IVFFLAT_LISTS})"
+
+
+def get_vector_index_name() -> str:
+    # Switching the index method or quantization builds a new index next to
+    # the existing one, which is dropped once the new one is valid
+    name = "idx_document_chunk_vector"
+    if PGVECTOR_INDEX_METHOD == "hnsw":
+        name += "_hnsw"
+    if get_quantization():
+        name += f"_{get_quantization()}"
+    return name
+
+
+def get_partial_index_name(collection_name: str) -> str:
+    # Collection names can't be used in identifiers as-is
+    key = f"{collection_name}:{PGVECTOR_INDEX_METHOD}:{get_quantization()}"
+    return f"idx_document_chunk_partial_{hashlib.sha1(key.encode()).hexdigest()[:16]}"
+
+
 class DocumentChunk(Base):
     __tablename__ = "document_chunk"
 
@@ -79,6 +171,8 @@ class DocumentChunk(Base):
 
 
 class PgvectorClient(VectorDBBase):
+    supported_quantizations = ("float16", "binary")
+
     def __init__(self) -> None:
 
         # if no pgvector uri, use the existing database connection
@@ -157,13 +251,6 @@ class PgvectorClient(VectorDBBase):
             connection = self.session.connection()
             Base.metadata.create_all(bind=connection)
 
-            # Create an index on the vector column if it doesn't exist
-            self.session.execute(
-                text(
-                    "CREATE INDEX IF NOT EXISTS idx_document_chunk_vector "
-                    "ON document_chunk USING ivfflat (vector vector_cosine_ops) WITH (lists = 100);"
-                )
-            )
             self.session.execute(
                 text(
                     "CREATE INDEX IF NOT EXISTS idx_document_chunk_collection_name "
@@ -171,12 +258,192 @@ class PgvectorClient(VectorDBBase):
                 )
             )
             self.session.commit()
+
+            # Collections whose partial index exists or is being built
+            self.partial_indexes = set()
+            self.index_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="pgvector-index"
+            )
+            # Building the vector index can take a long time on a large table
+            self.index_executor.submit(self.build_vector_index)
             log.info("Initialization complete.")
         except Exception as e:
             self.session.rollback()
             log.exception(f"Error during initialization: {e}")
             raise
 
+    def count_chunks_statement(self, collection_name: str, limit: int):
+        """Count the chunks of a collection, stopping at limit."""
+        chunks = (
+            select(literal(1))
+            .where(DocumentChunk.collection_name == collection_name)
+            .limit(limit)
+            .subquery()
+        )
+        return select(func.count()).select_from(chunks)
+
+    def count_chunks(self, collection_name: str, limit: int) -> int:
+        return self.session.execute(
+            self.count_chunks_statement(collection_name, limit)
+        ).scalar()
+
+    def ensure_partial_index(self, collection_name: str) -> None:
+        """
+        Give large collections their own ANN index so searches don't have to
+        filter the neighbours found in the index shared by all collections.
+        The index is built in the background, without blocking writes.
+        """
+        if (
+            PGVECTOR_PARTIAL_INDEX_THRESHOLD <= 0
+            or collection_name in self.partial_indexes
+        ):
+            return
+
+        index_name = get_partial_index_name(collection_name)
+        try:
+            valid = self.session.execute(
+                text(
+                    "SELECT indisvalid FROM pg_index "
+                    "WHERE indexrelid = to_regclass(:name)"
+                ),
+                {"name": index_name},
+            ).scalar()
+            if not valid and (
+                self.count_chunks(collection_name, PGVECTOR_PARTIAL_INDEX_THRESHOLD)
+                < PGVECTOR_PARTIAL_INDEX_THRESHOLD
+            ):
+                self.session.rollback()
+                return
+            self.session.rollback()
+        except Exception as e:
+            self.session.rollback()
+            log.exception(f"Error checking partial index for '{collection_name}': {e}")
+            return
+
+        self.partial_indexes.add(collection_name)
+        if not valid:
+            self.index_executor.submit(
+                self.build_partial_index, collection_name, index_name
+            )
+
+    def build_index(self, index_name: str, definition: str) -> bool:
+        """
+        Create an index without blocking writes. Only one worker builds it,
+        the others skip it. Returns whether the index is valid.
+        """
+        # CONCURRENTLY can't run inside a transaction
+        with (
+            self.session.get_bind()
+            .connect()
+            .execution_options(isolation_level="AUTOCOMMIT") as connection
+        ):
+            locked = connection.execute(
+                text("SELECT pg_try_advisory_lock(hashtext(:name))"),
+                {"name": index_name},
+            ).scalar()
+            if not locked:
+                return False
+
+            try:
+                valid = connection.execute(
+                    text(
+                        "SELECT indisvalid FROM pg_index "
+                        "WHERE indexrelid = to_regclass(:name)"
+                    ),
+                    {"name": index_name},
+                ).scalar()
+                if valid:
+                    return True
+                if valid is not None:
+                    # Left over by an interrupted build
+                    connection.exec_driver_sql(
+                        f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"
+                    )
+
+                log.info(f"Creating index {index_name}")
+                try:
+                    connection.exec_driver_sql(
+                        f"CREATE INDEX CONCURRENTLY {index_name} {definition}"
+                    )
+                except Exception:
+                    connection.exec_driver_sql(
+                        f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"
+                    )
+                    raise
+                return True
+            finally:
+                connection.execute(
+                    text("SELECT pg_advisory_unlock(hashtext(:name))"),
+                    {"name": index_name},
+                )
+
+    def build_vector_index(self) -> None:
+        """
+        Build the vector index shared by all collections, then drop the ones
+        built with a previous index method or quantization.
+        """
+        index_name = get_vector_index_name()
+        try:
+            if not self.build_index(
+                index_name, f"ON document_chunk USING {get_vector_index_method()}"
+            ):
+                return
+
+            with (
+                self.session.get_bind()
+                .connect()
+                .execution_options(isolation_level="AUTOCOMMIT") as connection
+            ):
+                superseded = connection.execute(
+                    text(
+                        "SELECT indexname FROM pg_indexes "
+                        "WHERE tablename = 'document_chunk' "
+                        "AND indexname LIKE 'idx_document_chunk_vector%' "
+                        "AND indexname != :name"
+                    ),
+                    {"name": index_name},
+                ).scalars()
+                for superseded_name in list(superseded):
+                    log.info(f"Dropping superseded vector index {superseded_name}")
+                    connection.exec_driver_sql(
+                        f"DROP INDEX CONCURRENTLY IF EXISTS {superseded_name}"
+                    )
+        except Exception as e:
+            # Retried on the next start
+            log.exception(f"Error creating vector index: {e}")
+
+    def build_partial_index(self, collection_name: str, index_name: str) -> None:
+        escaped_collection_name = collection_name.replace("'", "''")
+        try:
+            self.build_index(
+                index_name,
+                f"ON document_chunk USING {get_vector_index_method()} "
+                f"WHERE collection_name = '{escaped_collection_name}'",
+            )
+        except Exception as e:
+            # Retried on the next write to the collection
+            self.partial_indexes.discard(collection_name)
+            log.exception(f"Error creating partial index for '{collection_name}': {e}")
+
+    def search_parameters(self, exact: bool) -> list:
+        # SET LOCAL only lasts until the end of the search transaction
+        if exact:
+            return []
+        if PGVECTOR_INDEX_METHOD == "hnsw":
+            parameters = [text(f"SET LOCAL hnsw.ef_search = {PGVECTOR_HNSW_EF_SEARCH}")]
+            if PGVECTOR_HNSW_ITERATIVE_SCAN in ("relaxed_order", "strict_order"):
+                parameters.append(
+                    text(
+                        f"SET LOCAL hnsw.iterative_scan = {PGVECTOR_HNSW_ITERATIVE_SCAN}"
+                    )
+                )
+            return parameters
+        return [text(f"SET LOCAL ivfflat.probes = {PGVECTOR_IVFFLAT_PROBES}")]
+
+    def set_search_parameters(self, exact: bool) -> None:
+        for parameter in self.search_parameters(exact):
+            self.session.execute(parameter)
+
     def check_vector_length(self) -> None:
         """
         Check if the VECTOR_LENGTH matches the existing vector column dimension in the database.
@@ -223,56 +490,65 @@ class PgvectorClient(VectorDBBase):
             vector = vector[:VECTOR_LENGTH]
         return vector
 
-    def insert(self, collection_name: str, items: List[VectorItem]) -> None:
-        try:
+    def _get_chunk_rows(
+        self, collection_name: str, items: List[VectorItem]
+    ) -> List[Dict[str, Any]]:
+        rows = {}
+        for item in items:
+            vector = self.adjust_vector_length(item["vector"])
             if PGVECTOR_PGCRYPTO:
-                for item in items:
-                    vector = self.adjust_vector_length(item["vector"])
-                    # Use raw SQL for BYTEA/pgcrypto
-                    # Ensure metadata is converted to its JSON text representation
-                    json_metadata = json.dumps(item["metadata"])
-                    self.session.execute(
-                        text(
-                            """
-                            INSERT INTO document_chunk
-                            (id, vector, collection_name, text, vmetadata)
-                            VALUES (
-                                :id, :vector, :collection_name,
-                                pgp_sym_encrypt(:text, :key),
-                                pgp_sym_encrypt(:metadata_text, :key)
-                            )
-                            ON CONFLICT (id) DO NOTHING
-                        """
-                        ),
-                        {
-                            "id": item["id"],
-                            "vector": vector,
-                            "collection_name": collection_name,
-                            "text": item["text"],
-                            "metadata_text": json_metadata,
-                            "key": PGVECTOR_PGCRYPTO_KEY,
-                        },
-                    )
-                self.session.commit()
-                log.info(f"Encrypted & inserted {len(items)} into '{collection_name}'")
-
+                text_value = pgcrypto_encrypt(item["text"], PGVECTOR_PGCRYPTO_KEY)
+                # Ensure metadata is converted to its JSON text representation
+                metadata_value = pgcrypto_encrypt(
+                    json.dumps(item["metadata"]), PGVECTOR_PGCRYPTO_KEY
+                )
             else:
-                new_items = []
-                for item in items:
-                    vector = self.adjust_vector_length(item["vector"])
-                    new_chunk = DocumentChunk(
-                        id=item["id"],
-                        vector=vector,
-                        collection_name=collection_name,
-                        text=item["text"],
-                        vmetadata=process_metadata(item["metadata"]),
-                    )
-                    new_items.append(new_chunk)
-                self.session.bulk_save_objects(new_items)
-                self.session.commit()
-                log.info(
-                    f"Inserted {len(new_items)} items into collection '{collection_name}'."
+                text_value = item["text"]
+                metadata_value = process_metadata(item["metadata"])
+
+            # A single statement can't touch the same row twice, keep the last
+            rows[item["id"]] = {
+                "id": item["id"],
+                "vector": vector,
+                "collection_name": collection_name,
+                "text": text_value,
+                "vmetadata": metadata_value,
+            }
+        return list(rows.values())
+
+    def _write_chunks(
+        self, collection_name: str, items: List[VectorItem], update: bool
+    ) -> None:
+        rows = self._get_chunk_rows(collection_name, items)
+
+        # Multi-row INSERT ... VALUES in fixed-size batches, one transaction
+        for i in range(0, len(rows), PGVECTOR_WRITE_BATCH_SIZE):
+            stmt = pg_insert(DocumentChunk).values(
+                rows[i : i + PGVECTOR_WRITE_BATCH_SIZE]
+            )
+            if update:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[DocumentChunk.id],
+                    set_={
+                        "vector": stmt.excluded.vector,
+                        "collection_name": stmt.excluded.collection_name,
+                        "text": stmt.excluded.text,
+                        "vmetadata": stmt.excluded.vmetadata,
+                    },
                 )
+            elif PGVECTOR_PGCRYPTO:
+                stmt = stmt.on_conflict_do_nothing(index_elements=[DocumentChunk.id])
+            self.session.execute(stmt)
+        self.session.commit()
+
+        self.ensure_partial_index(collection_name)
+
+    def insert(self, collection_name: str, items: List[VectorItem]) -> None:
+        try:
+            self._write_chunks(collection_name, items, update=False)
+            log.info(
+                f"Inserted {len(items)} items into collection '{collection_name}'."
+            )
         except Exception as e:
             self.session.rollback()
             log.exception(f"Error during insert: {e}")
@@ -280,177 +556,202 @@ class PgvectorClient(VectorDBBase):
 
     def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
         try:
-            if PGVECTOR_PGCRYPTO:
-                for item in items:
-                    vector = self.adjust_vector_length(item["vector"])
-                    json_metadata = json.dumps(item["metadata"])
-                    self.session.execute(
-                        text(
-                            """
-                            INSERT INTO document_chunk
-                            (id, vector, collection_name, text, vmetadata)
-                            VALUES (
-                                :id, :vector, :collection_name,
-                                pgp_sym_encrypt(:text, :key),
-                                pgp_sym_encrypt(:metadata_text, :key)
-                            )
-                            ON CONFLICT (id) DO UPDATE SET
-                              vector = EXCLUDED.vector,
-                              collection_name = EXCLUDED.collection_name,
-                              text = EXCLUDED.text,
-                              vmetadata = EXCLUDED.vmetadata
-                        """
-                        ),
-                        {
-                            "id": item["id"],
-                            "vector": vector,
-                            "collection_name": collection_name,
-                            "text": item["text"],
-                            "metadata_text": json_metadata,
-                            "key": PGVECTOR_PGCRYPTO_KEY,
-                        },
-                    )
-                self.session.commit()
-                log.info(f"Encrypted & upserted {len(items)} into '{collection_name}'")
-            else:
-                for item in items:
-                    vector = self.adjust_vector_length(item["vector"])
-                    existing = (
-                        self.session.query(DocumentChunk)
-                        .filter(DocumentChunk.id == item["id"])
-                        .first()
-                    )
-                    if existing:
-                        existing.vector = vector
-                        existing.text = item["text"]
-                        existing.vmetadata = process_metadata(item["metadata"])
-                        existing.collection_name = (
-                            collection_name  # Update collection_name if necessary
-                        )
-                    else:
-                        new_chunk = DocumentChunk(
-                            id=item["id"],
-                            vector=vector,
-                            collection_name=collection_name,
-                            text=item["text"],
-                            vmetadata=process_metadata(item["metadata"]),
-                        )
-                        self.session.add(new_chunk)
-                self.session.commit()
-                log.info(
-                    f"Upserted {len(items)} items into collection '{collection_name}'."
-                )
+            self._write_chunks(collection_name, items, update=True)
+            log.info(
+                f"Upserted {len(items)} items into collection '{collection_name}'."
+            )
         except Exception as e:
             self.session.rollback()
             log.exception(f"Error during upsert: {e}")
             raise
 
-    def search(
+    def search_statement(
         self,
         collection_name: str,
         vectors: List[List[float]],
-        limit: Optional[int] = None,
-    ) -> Optional[SearchResult]:
-        try:
-            if not vectors:
-                return None
+        limit: Optional[int],
+        filter: Optional[Dict[str, Any]],
+        exact: bool,
+    ):
+        """Build the search query for vectors already adjusted to VECTOR_LENGTH."""
 
-            # Adjust query vectors to VECTOR_LENGTH
-            vectors = [self.adjust_vector_length(vector) for vector in vectors]
-            num_queries = len(vectors)
-
-            def vector_expr(vector):
-                return cast(array(vector), Vector(VECTOR_LENGTH))
-
-            # Create the values for query vectors
-            qid_col = column("qid", Integer)
-            q_vector_col = column("q_vector", Vector(VECTOR_LENGTH))
-            query_vectors = (
-                values(qid_col, q_vector_col)
-                .data(
-                    [(idx, vector_expr(vector)) for idx, vector in enumerate(vectors)]
+        def vector_expr(vector):
+            return cast(array(vector), Vector(VECTOR_LENGTH))
+
+        # Create the values for query vectors
+        qid_col = column("qid", Integer)
+        q_vector_col = column("q_vector", Vector(VECTOR_LENGTH))
+        query_vectors = (
+            values(qid_col, q_vector_col)
+            .data([(idx, vector_expr(vector)) for idx, vector in enumerate(vectors)])
+            .alias("query_vectors")
+        )
+
+        result_fields = [
+            DocumentChunk.id,
+        ]
+        if PGVECTOR_PGCRYPTO:
+            result_fields.append(
+                pgcrypto_decrypt(DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text).label(
+                    "text"
                 )
-                .alias("query_vectors")
             )
+            result_fields.append(
+                pgcrypto_decrypt(
+                    DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
+                ).label("vmetadata")
+            )
+        else:
+            result_fields.append(DocumentChunk.text)
+            result_fields.append(DocumentChunk.vmetadata)
+        result_fields.append(
+            (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector)).label(
+                "distance"
+            )
+        )
 
-            result_fields = [
-                DocumentChunk.id,
-            ]
-            if PGVECTOR_PGCRYPTO:
-                result_fields.append(
-                    pgcrypto_decrypt(
-                        DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text
-                    ).label("text")
-                )
-                result_fields.append(
+        order_by = DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector)
+        if exact:
+            # An expression the vector index can't serve forces a sequential scan
+            order_by = order_by + 0
+        elif get_quantization():
+            # Candidates come from the index over the quantized vectors
+            order_by = quantized_distance(
+                DocumentChunk.vector, query_vectors.c.q_vector
+            )
+
+        where_clauses = [DocumentChunk.collection_name == collection_name]
+        if filter:
+            where_clauses += metadata_conditions(
+                (
                     pgcrypto_decrypt(
                         DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
-                    ).label("vmetadata")
-                )
-            else:
-                result_fields.append(DocumentChunk.text)
-                result_fields.append(DocumentChunk.vmetadata)
-            result_fields.append(
-                (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector)).label(
-                    "distance"
-                )
+                    )
+                    if PGVECTOR_PGCRYPTO
+                    else DocumentChunk.vmetadata
+                ),
+                filter,
             )
 
-            # Build the lateral subquery for each query vector
+        # Build the lateral subquery for each query vector
+        subq = select(*result_fields).where(*where_clauses).order_by(order_by)
+        if (
+            not exact
+            and get_quantization()
+            and VECTOR_DB_QUANTIZATION_RESCORE
+            and limit is not None
+        ):
+            # Fetch extra candidates by quantized distance, then keep the
+            # closest ones by full precision distance
+            candidates = (
+                subq.correlate(query_vectors)
+                .limit(max(limit, int(limit * VECTOR_DB_QUANTIZATION_OVERSAMPLING)))
+                .lateral("candidates")
+            )
             subq = (
-                select(*result_fields)
-                .where(DocumentChunk.collection_name == collection_name)
-                .order_by(
-                    (DocumentChunk.vector.cosine_distance(query_vectors.c.q_vector))
-                )
+                select(candidates)
+                .order_by(candidates.c.distance)
+                .limit(limit)
+                .lateral("result")
             )
+        else:
             if limit is not None:
                 subq = subq.limit(limit)
             subq = subq.lateral("result")
 
-            # Build the main query by joining query_vectors and the lateral subquery
-            stmt = (
-                select(
-                    query_vectors.c.qid,
-                    subq.c.id,
-                    subq.c.text,
-                    subq.c.vmetadata,
-                    subq.c.distance,
-                )
-                .select_from(query_vectors)
-                .join(subq, true())
-                .order_by(query_vectors.c.qid, subq.c.distance)
+        # Build the main query by joining query_vectors and the lateral subquery
+        stmt = (
+            select(
+                query_vectors.c.qid,
+                subq.c.id,
+                subq.c.text,
+                subq.c.vmetadata,
+                subq.c.distance,
             )
+            .select_from(query_vectors)
+            .join(subq, true())
+            .order_by(query_vectors.c.qid, subq.c.distance)
+        )
 
-            result_proxy = self.session.execute(stmt)
-            results = result_proxy.all()
+        return stmt
 
-            ids = [[] for _ in range(num_queries)]
-            distances = [[] for _ in range(num_queries)]
-            documents = [[] for _ in range(num_queries)]
-            metadatas = [[] for _ in range(num_queries)]
+    def chunks_statement(
+        self,
+        collection_name: str,
+        filter: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+    ):
+        if PGVECTOR_PGCRYPTO:
+            vmetadata = pgcrypto_decrypt(
+                DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
+            )
+            columns = [
+                DocumentChunk.id,
+                pgcrypto_decrypt(DocumentChunk.text, PGVECTOR_PGCRYPTO_KEY, Text).label(
+                    "text"
+                ),
+                vmetadata.label("vmetadata"),
+            ]
+        else:
+            vmetadata = DocumentChunk.vmetadata
+            columns = [DocumentChunk.id, DocumentChunk.text, DocumentChunk.vmetadata]
 
-            if not results:
-                return SearchResult(
-                    ids=ids,
-                    distances=distances,
-                    documents=documents,
-                    metadatas=metadatas,
-                )
+        where_clauses = [DocumentChunk.collection_name == collection_name]
+        if filter:
+            where_clauses += metadata_conditions(vmetadata, filter)
 
-            for row in results:
-                qid = int(row.qid)
-                ids[qid].append(row.id)
-                # normalize and re-orders pgvec distance from [2, 0] to [0, 1] score range
-                # https://github.com/pgvector/pgvector?tab=readme-ov-file#querying
-                distances[qid].append((2.0 - row.distance) / 2.0)
-                documents[qid].append(row.text)
-                metadatas[qid].append(row.vmetadata)
+        stmt = select(*columns).where(*where_clauses)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return stmt
 
-            self.session.rollback()  # read-only transaction
-            return SearchResult(
-                ids=ids, distances=distances, documents=documents, metadatas=metadatas
+    def search_result(self, results, num_queries: int) -> SearchResult:
+        ids = [[] for _ in range(num_queries)]
+        distances = [[] for _ in range(num_queries)]
+        documents = [[] for _ in range(num_queries)]
+        metadatas = [[] for _ in range(num_queries)]
+
+        for row in results:
+            qid = int(row.qid)
+            ids[qid].append(row.id)
+            # normalize and re-orders pgvec distance from [2, 0] to [0, 1] score range
+            # https://github.com/pgvector/pgvector?tab=readme-ov-file#querying
+            distances[qid].append((2.0 - row.distance) / 2.0)
+            documents[qid].append(row.text)
+            metadatas[qid].append(row.vmetadata)
+
+        return SearchResult(
+            ids=ids, distances=distances, documents=documents, metadatas=metadatas
+        )
+
+    def search(
+        self,
+        collection_name: str,
+        vectors: List[List[float]],
+        limit: Optional[int] = None,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> Optional[SearchResult]:
+        try:
+            if not vectors:
+                return None
+
+            # Adjust query vectors to VECTOR_LENGTH
+            vectors = [self.adjust_vector_length(vector) for vector in vectors]
+
+            # Small collections are cheap to scan exactly, and an ANN index
+            # shared with every other collection would miss most of their rows
+            exact = (
+                PGVECTOR_EXACT_SEARCH_THRESHOLD > 0
+                and self.count_chunks(collection_name, PGVECTOR_EXACT_SEARCH_THRESHOLD)
+                < PGVECTOR_EXACT_SEARCH_THRESHOLD
             )
+            self.set_search_parameters(exact)
+
+            stmt = self.search_statement(collection_name, vectors, limit, filter, exact)
+            results = self.session.execute(stmt).all()
+
+            self.session.rollback()  # read-only transaction
+            return self.search_result(results, len(vectors))
         except Exception as e:
             self.session.rollback()
             log.exception(f"Error during search: {e}")
@@ -463,14 +764,13 @@ class PgvectorClient(VectorDBBase):
             if PGVECTOR_PGCRYPTO:
                 # Build where clause for vmetadata filter
                 where_clauses = [DocumentChunk.collection_name == collection_name]
-                for key, value in filter.items():
-                    # decrypt then check key: JSON filter after decryption
-                    where_clauses.append(
-                        pgcrypto_decrypt(
-                            DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
-                        )[key].astext
-                        == str(value)
-                    )
+                # decrypt then check key: JSON filter after decryption
+                where_clauses += metadata_conditions(
+                    pgcrypto_decrypt(
+                        DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
+                    ),
+                    filter,
+                )
                 stmt = select(
                     DocumentChunk.id,
                     pgcrypto_decrypt(
@@ -488,10 +788,9 @@ class PgvectorClient(VectorDBBase):
                     DocumentChunk.collection_name == collection_name
                 )
 
-                for key, value in filter.items():
-                    query = query.filter(
-                        DocumentChunk.vmetadata[key].astext == str(value)
-                    )
+                query = query.filter(
+                    *metadata_conditions(DocumentChunk.vmetadata, filter)
+                )
 
                 if limit is not None:
                     query = query.limit(limit)
@@ -566,19 +865,26 @@ class PgvectorClient(VectorDBBase):
         ids: Optional[List[str]] = None,
         filter: Optional[Dict[str, Any]] = None,
     ) -> None:
+        if ids and len(ids) > PGVECTOR_WRITE_BATCH_SIZE:
+            # Keep the IN lists (and the rows locked per transaction) bounded
+            for i in range(0, len(ids), PGVECTOR_WRITE_BATCH_SIZE):
+                self.delete(
+                    collection_name, ids[i : i + PGVECTOR_WRITE_BATCH_SIZE], filter
+                )
+            return
+
         try:
             if PGVECTOR_PGCRYPTO:
                 wheres = [DocumentChunk.collection_name == collection_name]
                 if ids:
                     wheres.append(DocumentChunk.id.in_(ids))
                 if filter:
-                    for key, value in filter.items():
-                        wheres.append(
-                            pgcrypto_decrypt(
-                                DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
-                            )[key].astext
-                            == str(value)
-                        )
+                    wheres += metadata_conditions(
+                        pgcrypto_decrypt(
+                            DocumentChunk.vmetadata, PGVECTOR_PGCRYPTO_KEY, JSONB
+                        ),
+                        filter,
+                    )
                 stmt = DocumentChunk.__table__.delete().where(*wheres)
                 result = self.session.execute(stmt)
                 deleted = result.rowcount
@@ -589,10 +895,9 @@ class PgvectorClient(VectorDBBase):
                 if ids:
                     query = query.filter(DocumentChunk.id.in_(ids))
                 if filter:
-                    for key, value in filter.items():
-                        query = query.filter(
-                            DocumentChunk.vmetadata[key].astext == str(value)
-                        )
+                    query = query.filter(
+                        *metadata_conditions(DocumentChunk.vmetadata, filter)
+                    )
                 deleted = query.delete(synchronize_session=False)
             self.session.commit()
             log.info(f"Deleted {deleted} items from collection '{collection_name}'.")
@@ -604,7 +909,17 @@ class PgvectorClient(VectorDBBase):
     def reset(self) -> None:
         try:
             deleted = self.session.query(DocumentChunk).delete()
+            partial_indexes = self.session.execute(
+                text(
+                    "SELECT indexname FROM pg_indexes "
+                    "WHERE tablename = 'document_chunk' "
+                    "AND indexname LIKE 'idx_document_chunk_partial_%'"
+                )
+            ).scalars()
+            for index_name in list(partial_indexes):
+                self.session.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
             self.session.commit()
+            self.partial_indexes.clear()
             log.info(
                 f"Reset complete. Deleted {deleted} items from 'document_chunk' table."
             )
@@ -633,4 +948,144 @@ class PgvectorClient(VectorDBBase):
 
     def delete_collection(self, collection_name: str) -> None:
         self.delete(collection_name)
+        if PGVECTOR_PARTIAL_INDEX_THRESHOLD > 0:
+            try:
+                self.session.execute(
+                    text(
+                        f"DROP INDEX IF EXISTS {get_partial_index_name(collection_name)}"
+                    )
+                )
+                self.session.commit()
+                self.partial_indexes.discard(collection_name)
+            except Exception as e:
+                self.session.rollback()
+                log.exception(f"Error dropping partial index: {e}")
         log.info(f"Collection '{collection_name}' deleted.")
+
+
+def get_async_database_url() -> URL:
+    url = make_url(PGVECTOR_DB_URL).set(drivername="postgresql+asyncpg")
+    if "sslmode" in url.query:
+        # asyncpg takes the libpq sslmode values as "ssl"
+        url = url.update_query_dict({"ssl": url.query["sslmode"]})
+        url = url.difference_update_query(["sslmode"])
+    return url
+
+
+class AsyncPgvectorClient(AsyncVectorDBAdapter):
+    """
+    Reads through an asyncpg engine, sharing the statements built by
+    PgvectorClient. Writes happen in background jobs and keep going through
+    the synchronous client.
+    """
+
+    def __init__(self, client: PgvectorClient, max_workers: int):
+        super().__init__(client, max_workers)
+
+        if isinstance(PGVECTOR_POOL_SIZE, int) and PGVECTOR_POOL_SIZE > 0:
+            pool_kwargs = dict(
+                pool_size=PGVECTOR_POOL_SIZE,
+                max_overflow=PGVECTOR_POOL_MAX_OVERFLOW,
+                pool_timeout=PGVECTOR_POOL_TIMEOUT,
+                pool_recycle=PGVECTOR_POOL_RECYCLE,
+            )
+        elif isinstance(PGVECTOR_POOL_SIZE, int):
+            pool_kwargs = dict(poolclass=NullPool)
+        else:
+            pool_kwargs = {}
+
+        self.engine = create_async_engine(
+            get_async_database_url(), pool_pre_ping=True, **pool_kwargs
+        )
+
+        from pgvector.asyncpg import register_vector
+
+        @event.listens_for(self.engine.sync_engine, "connect")
+        def connect(dbapi_connection, connection_record):
+            dbapi_connection.run_async(register_vector)
+
+        self.session = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def has_collection(self, collection_name: str) -> bool:
+        try:
+            # Sessions are rolled back on close, reads need no commit
+            async with self.session() as session:
+                result = await session.execute(
+                    select(DocumentChunk.id)
+                    .where(DocumentChunk.collection_name == collection_name)
+                    .limit(1)
+                )
+                return result.first() is not None
+        except Exception as e:
+            log.exception(f"Error checking collection existence: {e}")
+            return False
+
+    async def search(
+        self,
+        collection_name: str,
+        vectors: List[List[float]],
+        limit: Optional[int] = None,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> Optional[SearchResult]:
+        if not vectors:
+            return None
+
+        try:
+            vectors = [self.client.adjust_vector_length(vector) for vector in vectors]
+            async with self.session() as session:
+                exact = (
+                    PGVECTOR_EXACT_SEARCH_THRESHOLD > 0
+                    and (
+                        await session.execute(
+                            self.client.count_chunks_statement(
+                                collection_name, PGVECTOR_EXACT_SEARCH_THRESHOLD
+                            )
+                        )
+                    ).scalar()
+                    < PGVECTOR_EXACT_SEARCH_THRESHOLD
+                )
+
+                for parameter in self.client.search_parameters(exact):
+                    await session.execute(parameter)
+
+                result = await session.execute(
+                    self.client.search_statement(
+                        collection_name, vectors, limit, filter, exact
+                    )
+                )
+                return self.client.search_result(result.all(), len(vectors))
+        except Exception as e:
+            log.exception(f"Error during search: {e}")
+            return None
+
+    async def _get_chunks(
+        self,
+        collection_name: str,
+        filter: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+    ) -> Optional[GetResult]:
+        try:
+            async with self.session() as session:
+                result = await session.execute(
+                    self.client.chunks_statement(collection_name, filter, limit)
+                )
+                results = result.all()
+        except Exception as e:
+            log.exception(f"Error during query: {e}")
+            return None
+
+        if not results:
+            return None
+        return GetResult(
+            ids=[[row.id for row in results]],
+            documents=[[row.text for row in results]],
+            metadatas=[[row.vmetadata for row in results]],
+        )
+
+    async def query(
+        self, collection_name: str, filter: Dict[str, Any], limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        return await self._get_chunks(collection_name, filter, limit)
+
+    async def get(self, collection_name: str) -> Optional[GetResult]:
+        return await self._get_chunks(collection_name)
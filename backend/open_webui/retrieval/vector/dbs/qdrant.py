@@ -2,11 +2,13 @@ from typing import Optional
 import logging
 from urllib.parse import urlparse
 
+from qdrant_client import AsyncQdrantClient as AsyncQclient
 from qdrant_client import QdrantClient as Qclient
 from qdrant_client.http.models import PointStruct
 from qdrant_client.models import models
 
 from open_webui.retrieval.vector.main import (
+    AsyncVectorDBAdapter,
     VectorDBBase,
     VectorItem,
     SearchResult,
@@ -21,6 +23,9 @@ from open_webui.config import (
     QDRANT_COLLECTION_PREFIX,
     QDRANT_TIMEOUT,
     QDRANT_HNSW_M,
+    VECTOR_DB_QUANTIZATION,
+    VECTOR_DB_QUANTIZATION_RESCORE,
+    VECTOR_DB_QUANTIZATION_OVERSAMPLING,
 )
 from open_webui.env import SRC_LOG_LEVELS
 
@@ -30,7 +35,54 @@ log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
+def get_vector_datatype() -> Optional[models.Datatype]:
+    # float16 replaces the stored vectors, so there is nothing to rescore with
+    if VECTOR_DB_QUANTIZATION == "float16":
+        return models.Datatype.FLOAT16
+    return None
+
+
+def get_quantization_config() -> Optional[models.QuantizationConfig]:
+    # Quantized codes are kept in RAM next to the original vectors
+    if VECTOR_DB_QUANTIZATION == "int8":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8, always_ram=True
+            )
+        )
+    if VECTOR_DB_QUANTIZATION == "binary":
+        return models.BinaryQuantization(
+            binary=models.BinaryQuantizationConfig(always_ram=True)
+        )
+    return None
+
+
+def get_search_params() -> Optional[models.SearchParams]:
+    if VECTOR_DB_QUANTIZATION not in ("int8", "binary"):
+        return None
+    return models.SearchParams(
+        quantization=models.QuantizationSearchParams(
+            rescore=VECTOR_DB_QUANTIZATION_RESCORE,
+            oversampling=(
+                VECTOR_DB_QUANTIZATION_OVERSAMPLING
+                if VECTOR_DB_QUANTIZATION_RESCORE
+                else None
+            ),
+        )
+    )
+
+
+def _metadata_filter(key: str, value) -> models.FieldCondition:
+    if isinstance(value, dict) and "$in" in value:
+        match = models.MatchAny(any=value["$in"])
+    else:
+        match = models.MatchValue(value=value)
+    return models.FieldCondition(key=f"metadata.{key}", match=match)
+
+
 class QdrantClient(VectorDBBase):
+    supported_quantizations = ("float16", "int8", "binary")
+
     def __init__(self):
         self.collection_prefix = QDRANT_COLLECTION_PREFIX
         self.QDRANT_URI = QDRANT_URI
@@ -51,7 +103,7 @@ class QdrantClient(VectorDBBase):
         http_port = parsed.port or 6333  # default REST port
 
         if self.PREFER_GRPC:
-            self.client = Qclient(
+            self.connection_kwargs = dict(
                 host=host,
                 port=http_port,
                 grpc_port=self.GRPC_PORT,
@@ -60,11 +112,12 @@ class QdrantClient(VectorDBBase):
                 timeout=self.QDRANT_TIMEOUT,
             )
         else:
-            self.client = Qclient(
+            self.connection_kwargs = dict(
                 url=self.QDRANT_URI,
                 api_key=self.QDRANT_API_KEY,
                 timeout=QDRANT_TIMEOUT,
             )
+        self.client = Qclient(**self.connection_kwargs)
 
     def _result_to_get_result(self, points) -> GetResult:
         ids = []
@@ -85,6 +138,16 @@ class QdrantClient(VectorDBBase):
             }
         )
 
+    def _result_to_search_result(self, points) -> SearchResult:
+        get_result = self._result_to_get_result(points)
+        return SearchResult(
+            ids=get_result.ids,
+            documents=get_result.documents,
+            metadatas=get_result.metadatas,
+            # qdrant distance is [-1, 1], normalize to [0, 1]
+            distances=[[(point.score + 1.0) / 2.0 for point in points]],
+        )
+
     def _create_collection(self, collection_name: str, dimension: int):
         collection_name_with_prefix = f"{self.collection_prefix}_{collection_name}"
         self.client.create_collection(
@@ -93,10 +156,12 @@ class QdrantClient(VectorDBBase):
                 size=dimension,
                 distance=models.Distance.COSINE,
                 on_disk=self.QDRANT_ON_DISK,
+                datatype=get_vector_datatype(),
             ),
             hnsw_config=models.HnswConfigDiff(
                 m=self.QDRANT_HNSW_M,
             ),
+            quantization_config=get_quantization_config(),
         )
 
         # Create payload indexes for efficient filtering
@@ -147,7 +212,11 @@ class QdrantClient(VectorDBBase):
         )
 
     def search(
-        self, collection_name: str, vectors: list[list[float | int]], limit: int
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        limit: int,
+        filter: Optional[dict] = None,
     ) -> Optional[SearchResult]:
         # Search for the nearest neighbor items based on the vectors and return 'limit' number of results.
         if limit is None:
@@ -157,15 +226,14 @@ class QdrantClient(VectorDBBase):
             collection_name=f"{self.collection_prefix}_{collection_name}",
             query=vectors[0],
             limit=limit,
+            search_params=get_search_params(),
+            query_filter=(
+                models.Filter(must=[_metadata_filter(k, v) for k, v in filter.items()])
+                if filter
+                else None
+            ),
         )
-        get_result = self._result_to_get_result(query_response.points)
-        return SearchResult(
-            ids=get_result.ids,
-            documents=get_result.documents,
-            metadatas=get_result.metadatas,
-            # qdrant distance is [-1, 1], normalize to [0, 1]
-            distances=[[(point.score + 1.0) / 2.0 for point in query_response.points]],
-        )
+        return self._result_to_search_result(query_response.points)
 
     def query(self, collection_name: str, filter: dict, limit: Optional[int] = None):
         # Construct the filter string for querying
@@ -175,17 +243,11 @@ class QdrantClient(VectorDBBase):
             if limit is None:
                 limit = NO_LIMIT  # otherwise qdrant would set limit to 10!
 
-            field_conditions = []
-            for key, value in filter.items():
-                field_conditions.append(
-                    models.FieldCondition(
-                        key=f"metadata.{key}", match=models.MatchValue(value=value)
-                    )
-                )
+            field_conditions = [_metadata_filter(k, v) for k, v in filter.items()]
 
             points = self.client.scroll(
                 collection_name=f"{self.collection_prefix}_{collection_name}",
-                scroll_filter=models.Filter(should=field_conditions),
+                scroll_filter=models.Filter(must=field_conditions),
                 limit=limit,
             )
             return self._result_to_get_result(points[0])
@@ -232,12 +294,7 @@ class QdrantClient(VectorDBBase):
                 ),
         elif filter:
             for key, value in filter.items():
-                field_conditions.append(
-                    models.FieldCondition(
-                        key=f"metadata.{key}",
-                        match=models.MatchValue(value=value),
-                    ),
-                ),
+                field_conditions.append(_metadata_filter(key, value))
 
         return self.client.delete(
             collection_name=f"{self.collection_prefix}_{collection_name}",
@@ -252,3 +309,71 @@ class QdrantClient(VectorDBBase):
         for collection_name in collection_names:
             if collection_name.name.startswith(self.collection_prefix):
                 self.client.delete_collection(collection_name=collection_name.name)
+
+
+class AsyncQdrantClient(AsyncVectorDBAdapter):
+    """
+    Reads through qdrant's native async client. Writes happen in background
+    jobs and keep going through the synchronous client.
+    """
+
+    def __init__(self, client: QdrantClient, max_workers: int):
+        super().__init__(client, max_workers)
+        self.collection_prefix = client.collection_prefix
+        self.async_client = AsyncQclient(**client.connection_kwargs)
+
+    async def has_collection(self, collection_name: str) -> bool:
+        return await self.async_client.collection_exists(
+            f"{self.collection_prefix}_{collection_name}"
+        )
+
+    async def search(
+        self,
+        collection_name: str,
+        vectors: list[list[float | int]],
+        limit: int,
+        filter: Optional[dict] = None,
+    ) -> Optional[SearchResult]:
+        if limit is None:
+            limit = NO_LIMIT  # otherwise qdrant would set limit to 10!
+
+        query_response = await self.async_client.query_points(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            query=vectors[0],
+            limit=limit,
+            search_params=get_search_params(),
+            query_filter=(
+                models.Filter(must=[_metadata_filter(k, v) for k, v in filter.items()])
+                if filter
+                else None
+            ),
+        )
+        return self.client._result_to_search_result(query_response.points)
+
+    async def query(
+        self, collection_name: str, filter: dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        if not await self.has_collection(collection_name):
+            return None
+        try:
+            if limit is None:
+                limit = NO_LIMIT  # otherwise qdrant would set limit to 10!
+
+            points = await self.async_client.scroll(
+                collection_name=f"{self.collection_prefix}_{collection_name}",
+                scroll_filter=models.Filter(
+                    must=[_metadata_filter(k, v) for k, v in filter.items()]
+                ),
+                limit=limit,
+            )
+            return self.client._result_to_get_result(points[0])
+        except Exception as e:
+            log.exception(f"Error querying a collection '{collection_name}': {e}")
+            return None
+
+    async def get(self, collection_name: str) -> Optional[GetResult]:
+        points = await self.async_client.scroll(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            limit=NO_LIMIT,  # otherwise qdrant would set limit to 10!
+        )
+        return self.client._result_to_get_result(points[0])
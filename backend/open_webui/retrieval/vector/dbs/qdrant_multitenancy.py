@@ -14,6 +14,11 @@ from open_webui.config import (
     QDRANT_HNSW_M,
 )
 from open_webui.env import SRC_LOG_LEVELS
+from open_webui.retrieval.vector.dbs.qdrant import (
+    get_quantization_config,
+    get_search_params,
+    get_vector_datatype,
+)
 from open_webui.retrieval.vector.main import (
     GetResult,
     SearchResult,
@@ -40,12 +45,16 @@ def _tenant_filter(tenant_id: str) -> models.FieldCondition:
 
 
 def _metadata_filter(key: str, value: Any) -> models.FieldCondition:
-    return models.FieldCondition(
-        key=f"metadata.{key}", match=models.MatchValue(value=value)
-    )
+    if isinstance(value, dict) and "$in" in value:
+        match = models.MatchAny(any=value["$in"])
+    else:
+        match = models.MatchValue(value=value)
+    return models.FieldCondition(key=f"metadata.{key}", match=match)
 
 
 class QdrantClient(VectorDBBase):
+    supported_quantizations = ("float16", "int8", "binary")
+
     def __init__(self):
         self.collection_prefix = QDRANT_COLLECTION_PREFIX
         self.QDRANT_URI = QDRANT_URI
@@ -148,6 +157,7 @@ class QdrantClient(VectorDBBase):
                 size=dimension,
                 distance=models.Distance.COSINE,
                 on_disk=self.QDRANT_ON_DISK,
+                datatype=get_vector_datatype(),
             ),
             # Disable global index building due to multitenancy
             # For more details https://qdrant.tech/documentation/guides/multiple-partitions/#calibrate-performance
@@ -155,6 +165,7 @@ class QdrantClient(VectorDBBase):
                 payload_m=self.QDRANT_HNSW_M,
                 m=0,
             ),
+            quantization_config=get_quantization_config(),
         )
         log.info(
             f"Multi-tenant collection {mt_collection_name} created with dimension {dimension}!"
@@ -256,7 +267,11 @@ class QdrantClient(VectorDBBase):
         )
 
     def search(
-        self, collection_name: str, vectors: List[List[float | int]], limit: int
+        self,
+        collection_name: str,
+        vectors: List[List[float | int]],
+        limit: int,
+        filter: Optional[Dict[str, Any]] = None,
     ) -> Optional[SearchResult]:
         """
         Search for the nearest neighbor items based on the vectors with tenant isolation.
@@ -273,7 +288,13 @@ class QdrantClient(VectorDBBase):
             collection_name=mt_collection,
             query=vectors[0],
             limit=limit,
-            query_filter=models.Filter(must=[tenant_filter]),
+            search_params=get_search_params(),
+            query_filter=models.Filter(
+                must=[
+                    tenant_filter,
+                    *[_metadata_filter(k, v) for k, v in (filter or {}).items()],
+                ]
+            ),
         )
         get_result = self._result_to_get_result(query_response.points)
         return SearchResult(
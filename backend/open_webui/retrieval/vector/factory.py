@@ -1,10 +1,27 @@
-from open_webui.retrieval.vector.main import VectorDBBase
+import importlib.util
+import logging
+
+from open_webui.retrieval.cache import RETRIEVAL_CACHE
+from open_webui.retrieval.vector.main import (
+    AsyncVectorDBAdapter,
+    AsyncVectorDBBase,
+    VectorDBBase,
+)
 from open_webui.retrieval.vector.type import VectorType
 from open_webui.config import (
     VECTOR_DB,
     ENABLE_QDRANT_MULTITENANCY_MODE,
     ENABLE_MILVUS_MULTITENANCY_MODE,
+    ENABLE_CONSOLIDATED_VECTOR_COLLECTION,
+    CONSOLIDATED_VECTOR_COLLECTION_NAME,
+    VECTOR_DB_QUANTIZATION,
+    ENABLE_ASYNC_VECTOR_DB_CLIENT,
+    VECTOR_DB_THREAD_POOL_SIZE,
 )
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
 class Vector:
@@ -70,5 +87,85 @@ class Vector:
             case _:
                 raise ValueError(f"Unsupported vector type: {vector_type}")
 
+    @staticmethod
+    def get_async_vector(vector_type: str, client: VectorDBBase) -> AsyncVectorDBBase:
+        """
+        get an async vector db instance for the given sync client, using the
+        backend's native async client where there is one
+        """
+        if ENABLE_ASYNC_VECTOR_DB_CLIENT:
+            match vector_type:
+                case VectorType.QDRANT if not ENABLE_QDRANT_MULTITENANCY_MODE:
+                    from open_webui.retrieval.vector.dbs.qdrant import (
+                        AsyncQdrantClient,
+                    )
+
+                    return AsyncQdrantClient(client, VECTOR_DB_THREAD_POOL_SIZE)
+                case VectorType.PGVECTOR if importlib.util.find_spec("asyncpg"):
+                    from open_webui.retrieval.vector.dbs.pgvector import (
+                        AsyncPgvectorClient,
+                    )
+
+                    return AsyncPgvectorClient(client, VECTOR_DB_THREAD_POOL_SIZE)
+                case VectorType.ELASTICSEARCH:
+                    from open_webui.retrieval.vector.dbs.elasticsearch import (
+                        AsyncElasticsearchClient,
+                    )
+
+                    return AsyncElasticsearchClient(client, VECTOR_DB_THREAD_POOL_SIZE)
+                case VectorType.OPENSEARCH:
+                    from open_webui.retrieval.vector.dbs.opensearch import (
+                        AsyncOpenSearchClient,
+                    )
+
+                    return AsyncOpenSearchClient(client, VECTOR_DB_THREAD_POOL_SIZE)
+        return AsyncVectorDBAdapter(client, VECTOR_DB_THREAD_POOL_SIZE)
+
+    @staticmethod
+    def supports_consolidated_collection(vector_type: str) -> bool:
+        """
+        Whether the backend can restrict searches with metadata filters,
+        which the consolidated collection layout depends on.
+        """
+        match vector_type:
+            case VectorType.CHROMA | VectorType.QDRANT | VectorType.PGVECTOR:
+                return True
+            case VectorType.MILVUS:
+                return not ENABLE_MILVUS_MULTITENANCY_MODE
+            case _:
+                return False
+
 
 VECTOR_DB_CLIENT = Vector.get_vector(VECTOR_DB)
+ASYNC_VECTOR_DB_CLIENT = Vector.get_async_vector(VECTOR_DB, VECTOR_DB_CLIENT)
+
+if (
+    VECTOR_DB_QUANTIZATION
+    and VECTOR_DB_QUANTIZATION not in VECTOR_DB_CLIENT.supported_quantizations
+):
+    log.warning(
+        f"VECTOR_DB_QUANTIZATION={VECTOR_DB_QUANTIZATION} is not supported by {VECTOR_DB}, storing full precision vectors"
+    )
+
+if ENABLE_CONSOLIDATED_VECTOR_COLLECTION:
+    if Vector.supports_consolidated_collection(VECTOR_DB):
+        from open_webui.retrieval.vector.consolidated import (
+            ConsolidatedVectorDBClient,
+        )
+
+        VECTOR_DB_CLIENT = ConsolidatedVectorDBClient(
+            VECTOR_DB_CLIENT, CONSOLIDATED_VECTOR_COLLECTION_NAME
+        )
+        # Collections are views resolved by the synchronous wrapper
+        ASYNC_VECTOR_DB_CLIENT = AsyncVectorDBAdapter(
+            VECTOR_DB_CLIENT, VECTOR_DB_THREAD_POOL_SIZE
+        )
+    else:
+        log.warning(
+            f"ENABLE_CONSOLIDATED_VECTOR_COLLECTION is not supported by {VECTOR_DB}, using one collection per file"
+        )
+
+if RETRIEVAL_CACHE:
+    # Writes through either client invalidate cached results of the collection;
+    # the async clients write through the sync client
+    RETRIEVAL_CACHE.track(VECTOR_DB_CLIENT)
@@ -1,3 +1,6 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from pydantic import BaseModel
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional, Union
@@ -31,6 +34,9 @@ class VectorDBBase(ABC):
     implement all abstract methods.
     """
 
+    # VECTOR_DB_QUANTIZATION settings the backend can store vectors with
+    supported_quantizations: tuple[str, ...] = ()
+
     @abstractmethod
     def has_collection(self, collection_name: str) -> bool:
         """Check if the collection exists in the vector DB."""
@@ -53,9 +59,19 @@ class VectorDBBase(ABC):
 
     @abstractmethod
     def search(
-        self, collection_name: str, vectors: List[List[Union[float, int]]], limit: int
+        self,
+        collection_name: str,
+        vectors: List[List[Union[float, int]]],
+        limit: int,
+        filter: Optional[Dict] = None,
     ) -> Optional[SearchResult]:
-        """Search for similar vectors in a collection."""
+        """
+        Search for similar vectors in a collection.
+
+        Backends that support it restrict the search to items matching the
+        metadata filter; a filter value of the form {"$in": [...]} matches
+        any of the listed values.
+        """
         pass
 
     @abstractmethod
@@ -84,3 +100,151 @@ class VectorDBBase(ABC):
     def reset(self) -> None:
         """Reset the vector database by removing all collections or those matching a condition."""
         pass
+
+
+class AsyncVectorDBBase(ABC):
+    """
+    Asynchronous counterpart of VectorDBBase, used on request paths so that
+    vector searches don't hold a thread while waiting on the database.
+    """
+
+    @abstractmethod
+    async def has_collection(self, collection_name: str) -> bool:
+        """Check if the collection exists in the vector DB."""
+        pass
+
+    @abstractmethod
+    async def delete_collection(self, collection_name: str) -> None:
+        """Delete a collection from the vector DB."""
+        pass
+
+    @abstractmethod
+    async def insert(self, collection_name: str, items: List[VectorItem]) -> None:
+        """Insert a list of vector items into a collection."""
+        pass
+
+    @abstractmethod
+    async def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        """Insert or update vector items in a collection."""
+        pass
+
+    @abstractmethod
+    async def search(
+        self,
+        collection_name: str,
+        vectors: List[List[Union[float, int]]],
+        limit: int,
+        filter: Optional[Dict] = None,
+    ) -> Optional[SearchResult]:
+        """Search for similar vectors in a collection, see VectorDBBase.search."""
+        pass
+
+    @abstractmethod
+    async def query(
+        self, collection_name: str, filter: Dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        """Query vectors from a collection using metadata filter."""
+        pass
+
+    @abstractmethod
+    async def get(self, collection_name: str) -> Optional[GetResult]:
+        """Retrieve all vectors from a collection."""
+        pass
+
+    @abstractmethod
+    async def delete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ) -> None:
+        """Delete vectors by ID or filter from a collection."""
+        pass
+
+    @abstractmethod
+    async def reset(self) -> None:
+        """Reset the vector database by removing all collections or those matching a condition."""
+        pass
+
+
+class AsyncVectorDBAdapter(AsyncVectorDBBase):
+    """
+    Runs a synchronous backend in its own bounded thread pool, so that slow
+    vector database calls can't exhaust the event loop's default executor.
+
+    Backends with a native async client subclass this and override the
+    methods they implement natively.
+    """
+
+    def __init__(self, client: VectorDBBase, max_workers: int):
+        self.client = client
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="vector-db"
+        )
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def has_collection(self, collection_name: str) -> bool:
+        return await self._run(
+            self.client.has_collection, collection_name=collection_name
+        )
+
+    async def delete_collection(self, collection_name: str) -> None:
+        return await self._run(
+            self.client.delete_collection, collection_name=collection_name
+        )
+
+    async def insert(self, collection_name: str, items: List[VectorItem]) -> None:
+        return await self._run(
+            self.client.insert, collection_name=collection_name, items=items
+        )
+
+    async def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        return await self._run(
+            self.client.upsert, collection_name=collection_name, items=items
+        )
+
+    async def search(
+        self,
+        collection_name: str,
+        vectors: List[List[Union[float, int]]],
+        limit: int,
+        filter: Optional[Dict] = None,
+    ) -> Optional[SearchResult]:
+        # Not every backend accepts a filter yet
+        kwargs = {"filter": filter} if filter else {}
+        return await self._run(
+            self.client.search,
+            collection_name=collection_name,
+            vectors=vectors,
+            limit=limit,
+            **kwargs,
+        )
+
+    async def query(
+        self, collection_name: str, filter: Dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        kwargs = {"limit": limit} if limit is not None else {}
+        return await self._run(
+            self.client.query, collection_name=collection_name, filter=filter, **kwargs
+        )
+
+    async def get(self, collection_name: str) -> Optional[GetResult]:
+        return await self._run(self.client.get, collection_name=collection_name)
+
+    async def delete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ) -> None:
+        return await self._run(
+            self.client.delete, collection_name=collection_name, ids=ids, filter=filter
+        )
+
+    async def reset(self) -> None:
+        return await self._run(self.client.reset)
@@ -0,0 +1,229 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from open_webui.config import (
+    ENABLE_WEB_SEARCH_CACHE,
+    WEB_SEARCH_CACHE_MAX_AGE,
+    WEB_SEARCH_CACHE_SIZE,
+    WEB_SEARCH_CACHE_TTL,
+)
+from open_webui.env import (
+    REDIS_CLUSTER,
+    REDIS_KEY_PREFIX,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    REDIS_URL,
+    SRC_LOG_LEVELS,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+class WebSearchCache:
+    """
+    In-process cache of web search results, loaded pages and the web-search-*
+    collections they were embedded into.
+
+    Search results, pages and collections are fresh for `ttl` seconds. Pages
+    and collections are kept for `max_age` seconds in total: older pages are
+    revalidated with their ETag/Last-Modified instead of being downloaded and
+    parsed again, and older collections can still be searched by follow-up
+    messages until they are dropped.
+    """
+
+    def __init__(self, size: int, ttl: int, max_age: int):
+        self.size = size
+        self.ttl = ttl
+        self.max_age = max(max_age, ttl)
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._collections: dict[str, dict] = {}
+
+    async def _get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.time():
+            self._entries.pop(key, None)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def _set(self, key: str, value: Any, ttl: int):
+        self._entries[key] = (time.time() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def _search_key(self, engine: str, query: str, **params) -> str:
+        return (
+            "search:"
+            + hashlib.sha256(
+                json.dumps(
+                    {"engine": engine, "query": query, **params}, sort_keys=True
+                ).encode()
+            ).hexdigest()
+        )
+
+    async def get_search_results(
+        self, engine: str, query: str, **params
+    ) -> Optional[list[dict]]:
+        return await self._get(self._search_key(engine, query, **params))
+
+    async def set_search_results(
+        self, engine: str, query: str, results: list[dict], **params
+    ):
+        await self._set(self._search_key(engine, query, **params), results, self.ttl)
+
+    async def get_pages(self, urls: list[str]) -> dict[str, dict]:
+        """
+        Return the cached pages of `urls`, as dicts with the `page_content` and
+        `metadata` of the loaded document, the `etag` and `last_modified`
+        headers of the response and the time it was `fetched_at`.
+        """
+        pages = {}
+        for url in urls:
+            page = await self._get(f"page:{url}")
+            if page is not None:
+                pages[url] = page
+        return pages
+
+    async def set_page(self, url: str, page: dict):
+        await self._set(f"page:{url}", page, self.max_age)
+
+    def is_fresh(self, page: dict) -> bool:
+        return page["fetched_at"] + self.ttl > time.time()
+
+    async def get_collection(self, collection_name: str) -> Optional[dict]:
+        """
+        Return the response of the web search embedded into `collection_name`,
+        if it was embedded less than `ttl` seconds ago.
+        """
+        entry = self._collections.get(collection_name)
+        if entry is None or entry["created_at"] + self.ttl < time.time():
+            return None
+        return entry
+
+    async def set_collection(self, collection_name: str, entry: dict):
+        self._collections[collection_name] = {**entry, "created_at": time.time()}
+
+    async def pop_stale_collections(self) -> list[str]:
+        """Forget and return the collections embedded more than `max_age` seconds ago."""
+        stale = [
+            collection_name
+            for collection_name, entry in self._collections.items()
+            if entry["created_at"] + self.max_age < time.time()
+        ]
+        for collection_name in stale:
+            self._collections.pop(collection_name, None)
+        return stale
+
+
+class RedisWebSearchCache(WebSearchCache):
+    """
+    Web search cache shared by all instances through Redis. Entries expire
+    after their TTL; the number of entries is bounded by Redis' own eviction
+    policy.
+    """
+
+    def __init__(
+        self,
+        *args,
+        redis_url: str,
+        redis_sentinels: Optional[list] = [],
+        redis_cluster: bool = False,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self._key = f"{REDIS_KEY_PREFIX}:web_search"
+        self._collections_key = f"{self._key}:collections"
+        self._redis = get_redis_connection(
+            redis_url,
+            redis_sentinels,
+            redis_cluster,
+            async_mode=True,
+            decode_responses=True,
+        )
+
+    async def _get(self, key: str) -> Optional[Any]:
+        value = await self._redis.get(f"{self._key}:{key}")
+        return json.loads(value) if value else None
+
+    async def _set(self, key: str, value: Any, ttl: int):
+        await self._redis.set(f"{self._key}:{key}", json.dumps(value), ex=ttl)
+
+    async def get_collection(self, collection_name: str) -> Optional[dict]:
+        value = await self._redis.hget(self._collections_key, collection_name)
+        if not value:
+            return None
+
+        entry = json.loads(value)
+        if entry["created_at"] + self.ttl < time.time():
+            return None
+        return entry
+
+    async def set_collection(self, collection_name: str, entry: dict):
+        await self._redis.hset(
+            self._collections_key,
+            collection_name,
+            json.dumps({**entry, "created_at": time.time()}),
+        )
+
+    async def pop_stale_collections(self) -> list[str]:
+        entries = await self._redis.hgetall(self._collections_key)
+
+        stale = []
+        for collection_name, value in entries.items():
+            if json.loads(value)["created_at"] + self.max_age < time.time():
+                # Only the instance that removed the entry drops the collection
+                if await self._redis.hdel(self._collections_key, collection_name):
+                    stale.append(collection_name)
+        return stale
+
+
+def get_web_search_cache() -> Optional[WebSearchCache]:
+    if not ENABLE_WEB_SEARCH_CACHE:
+        return None
+
+    if REDIS_URL:
+        return RedisWebSearchCache(
+            WEB_SEARCH_CACHE_SIZE,
+            WEB_SEARCH_CACHE_TTL,
+            WEB_SEARCH_CACHE_MAX_AGE,
+            redis_url=REDIS_URL,
+            redis_sentinels=get_sentinels_from_env(
+                REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+            ),
+            redis_cluster=REDIS_CLUSTER,
+        )
+
+    return WebSearchCache(
+        WEB_SEARCH_CACHE_SIZE, WEB_SEARCH_CACHE_TTL, WEB_SEARCH_CACHE_MAX_AGE
+    )
+
+
+WEB_SEARCH_CACHE = get_web_search_cache()
+
+
+async def periodic_web_search_collection_cleanup(client, interval: int = 300):
+    """Drop web-search-* collections older than the cache's `max_age`."""
+    if not WEB_SEARCH_CACHE:
+        return
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            for collection_name in await WEB_SEARCH_CACHE.pop_stale_collections():
+                log.debug(f"Dropping stale web search collection {collection_name}")
+                await client.delete_collection(collection_name=collection_name)
+        except Exception as e:
+            log.error(f"Failed to clean up web search collections: {e}")
@@ -0,0 +1,191 @@
+import asyncio
+import codecs
+import logging
+from collections import defaultdict
+from html.parser import HTMLParser
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+from open_webui.config import WEB_LOADER_CONCURRENT_REQUESTS_PER_HOST
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+_sessions: dict[tuple, aiohttp.ClientSession] = {}
+
+
+def get_crawl_session(trust_env: bool = False) -> aiohttp.ClientSession:
+    """
+    Return the HTTP session shared by all web loads on the running event loop,
+    so connections to the same hosts are reused across pages and searches.
+    """
+    key = (asyncio.get_running_loop(), trust_env)
+    session = _sessions.get(key)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=0,
+                limit_per_host=WEB_LOADER_CONCURRENT_REQUESTS_PER_HOST,
+                ttl_dns_cache=300,
+            ),
+            trust_env=trust_env,
+        )
+        _sessions[key] = session
+    return session
+
+
+async def close_crawl_sessions():
+    for session in _sessions.values():
+        await session.close()
+    _sessions.clear()
+
+
+class HTMLTextExtractor(HTMLParser):
+    """
+    Incrementally extract the text of an HTML page, along with the same
+    title, description and language metadata as `extract_metadata`.
+    """
+
+    SKIPPED_TAGS = {"script", "style", "template"}
+
+    def __init__(self, url: str, separator: str = "", strip: bool = False):
+        super().__init__()
+        self.separator = separator
+        self.strip = strip
+        self.metadata = {"source": url}
+        self._parts = []
+        self._title = None
+        self._skipped = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self._skipped += 1
+        elif tag == "title" and "title" not in self.metadata:
+            self._title = []
+        elif tag == "meta":
+            attrs = dict(attrs)
+            if attrs.get("name") == "description":
+                self.metadata.setdefault(
+                    "description", attrs.get("content", "No description found.")
+                )
+        elif tag == "html":
+            self.metadata.setdefault(
+                "language", dict(attrs).get("lang", "No language found.")
+            )
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS:
+            self._skipped = max(self._skipped - 1, 0)
+        elif tag == "title" and self._title is not None:
+            self.metadata["title"] = "".join(self._title)
+            self._title = None
+
+    def handle_data(self, data):
+        if self._skipped:
+            return
+        if self._title is not None:
+            self._title.append(data)
+        self._parts.append(data)
+
+    def get_text(self) -> str:
+        parts = self._parts
+        if self.strip:
+            parts = [part.strip() for part in parts if part.strip()]
+        return self.separator.join(parts)
+
+
+async def read_html_text(
+    response: aiohttp.ClientResponse,
+    extractor: HTMLTextExtractor,
+    max_bytes: int = 0,
+):
+    """
+    Feed the body of `response` to `extractor` as it is received, stopping
+    after `max_bytes` bytes (0 for no limit).
+    """
+    try:
+        decoder = codecs.getincrementaldecoder(response.charset or "utf-8")(
+            errors="replace"
+        )
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    read = 0
+    async for chunk in response.content.iter_chunked(64 * 1024):
+        if max_bytes:
+            chunk = chunk[: max_bytes - read]
+        read += len(chunk)
+        extractor.feed(decoder.decode(chunk))
+        if max_bytes and read >= max_bytes:
+            log.debug(f"Stopped reading {response.url} after {read} bytes")
+            break
+
+    extractor.feed(decoder.decode(b"", final=True))
+    extractor.close()
+
+
+async def crawl(
+    urls: list[str],
+    load: Callable[[str], Awaitable[Optional[Any]]],
+    concurrency: Optional[int] = None,
+    concurrency_per_host: int = WEB_LOADER_CONCURRENT_REQUESTS_PER_HOST,
+    timeout: Optional[float] = None,
+    max_results: int = 0,
+    continue_on_failure: bool = True,
+) -> dict[str, Any]:
+    """
+    Run `load(url)` for every url, at most `concurrency` at a time and
+    `concurrency_per_host` at a time per host.
+
+    Returns the non-None results by url, as soon as all loads finished, the
+    `timeout` in seconds passed, or `max_results` results are in. Loads that
+    are still running then are cancelled, so the crawl only waits for the
+    slowest page it keeps.
+    """
+    semaphore = asyncio.Semaphore(concurrency) if concurrency else None
+    host_semaphores = defaultdict(
+        lambda: asyncio.Semaphore(max(concurrency_per_host, 1))
+    )
+
+    async def run(url):
+        # Wait for the host first, so a busy host doesn't hold a global slot
+        async with host_semaphores[urlparse(url).hostname]:
+            if semaphore:
+                await semaphore.acquire()
+            try:
+                return url, await load(url)
+            except Exception as e:
+                if not continue_on_failure:
+                    raise
+                log.warning(f"Error loading {url}: {e}")
+                return url, None
+            finally:
+                if semaphore:
+                    semaphore.release()
+
+    tasks = [asyncio.create_task(run(url)) for url in urls]
+    results = {}
+    try:
+        for task in asyncio.as_completed(tasks, timeout=timeout or None):
+            try:
+                url, result = await task
+            except asyncio.TimeoutError:
+                log.info(
+                    f"Loaded {len(results)}/{len(urls)} pages within {timeout}s, dropping the rest"
+                )
+                break
+
+            if result is not None:
+                results[url] = result
+                if max_results and len(results) >= max_results:
+                    break
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return results
@@ -5,7 +5,9 @@ import ssl
 import urllib.parse
 import urllib.request
 from collections import defaultdict
-from datetime import datetime, time, timedelta
+from contextlib import asynccontextmanager
+import time
+from datetime import datetime, timedelta
 from typing import (
     Any,
     AsyncIterator,
@@ -26,6 +28,13 @@ from langchain_community.document_loaders.base import BaseLoader
 from langchain_core.documents import Document
 from open_webui.retrieval.loaders.tavily import TavilyLoader
 from open_webui.retrieval.loaders.external_web import ExternalWebLoader
+from open_webui.retrieval.web.cache import WEB_SEARCH_CACHE
+from open_webui.retrieval.web.crawl import (
+    HTMLTextExtractor,
+    crawl,
+    get_crawl_session,
+    read_html_text,
+)
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.config import (
     ENABLE_RAG_LOCAL_WEB_FETCH,
@@ -38,6 +47,9 @@ from open_webui.config import (
     TAVILY_EXTRACT_DEPTH,
     EXTERNAL_WEB_LOADER_URL,
     EXTERNAL_WEB_LOADER_API_KEY,
+    WEB_LOADER_TIMEOUT,
+    WEB_LOADER_MAX_PAGES,
+    WEB_LOADER_MAX_PAGE_BYTES,
 )
 from open_webui.env import SRC_LOG_LEVELS, AIOHTTP_CLIENT_SESSION_SSL
 
@@ -103,6 +115,16 @@ def extract_metadata(soup, url):
     return metadata
 
 
+def get_conditional_headers(page: dict) -> dict:
+    """Headers to revalidate a cached page with the validators it was served with."""
+    headers = {}
+    if page.get("etag"):
+        headers["If-None-Match"] = page["etag"]
+    if page.get("last_modified"):
+        headers["If-Modified-Since"] = page["last_modified"]
+    return headers
+
+
 def verify_ssl_cert(url: str) -> bool:
     """Verify SSL certificate for the given URL."""
     if not url.startswith("https://"):
@@ -471,24 +493,34 @@ class SafePlaywrightURLLoader(PlaywrightURLLoader, RateLimitMixin, URLProcessing
                     headless=self.headless, proxy=self.proxy
                 )
 
-            for url in self.urls:
+            async def load(url: str) -> Document:
+                await self._safe_process_url(url)
+                page = await browser.new_page()
                 try:
-                    await self._safe_process_url(url)
-                    page = await browser.new_page()
                     response = await page.goto(url, timeout=self.playwright_timeout)
                     if response is None:
                         raise ValueError(f"page.goto() returned None for url {url}")
 
                     text = await self.evaluator.evaluate_async(page, browser, response)
-                    metadata = {"source": url}
-                    yield Document(page_content=text, metadata=metadata)
-                except Exception as e:
-                    if self.continue_on_failure:
-                        log.exception(f"Error loading {url}: {e}")
-                        continue
-                    raise e
+                    return Document(page_content=text, metadata={"source": url})
+                finally:
+                    await page.close()
+
+            # Pages are loaded concurrently in tabs of the same browser
+            documents = await crawl(
+                self.urls,
+                load,
+                concurrency=self.requests_per_second,
+                timeout=WEB_LOADER_TIMEOUT,
+                max_results=WEB_LOADER_MAX_PAGES,
+                continue_on_failure=self.continue_on_failure,
+            )
             await browser.close()
 
+        for url in self.urls:
+            if url in documents:
+                yield documents[url]
+
 
 class SafeWebBaseLoader(WebBaseLoader):
     """WebBaseLoader with enhanced error handling for URLs."""
@@ -502,37 +534,89 @@ class SafeWebBaseLoader(WebBaseLoader):
         super().__init__(*args, **kwargs)
         self.trust_env = trust_env
 
+    @asynccontextmanager
+    async def _get(
+        self,
+        url: str,
+        headers: Optional[Dict] = None,
+        retries: int = 3,
+        cooldown: int = 2,
+        backoff: float = 1.5,
+    ):
+        """GET a url through the shared crawl session, retrying connection errors."""
+        kwargs: Dict = dict(
+            headers={**self.session.headers, **(headers or {})},
+            cookies=self.session.cookies.get_dict(),
+        )
+        if not self.session.verify:
+            kwargs["ssl"] = False
+
+        session = get_crawl_session(self.trust_env)
+        for i in range(retries):
+            try:
+                response = await session.get(
+                    url,
+                    **(self.requests_kwargs | kwargs),
+                    allow_redirects=False,
+                )
+                break
+            except aiohttp.ClientConnectionError as e:
+                if i == retries - 1:
+                    raise
+                else:
+                    log.warning(
+                        f"Error fetching {url} with attempt "
+                        f"{i + 1}/{retries}: {e}. Retrying..."
+                    )
+                    await asyncio.sleep(cooldown * backoff**i)
+
+        async with response:
+            yield response
+
     async def _fetch(
         self, url: str, retries: int = 3, cooldown: int = 2, backoff: float = 1.5
     ) -> str:
-        async with aiohttp.ClientSession(trust_env=self.trust_env) as session:
-            for i in range(retries):
-                try:
-                    kwargs: Dict = dict(
-                        headers=self.session.headers,
-                        cookies=self.session.cookies.get_dict(),
-                    )
-                    if not self.session.verify:
-                        kwargs["ssl"] = False
-
-                    async with session.get(
-                        url,
-                        **(self.requests_kwargs | kwargs),
-                        allow_redirects=False,
-                    ) as response:
-                        if self.raise_for_status:
-                            response.raise_for_status()
-                        return await response.text()
-                except aiohttp.ClientConnectionError as e:
-                    if i == retries - 1:
-                        raise
-                    else:
-                        log.warning(
-                            f"Error fetching {url} with attempt "
-                            f"{i + 1}/{retries}: {e}. Retrying..."
-                        )
-                        await asyncio.sleep(cooldown * backoff**i)
-        raise ValueError("retry count exceeded")
+        async with self._get(
+            url, retries=retries, cooldown=cooldown, backoff=backoff
+        ) as response:
+            if self.raise_for_status:
+                response.raise_for_status()
+            return await response.text()
+
+    async def _load_page(
+        self, url: str, cached_page: Optional[dict] = None
+    ) -> Optional[dict]:
+        """
+        Load the text and metadata of a page, extracting the text while the page
+        is downloaded. `cached_page` is revalidated with its ETag/Last-Modified.
+        """
+        headers = get_conditional_headers(cached_page) if cached_page else None
+        async with self._get(url, headers) as response:
+            if response.status == 304 and cached_page:
+                page = {**cached_page, "fetched_at": time.time()}
+            else:
+                if self.raise_for_status:
+                    response.raise_for_status()
+
+                extractor = HTMLTextExtractor(
+                    url,
+                    separator=self.bs_get_text_kwargs.get("separator", ""),
+                    strip=self.bs_get_text_kwargs.get("strip", False),
+                )
+                await read_html_text(response, extractor, WEB_LOADER_MAX_PAGE_BYTES)
+                page = {
+                    "page_content": extractor.get_text(),
+                    "metadata": extractor.metadata,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "fetched_at": time.time(),
+                }
+                if response.status != 200 or not page["page_content"].strip():
+                    return page
+
+        if WEB_SEARCH_CACHE:
+            await WEB_SEARCH_CACHE.set_page(url, page)
+        return page
 
     def _unpack_fetch_results(
         self, results: Any, urls: List[str], parser: Union[str, None] = None
@@ -576,19 +660,35 @@ class SafeWebBaseLoader(WebBaseLoader):
 
     async def alazy_load(self) -> AsyncIterator[Document]:
         """Async lazy load text from the url(s) in web_path."""
-        results = await self.ascrape_all(self.web_paths)
-        for path, soup in zip(self.web_paths, results):
-            text = soup.get_text(**self.bs_get_text_kwargs)
-            metadata = {"source": path}
-            if title := soup.find("title"):
-                metadata["title"] = title.get_text()
-            if description := soup.find("meta", attrs={"name": "description"}):
-                metadata["description"] = description.get(
-                    "content", "No description found."
+        pages = {}
+        if WEB_SEARCH_CACHE:
+            pages = await WEB_SEARCH_CACHE.get_pages(self.web_paths)
+
+        # Fresh pages are served from the cache, stale ones are revalidated
+        fresh_paths = [
+            path for path, page in pages.items() if WEB_SEARCH_CACHE.is_fresh(page)
+        ]
+        paths = [path for path in self.web_paths if path not in fresh_paths]
+        max_pages = WEB_LOADER_MAX_PAGES - len(fresh_paths)
+        if WEB_LOADER_MAX_PAGES and max_pages <= 0:
+            paths = []
+
+        loaded = await crawl(
+            paths,
+            lambda path: self._load_page(path, pages.get(path)),
+            concurrency=self.requests_per_second,
+            timeout=WEB_LOADER_TIMEOUT,
+            max_results=max_pages if WEB_LOADER_MAX_PAGES else 0,
+            continue_on_failure=self.continue_on_failure,
+        )
+
+        for path in self.web_paths:
+            # Cached pages that could not be loaded again are served as they are
+            page = loaded.get(path) or pages.get(path)
+            if page:
+                yield Document(
+                    page_content=page["page_content"], metadata=dict(page["metadata"])
                 )
-            if html := soup.find("html"):
-                metadata["language"] = html.get("lang", "No language found.")
-            yield Document(page_content=text, metadata=metadata)
 
     async def aload(self) -> list[Document]:
         """Load data into Document objects."""
@@ -1,10 +1,11 @@
+import hashlib
 import logging
 import os
 import uuid
 import json
 from fnmatch import fnmatch
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Optional
 from urllib.parse import quote
 import asyncio
 
@@ -23,8 +24,10 @@ from fastapi import (
 
 from fastapi.responses import FileResponse, StreamingResponse
 from open_webui.constants import ERROR_MESSAGES
-from open_webui.env import SRC_LOG_LEVELS
+from open_webui.env import ENABLE_FILE_DEDUPLICATION, SRC_LOG_LEVELS
+from open_webui.retrieval.utils import delete_file_collection, get_file_references
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.socket.main import FILE_STATUS_BROADCASTER, emit_file_status
 
 from open_webui.models.users import Users
 from open_webui.models.files import (
@@ -40,6 +43,7 @@ from open_webui.routers.retrieval import ProcessFileForm, process_file
 from open_webui.routers.audio import transcribe
 from open_webui.storage.provider import Storage
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.job_queue import JobFailedError, JobPriority
 from pydantic import BaseModel
 
 log = logging.getLogger(__name__)
@@ -85,50 +89,103 @@ def has_access_to_file(
 ############################
 
 
-def process_uploaded_file(request, file, file_path, file_item, file_metadata, user):
-    try:
-        if file.content_type:
-            stt_supported_content_types = getattr(
-                request.app.state.config, "STT_SUPPORTED_CONTENT_TYPES", []
-            )
+def get_blob_hash(file: BinaryIO, chunk_size: int = 1024 * 1024) -> tuple[str, int]:
+    """Hash the contents of a file in chunks, returning the hash and the size."""
+    blob_hash = hashlib.sha256()
+    size = 0
+    while chunk := file.read(chunk_size):
+        blob_hash.update(chunk)
+        size += len(chunk)
+    file.seek(0)
+    return blob_hash.hexdigest(), size
 
-            if any(
-                fnmatch(file.content_type, content_type)
-                for content_type in (
-                    stt_supported_content_types
-                    if stt_supported_content_types
-                    and any(t.strip() for t in stt_supported_content_types)
-                    else ["audio/*", "video/webm"]
-                )
-            ):
-                file_path = Storage.get_file(file_path)
-                result = transcribe(request, file_path, file_metadata)
 
-                process_file(
-                    request,
-                    ProcessFileForm(
-                        file_id=file_item.id, content=result.get("text", "")
-                    ),
-                    user=user,
-                )
-            elif (not file.content_type.startswith(("image/", "video/"))) or (
-                request.app.state.config.CONTENT_EXTRACTION_ENGINE == "external"
-            ):
-                process_file(request, ProcessFileForm(file_id=file_item.id), user=user)
-        else:
-            log.info(
-                f"File type {file.content_type} is not provided, but trying to process anyway"
+def _process_uploaded_file(request, file_item, file_metadata, user):
+    content_type = file_item.meta.get("content_type") if file_item.meta else None
+
+    if content_type:
+        stt_supported_content_types = getattr(
+            request.app.state.config, "STT_SUPPORTED_CONTENT_TYPES", []
+        )
+
+        if any(
+            fnmatch(content_type, supported_content_type)
+            for supported_content_type in (
+                stt_supported_content_types
+                if stt_supported_content_types
+                and any(t.strip() for t in stt_supported_content_types)
+                else ["audio/*", "video/webm"]
             )
+        ):
+            file_path = Storage.get_file(file_item.path)
+            result = transcribe(request, file_path, file_metadata)
+
+            process_file(
+                request,
+                ProcessFileForm(file_id=file_item.id, content=result.get("text", "")),
+                user=user,
+            )
+        elif (not content_type.startswith(("image/", "video/"))) or (
+            request.app.state.config.CONTENT_EXTRACTION_ENGINE == "external"
+        ):
             process_file(request, ProcessFileForm(file_id=file_item.id), user=user)
+    else:
+        log.info(
+            f"File type {content_type} is not provided, but trying to process anyway"
+        )
+        process_file(request, ProcessFileForm(file_id=file_item.id), user=user)
+
+
+def _mark_file_failed(file_id: str, e: Exception):
+    file = Files.get_file_by_id(file_id)
+    if not file or (file.data or {}).get("status") == "failed":
+        # Failures of process_file are already reported by process_file
+        return
+
+    error = str(e.detail) if hasattr(e, "detail") else str(e)
+    file = Files.update_file_data_by_id(
+        file_id,
+        {
+            "status": "failed",
+            "error": error,
+        },
+    )
+    if file:
+        emit_file_status(file.id, file.user_id, "failed", error)
+
+
+def process_uploaded_file(request, file_item, file_metadata, user):
+    try:
+        _process_uploaded_file(request, file_item, file_metadata, user)
     except Exception as e:
         log.error(f"Error processing file: {file_item.id}")
-        Files.update_file_data_by_id(
-            file_item.id,
-            {
-                "status": "failed",
-                "error": str(e.detail) if hasattr(e, "detail") else str(e),
-            },
-        )
+        _mark_file_failed(file_item.id, e)
+
+
+############################
+# File Processing Queue Jobs
+############################
+
+
+def process_file_job(app, payload: dict):
+    file_item = Files.get_file_by_id(payload["file_id"])
+    user = Users.get_user_by_id(payload["user_id"])
+    if not file_item or not user:
+        # The file (or its owner) was deleted while the job was queued
+        return
+
+    request = Request({"type": "http", "app": app, "headers": []})
+    try:
+        _process_uploaded_file(request, file_item, payload.get("metadata") or {}, user)
+    except HTTPException as e:
+        # process_file reports extraction/embedding errors as HTTP errors;
+        # those are deterministic for a given file, so don't retry them.
+        raise JobFailedError(e.detail) from e
+
+
+def process_file_job_failed(app, payload: dict, error: Exception):
+    log.error(f"Error processing file: {payload['file_id']}")
+    _mark_file_failed(payload["file_id"], error)
 
 
 @router.post("/", response_model=FileModelResponse)
@@ -139,6 +196,7 @@ def upload_file(
     metadata: Optional[dict | str] = Form(None),
     process: bool = Query(True),
     process_in_background: bool = Query(True),
+    priority: JobPriority = Query("high"),
     user=Depends(get_verified_user),
 ):
     return upload_file_handler(
@@ -147,6 +205,7 @@ def upload_file(
         metadata=metadata,
         process=process,
         process_in_background=process_in_background,
+        priority=priority,
         user=user,
         background_tasks=background_tasks,
     )
@@ -158,6 +217,7 @@ def upload_file_handler(
     metadata: Optional[dict | str] = Form(None),
     process: bool = Query(True),
     process_in_background: bool = Query(True),
+    priority: JobPriority = "high",
     user=Depends(get_verified_user),
     background_tasks: Optional[BackgroundTasks] = None,
 ):
@@ -198,16 +258,29 @@ def upload_file_handler(
         id = str(uuid.uuid4())
         name = filename
         filename = f"{id}_{filename}"
-        contents, file_path = Storage.upload_file(
-            file.file,
-            filename,
-            {
-                "OpenWebUI-User-Email": user.email,
-                "OpenWebUI-User-Id": user.id,
-                "OpenWebUI-User-Name": user.name,
-                "OpenWebUI-File-Id": id,
-            },
-        )
+
+        # Hashed in chunks, the upload is spooled to disk past a size
+        blob_hash, size = get_blob_hash(file.file)
+
+        file_path = None
+        if ENABLE_FILE_DEDUPLICATION and size:
+            # Identical uploads share a single stored blob
+            file_path = next(
+                (f.path for f in Files.get_files_by_blob_hash(blob_hash) if f.path),
+                None,
+            )
+
+        if not file_path:
+            _, file_path = Storage.upload_file(
+                file.file,
+                filename,
+                {
+                    "OpenWebUI-User-Email": user.email,
+                    "OpenWebUI-User-Id": user.id,
+                    "OpenWebUI-User-Name": user.name,
+                    "OpenWebUI-File-Id": id,
+                },
+            )
 
         file_item = Files.insert_new_file(
             user.id,
@@ -216,13 +289,14 @@ def upload_file_handler(
                     "id": id,
                     "filename": name,
                     "path": file_path,
+                    "blob_hash": blob_hash,
                     "data": {
                         **({"status": "pending"} if process else {}),
                     },
                     "meta": {
                         "name": name,
                         "content_type": file.content_type,
-                        "size": len(contents),
+                        "size": size,
                         "data": file_metadata,
                     },
                 }
@@ -230,12 +304,25 @@ def upload_file_handler(
         )
 
         if process:
-            if background_tasks and process_in_background:
+            file_processing_queue = getattr(
+                request.app.state, "file_processing_queue", None
+            )
+
+            if process_in_background and file_processing_queue:
+                file_processing_queue.enqueue(
+                    "process_file",
+                    {
+                        "file_id": file_item.id,
+                        "user_id": user.id,
+                        "metadata": file_metadata,
+                    },
+                    priority=priority,
+                )
+                return {"status": True, **file_item.model_dump()}
+            elif background_tasks and process_in_background:
                 background_tasks.add_task(
                     process_uploaded_file,
                     request,
-                    file,
-                    file_path,
                     file_item,
                     file_metadata,
                     user,
@@ -244,8 +331,6 @@ def upload_file_handler(
             else:
                 process_uploaded_file(
                     request,
-                    file,
-                    file_path,
                     file_item,
                     file_metadata,
                     user,
@@ -330,6 +415,25 @@ async def search_files(
     return matching_files
 
 
+############################
+# File Processing Queue Status
+############################
+
+
+@router.get("/queue/status")
+async def get_file_processing_queue_status(
+    request: Request, user=Depends(get_admin_user)
+):
+    file_processing_queue = getattr(request.app.state, "file_processing_queue", None)
+    if not file_processing_queue:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+
+    return await file_processing_queue.get_status()
+
+
 ############################
 # Delete All Files
 ############################
@@ -404,30 +508,51 @@ async def get_file_process_status(
     ):
         if stream:
             MAX_FILE_PROCESSING_DURATION = 3600 * 2
+            # Status changes are pushed through FILE_STATUS_BROADCASTER; the DB is
+            # only re-read as a fallback in case an event was missed.
+            FILE_STATUS_FALLBACK_POLL_INTERVAL = 30
 
             async def event_stream(file_item):
-                if file_item:
-                    for _ in range(MAX_FILE_PROCESSING_DURATION):
-                        file_item = Files.get_file_by_id(file_item.id)
-                        if file_item:
-                            data = file_item.model_dump().get("data", {})
-                            status = data.get("status")
-
-                            if status:
-                                event = {"status": status}
-                                if status == "failed":
-                                    event["error"] = data.get("error")
-
-                                yield f"data: {json.dumps(event)}\n\n"
-                                if status in ("completed", "failed"):
-                                    break
-                            else:
-                                # Legacy
-                                break
-
-                        await asyncio.sleep(0.5)
-                else:
+                if not file_item:
                     yield f"data: {json.dumps({'status': 'not_found'})}\n\n"
+                    return
+
+                async with FILE_STATUS_BROADCASTER.subscribe(file_item.id) as queue:
+                    loop = asyncio.get_running_loop()
+                    deadline = loop.time() + MAX_FILE_PROCESSING_DURATION
+
+                    # Re-read once subscribed so a change made in between isn't lost
+                    file_item = Files.get_file_by_id(file_item.id)
+                    data = (file_item.data or {}) if file_item else {}
+
+                    while True:
+                        status = data.get("status")
+                        if not status:
+                            # Legacy
+                            break
+
+                        event = {"status": status}
+                        if status == "failed":
+                            event["error"] = data.get("error")
+
+                        yield f"data: {json.dumps(event)}\n\n"
+                        if status in ("completed", "failed"):
+                            break
+
+                        timeout = min(
+                            FILE_STATUS_FALLBACK_POLL_INTERVAL,
+                            deadline - loop.time(),
+                        )
+                        if timeout <= 0:
+                            break
+
+                        try:
+                            data = await asyncio.wait_for(queue.get(), timeout=timeout)
+                        except asyncio.TimeoutError:
+                            file_item = Files.get_file_by_id(file_item.id)
+                            if not file_item:
+                                break
+                            data = file_item.data or {}
 
             return StreamingResponse(
                 event_stream(file),
@@ -720,8 +845,10 @@ async def delete_file_by_id(id: str, user=Depends(get_verified_user)):
         result = Files.delete_file_by_id(id)
         if result:
             try:
-                Storage.delete_file(file.path)
-                VECTOR_DB_CLIENT.delete(collection_name=f"file-{id}")
+                # Blobs and vectors may be shared with deduplicated uploads
+                if not any(f.path == file.path for f in get_file_references(file)):
+                    Storage.delete_file(file.path)
+                delete_file_collection(file)
             except Exception as e:
                 log.exception(e)
                 log.error("Error deleting files")
@@ -6,10 +6,14 @@ import logging
 from open_webui.models.knowledge import (
     Knowledges,
     KnowledgeForm,
+    KnowledgeModel,
     KnowledgeResponse,
     KnowledgeUserResponse,
 )
 from open_webui.models.files import Files, FileModel, FileMetadataResponse
+from open_webui.retrieval.cache import RETRIEVAL_CACHE
+from open_webui.retrieval.utils import delete_file_collection
+from open_webui.retrieval.vector.consolidated import ConsolidatedVectorDBClient
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
 from open_webui.routers.retrieval import (
     process_file,
@@ -34,6 +38,25 @@ log.setLevel(SRC_LOG_LEVELS["MODELS"])
 
 router = APIRouter()
 
+
+def update_knowledge_data(id: str, data: dict) -> Optional[KnowledgeModel]:
+    """
+    Update the data of a knowledge base, invalidating the cached retrieval
+    results of the knowledge base as its files may have changed.
+    """
+    knowledge = Knowledges.update_knowledge_data_by_id(id=id, data=data)
+    if RETRIEVAL_CACHE:
+        RETRIEVAL_CACHE.invalidate(id)
+    return knowledge
+
+
+def delete_knowledge(id: str) -> bool:
+    result = Knowledges.delete_knowledge_by_id(id=id)
+    if RETRIEVAL_CACHE:
+        RETRIEVAL_CACHE.invalidate(id)
+    return result
+
+
 ############################
 # getKnowledgeBases
 ############################
@@ -71,9 +94,7 @@ async def get_knowledge(user=Depends(get_verified_user)):
                         file_ids.remove(missing_file)
 
                     data["file_ids"] = file_ids
-                    Knowledges.update_knowledge_data_by_id(
-                        id=knowledge_base.id, data=data
-                    )
+                    update_knowledge_data(id=knowledge_base.id, data=data)
 
                     files = Files.get_file_metadatas_by_ids(file_ids)
 
@@ -119,9 +140,7 @@ async def get_knowledge_list(user=Depends(get_verified_user)):
                         file_ids.remove(missing_file)
 
                     data["file_ids"] = file_ids
-                    Knowledges.update_knowledge_data_by_id(
-                        id=knowledge_base.id, data=data
-                    )
+                    update_knowledge_data(id=knowledge_base.id, data=data)
 
                     files = Files.get_file_metadatas_by_ids(file_ids)
 
@@ -200,7 +219,7 @@ async def reindex_knowledge_files(request: Request, user=Depends(get_verified_us
                 f"Knowledge base {knowledge_base.id} has no data or invalid data ({knowledge_base.data!r}). Deleting."
             )
             try:
-                Knowledges.delete_knowledge_by_id(id=knowledge_base.id)
+                delete_knowledge(id=knowledge_base.id)
                 deleted_knowledge_bases.append(knowledge_base.id)
             except Exception as e:
                 log.error(
@@ -223,6 +242,11 @@ async def reindex_knowledge_files(request: Request, user=Depends(get_verified_us
             failed_files = []
             for file in files:
                 try:
+                    if isinstance(VECTOR_DB_CLIENT, ConsolidatedVectorDBClient):
+                        # Chunks are shared with the file, re-embed them there
+                        VECTOR_DB_CLIENT.delete_collection(
+                            collection_name=f"file-{file.id}"
+                        )
                     process_file(
                         request,
                         ProcessFileForm(
@@ -415,7 +439,7 @@ def add_file_to_knowledge_by_id(
             file_ids.append(form_data.file_id)
             data["file_ids"] = file_ids
 
-            knowledge = Knowledges.update_knowledge_data_by_id(id=id, data=data)
+            knowledge = update_knowledge_data(id=id, data=data)
 
             if knowledge:
                 files = Files.get_file_metadatas_by_ids(file_ids)
@@ -557,9 +581,7 @@ def remove_file_from_knowledge_by_id(
     if delete_file:
         try:
             # Remove the file's collection from vector database
-            file_collection = f"file-{form_data.file_id}"
-            if VECTOR_DB_CLIENT.has_collection(collection_name=file_collection):
-                VECTOR_DB_CLIENT.delete_collection(collection_name=file_collection)
+            delete_file_collection(file)
         except Exception as e:
             log.debug("This was most likely caused by bypassing embedding processing")
             log.debug(e)
@@ -576,7 +598,7 @@ def remove_file_from_knowledge_by_id(
             file_ids.remove(form_data.file_id)
             data["file_ids"] = file_ids
 
-            knowledge = Knowledges.update_knowledge_data_by_id(id=id, data=data)
+            knowledge = update_knowledge_data(id=id, data=data)
 
             if knowledge:
                 files = Files.get_file_metadatas_by_ids(file_ids)
@@ -661,7 +683,7 @@ async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
     except Exception as e:
         log.debug(e)
         pass
-    result = Knowledges.delete_knowledge_by_id(id=id)
+    result = delete_knowledge(id=id)
     return result
 
 
@@ -695,7 +717,7 @@ async def reset_knowledge_by_id(id: str, user=Depends(get_verified_user)):
         log.debug(e)
         pass
 
-    knowledge = Knowledges.update_knowledge_data_by_id(id=id, data={"file_ids": []})
+    knowledge = update_knowledge_data(id=id, data={"file_ids": []})
 
     return knowledge
 
@@ -768,7 +790,7 @@ def add_files_to_knowledge_batch(
             existing_file_ids.append(file_id)
 
     data["file_ids"] = existing_file_ids
-    knowledge = Knowledges.update_knowledge_data_by_id(id=id, data=data)
+    knowledge = update_knowledge_data(id=id, data=data)
 
     # If there were any errors, include them in the response
     if result.errors:
@@ -1,10 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+import asyncio
 import logging
 from typing import Optional
 
 from open_webui.models.memories import Memories, MemoryModel
-from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.memory_index import MEMORY_INDEX, MemoryIndexEntry
+from open_webui.retrieval.vector.factory import (
+    ASYNC_VECTOR_DB_CLIENT,
+    VECTOR_DB_CLIENT,
+)
+from open_webui.retrieval.vector.main import SearchResult
 from open_webui.utils.auth import get_verified_user
 from open_webui.env import SRC_LOG_LEVELS
 
@@ -15,6 +22,102 @@ log.setLevel(SRC_LOG_LEVELS["MODELS"])
 router = APIRouter()
 
 
+def get_memory_embedding(request: Request) -> str:
+    """Identify the embedding model the memory vectors were computed with."""
+    config = request.app.state.config
+    return f"{config.RAG_EMBEDDING_ENGINE}:{config.RAG_EMBEDDING_MODEL}"
+
+
+def get_memory_item(memory: MemoryModel, vector: list[float]) -> dict:
+    return {
+        "id": memory.id,
+        "text": memory.content,
+        "vector": vector,
+        "metadata": {
+            "created_at": memory.created_at,
+            "updated_at": memory.updated_at,
+        },
+    }
+
+
+async def update_memory_index(
+    request: Request,
+    memories: list[MemoryModel],
+    entry: Optional[MemoryIndexEntry],
+    user,
+) -> MemoryIndexEntry:
+    """
+    Bring the user's memory index up to date with `memories`: only memories
+    that are new or changed since they were indexed are embedded.
+    """
+    embedding = get_memory_embedding(request)
+    items = entry.items if entry else {}
+
+    changed = [
+        memory
+        for memory in memories
+        if memory.id not in items or items[memory.id]["text"] != memory.content
+    ]
+    if entry is None or changed or len(items) != len(memories):
+        vectors = (
+            await run_in_threadpool(
+                request.app.state.EMBEDDING_FUNCTION,
+                [memory.content for memory in changed],
+                user=user,
+            )
+            if changed
+            else []
+        )
+        if len(vectors) != len(changed):
+            raise ValueError("Failed to embed memories")
+
+        embedded = {
+            memory.id: get_memory_item(memory, vector)
+            for memory, vector in zip(changed, vectors)
+        }
+        entry = MemoryIndexEntry(
+            {
+                memory.id: embedded.get(memory.id) or items[memory.id]
+                for memory in memories
+            }
+        )
+        await MEMORY_INDEX.set(user.id, embedding, list(entry.items.values()))
+
+    return entry
+
+
+# Users whose memory index is being built in the background
+MEMORY_INDEX_BUILDS: dict[str, asyncio.Task] = {}
+
+
+async def build_memory_index(request: Request, memories: list[MemoryModel], user):
+    try:
+        await update_memory_index(request, memories, None, user)
+    except Exception as e:
+        log.warning(f"Failed to build the memory index: {e}")
+    finally:
+        MEMORY_INDEX_BUILDS.pop(user.id, None)
+
+
+async def search_memory_index(
+    request: Request, memories: list[MemoryModel], vector: list[float], k: int, user
+) -> Optional[SearchResult]:
+    """
+    Search the user's memories in the memory index. A user without an index
+    gets one built in the background, and None is returned until it's ready.
+    """
+    entry = await MEMORY_INDEX.get(user.id, get_memory_embedding(request))
+    if entry is None:
+        if user.id not in MEMORY_INDEX_BUILDS:
+            MEMORY_INDEX_BUILDS[user.id] = asyncio.create_task(
+                build_memory_index(request, memories, user)
+            )
+        return None
+
+    entry = await update_memory_index(request, memories, entry, user)
+    return entry.search(vector, k)
+
+
 @router.get("/ef")
 async def get_embeddings(request: Request):
     return {"result": request.app.state.EMBEDDING_FUNCTION("hello world")}
@@ -50,6 +153,7 @@ async def add_memory(
     user=Depends(get_verified_user),
 ):
     memory = Memories.insert_new_memory(user.id, form_data.content)
+    vector = request.app.state.EMBEDDING_FUNCTION(memory.content, user=user)
 
     VECTOR_DB_CLIENT.upsert(
         collection_name=f"user-memory-{user.id}",
@@ -57,13 +161,15 @@ async def add_memory(
             {
                 "id": memory.id,
                 "text": memory.content,
-                "vector": request.app.state.EMBEDDING_FUNCTION(
-                    memory.content, user=user
-                ),
+                "vector": vector,
                 "metadata": {"created_at": memory.created_at},
             }
         ],
     )
+    if MEMORY_INDEX:
+        await MEMORY_INDEX.upsert(
+            user.id, get_memory_embedding(request), [get_memory_item(memory, vector)]
+        )
 
     return memory
 
@@ -86,9 +192,21 @@ async def query_memory(
     if not memories:
         raise HTTPException(status_code=404, detail="No memories found for user")
 
-    results = VECTOR_DB_CLIENT.search(
+    vector = request.app.state.EMBEDDING_FUNCTION(form_data.content, user=user)
+
+    if MEMORY_INDEX and len(memories) <= MEMORY_INDEX.max_memories:
+        try:
+            result = await search_memory_index(
+                request, memories, vector, form_data.k, user
+            )
+            if result is not None:
+                return result
+        except Exception as e:
+            log.warning(f"Failed to search the memory index, using the vector DB: {e}")
+
+    results = await ASYNC_VECTOR_DB_CLIENT.search(
         collection_name=f"user-memory-{user.id}",
-        vectors=[request.app.state.EMBEDDING_FUNCTION(form_data.content, user=user)],
+        vectors=[vector],
         limit=form_data.k,
     )
 
@@ -105,23 +223,18 @@ async def reset_memory_from_vector_db(
     VECTOR_DB_CLIENT.delete_collection(f"user-memory-{user.id}")
 
     memories = Memories.get_memories_by_user_id(user.id)
-    VECTOR_DB_CLIENT.upsert(
-        collection_name=f"user-memory-{user.id}",
-        items=[
-            {
-                "id": memory.id,
-                "text": memory.content,
-                "vector": request.app.state.EMBEDDING_FUNCTION(
-                    memory.content, user=user
-                ),
-                "metadata": {
-                    "created_at": memory.created_at,
-                    "updated_at": memory.updated_at,
-                },
-            }
-            for memory in memories
-        ],
-    )
+    items = [
+        get_memory_item(
+            memory, request.app.state.EMBEDDING_FUNCTION(memory.content, user=user)
+        )
+        for memory in memories
+    ]
+    VECTOR_DB_CLIENT.upsert(collection_name=f"user-memory-{user.id}", items=items)
+    if MEMORY_INDEX:
+        try:
+            await MEMORY_INDEX.set(user.id, get_memory_embedding(request), items)
+        except Exception as e:
+            log.warning(f"Failed to reset the memory index: {e}")
 
     return True
 
@@ -140,6 +253,8 @@ async def delete_memory_by_user_id(user=Depends(get_verified_user)):
             VECTOR_DB_CLIENT.delete_collection(f"user-memory-{user.id}")
         except Exception as e:
             log.error(e)
+        if MEMORY_INDEX:
+            await MEMORY_INDEX.drop(user.id)
         return True
 
     return False
@@ -164,22 +279,12 @@ async def update_memory_by_id(
         raise HTTPException(status_code=404, detail="Memory not found")
 
     if form_data.content is not None:
-        VECTOR_DB_CLIENT.upsert(
-            collection_name=f"user-memory-{user.id}",
-            items=[
-                {
-                    "id": memory.id,
-                    "text": memory.content,
-                    "vector": request.app.state.EMBEDDING_FUNCTION(
-                        memory.content, user=user
-                    ),
-                    "metadata": {
-                        "created_at": memory.created_at,
-                        "updated_at": memory.updated_at,
-                    },
-                }
-            ],
+        item = get_memory_item(
+            memory, request.app.state.EMBEDDING_FUNCTION(memory.content, user=user)
         )
+        VECTOR_DB_CLIENT.upsert(collection_name=f"user-memory-{user.id}", items=[item])
+        if MEMORY_INDEX:
+            await MEMORY_INDEX.upsert(user.id, get_memory_embedding(request), [item])
 
     return memory
 
@@ -197,6 +302,8 @@ async def delete_memory_by_id(memory_id: str, user=Depends(get_verified_user)):
         VECTOR_DB_CLIENT.delete(
             collection_name=f"user-memory-{user.id}", ids=[memory_id]
         )
+        if MEMORY_INDEX:
+            await MEMORY_INDEX.delete(user.id, [memory_id])
         return True
 
     return False
@@ -6,6 +6,7 @@ import shutil
 import asyncio
 
 import re
+import time
 import uuid
 from datetime import datetime
 from pathlib import Path
@@ -25,25 +26,32 @@ from fastapi import (
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-import tiktoken
 
 
-from langchain.text_splitter import RecursiveCharacterTextSplitter, TokenTextSplitter
+from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_text_splitters import MarkdownHeaderTextSplitter
 from langchain_core.documents import Document
 
 from open_webui.models.files import FileModel, Files
 from open_webui.models.knowledge import Knowledges
+from open_webui.models.users import Users
 from open_webui.storage.provider import Storage
 
 
-from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.vector.factory import (
+    ASYNC_VECTOR_DB_CLIENT,
+    VECTOR_DB_CLIENT,
+)
+from open_webui.retrieval.vector.consolidated import ConsolidatedVectorDBClient
+from open_webui.socket.main import emit_file_status
 
 # Document loaders
 from open_webui.retrieval.loaders.main import Loader
 from open_webui.retrieval.loaders.youtube import YoutubeLoader
+from open_webui.retrieval.text_splitter import TokenTextSplitter
 
 # Web search engines
+from open_webui.retrieval.web.cache import WEB_SEARCH_CACHE
 from open_webui.retrieval.web.main import SearchResult
 from open_webui.retrieval.web.utils import get_web_loader
 from open_webui.retrieval.web.ollama import search_ollama_cloud
@@ -73,6 +81,8 @@ from open_webui.retrieval.web.external import search_external
 from open_webui.retrieval.utils import (
     get_content_from_url,
     get_embedding_function,
+    get_file_collection_name,
+    get_file_references,
     get_reranking_function,
     get_model_path,
     query_collection,
@@ -92,6 +102,13 @@ from open_webui.config import (
     RAG_EMBEDDING_MODEL_TRUST_REMOTE_CODE,
     RAG_RERANKING_MODEL_AUTO_UPDATE,
     RAG_RERANKING_MODEL_TRUST_REMOTE_CODE,
+    RAG_EXTERNAL_RERANKER_BATCH_SIZE,
+    RAG_EXTERNAL_RERANKER_CONCURRENCY,
+    RAG_EXTERNAL_RERANKER_TIMEOUT,
+    RAG_EXTERNAL_RERANKER_CACHE_SIZE,
+    RAG_COLBERT_CACHE_SIZE,
+    CACHE_DIR,
+    ENABLE_RAG_COLBERT_DISK_CACHE,
     UPLOAD_DIR,
     DEFAULT_LOCALE,
     RAG_EMBEDDING_CONTENT_PREFIX,
@@ -99,8 +116,10 @@ from open_webui.config import (
 )
 from open_webui.env import (
     SRC_LOG_LEVELS,
+    REDIS_KEY_PREFIX,
     DEVICE_TYPE,
     DOCKER,
+    ENABLE_FILE_DEDUPLICATION,
     SENTENCE_TRANSFORMERS_BACKEND,
     SENTENCE_TRANSFORMERS_MODEL_KWARGS,
     SENTENCE_TRANSFORMERS_CROSS_ENCODER_BACKEND,
@@ -158,6 +177,12 @@ def get_rf(
                 rf = ColBERT(
                     get_model_path(reranking_model, auto_update),
                     env="docker" if DOCKER else None,
+                    cache_size=RAG_COLBERT_CACHE_SIZE,
+                    cache_dir=(
+                        f"{CACHE_DIR}/colbert"
+                        if ENABLE_RAG_COLBERT_DISK_CACHE
+                        else None
+                    ),
                 )
 
             except Exception as e:
@@ -172,6 +197,10 @@ def get_rf(
                         url=external_reranker_url,
                         api_key=external_reranker_api_key,
                         model=reranking_model,
+                        batch_size=RAG_EXTERNAL_RERANKER_BATCH_SIZE,
+                        concurrency=RAG_EXTERNAL_RERANKER_CONCURRENCY,
+                        timeout=RAG_EXTERNAL_RERANKER_TIMEOUT,
+                        cache_size=RAG_EXTERNAL_RERANKER_CACHE_SIZE,
                     )
                 except Exception as e:
                     log.error(f"ExternalReranking: {e}")
@@ -887,6 +916,13 @@ async def update_rag_config(
     )
 
     # Reranking settings
+    # Release the pooled connections of an external reranker, which is
+    # replaced below; if it isn't, it reconnects on its next request
+    from open_webui.retrieval.models.external import ExternalReranker
+
+    if isinstance(request.app.state.rf, ExternalReranker):
+        request.app.state.rf.close()
+
     if request.app.state.config.RAG_RERANKING_ENGINE == "":
         # Unloading the internal reranker and clear VRAM memory
         request.app.state.rf = None
@@ -1276,6 +1312,30 @@ def save_docs_to_vector_db(
                 log.info(f"Document with hash {metadata['hash']} already exists")
                 raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
 
+    if add and isinstance(VECTOR_DB_CLIENT, ConsolidatedVectorDBClient):
+        # Knowledge bases reference the chunks already stored for their files;
+        # only files without stored chunks are embedded here
+        stored_file_ids = set()
+        for file_id in {
+            (metadata or {}).get("file_id") or doc.metadata.get("file_id")
+            for doc in docs
+        }:
+            file = Files.get_file_by_id(file_id) if file_id else None
+            if file and VECTOR_DB_CLIENT.has_collection(
+                collection_name=get_file_collection_name(file)
+            ):
+                stored_file_ids.add(file_id)
+
+        docs = [
+            doc
+            for doc in docs
+            if ((metadata or {}).get("file_id") or doc.metadata.get("file_id"))
+            not in stored_file_ids
+        ]
+        if not docs:
+            log.info(f"chunks for {collection_name} are already stored")
+            return True
+
     if split:
         if request.app.state.config.TEXT_SPLITTER in ["", "character"]:
             text_splitter = RecursiveCharacterTextSplitter(
@@ -1289,7 +1349,6 @@ def save_docs_to_vector_db(
                 f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
             )
 
-            tiktoken.get_encoding(str(request.app.state.config.TIKTOKEN_ENCODING_NAME))
             text_splitter = TokenTextSplitter(
                 encoding_name=str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
                 chunk_size=request.app.state.config.CHUNK_SIZE,
@@ -1315,14 +1374,15 @@ def save_docs_to_vector_db(
                 strip_headers=False,  # Keep headers in content for context
             )
 
+            text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=request.app.state.config.CHUNK_SIZE,
+                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
+                add_start_index=True,
+            )
+
             md_split_docs = []
             for doc in docs:
                 md_header_splits = markdown_splitter.split_text(doc.page_content)
-                text_splitter = RecursiveCharacterTextSplitter(
-                    chunk_size=request.app.state.config.CHUNK_SIZE,
-                    chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                    add_start_index=True,
-                )
                 md_header_splits = text_splitter.split_documents(md_header_splits)
 
                 # Convert back to Document objects, preserving original metadata
@@ -1436,6 +1496,152 @@ def save_docs_to_vector_db(
         raise e
 
 
+def get_loader_config(request: Request) -> dict:
+    return dict(
+        engine=request.app.state.config.CONTENT_EXTRACTION_ENGINE,
+        DATALAB_MARKER_API_KEY=request.app.state.config.DATALAB_MARKER_API_KEY,
+        DATALAB_MARKER_API_BASE_URL=request.app.state.config.DATALAB_MARKER_API_BASE_URL,
+        DATALAB_MARKER_ADDITIONAL_CONFIG=request.app.state.config.DATALAB_MARKER_ADDITIONAL_CONFIG,
+        DATALAB_MARKER_SKIP_CACHE=request.app.state.config.DATALAB_MARKER_SKIP_CACHE,
+        DATALAB_MARKER_FORCE_OCR=request.app.state.config.DATALAB_MARKER_FORCE_OCR,
+        DATALAB_MARKER_PAGINATE=request.app.state.config.DATALAB_MARKER_PAGINATE,
+        DATALAB_MARKER_STRIP_EXISTING_OCR=request.app.state.config.DATALAB_MARKER_STRIP_EXISTING_OCR,
+        DATALAB_MARKER_DISABLE_IMAGE_EXTRACTION=request.app.state.config.DATALAB_MARKER_DISABLE_IMAGE_EXTRACTION,
+        DATALAB_MARKER_FORMAT_LINES=request.app.state.config.DATALAB_MARKER_FORMAT_LINES,
+        DATALAB_MARKER_USE_LLM=request.app.state.config.DATALAB_MARKER_USE_LLM,
+        DATALAB_MARKER_OUTPUT_FORMAT=request.app.state.config.DATALAB_MARKER_OUTPUT_FORMAT,
+        EXTERNAL_DOCUMENT_LOADER_URL=request.app.state.config.EXTERNAL_DOCUMENT_LOADER_URL,
+        EXTERNAL_DOCUMENT_LOADER_API_KEY=request.app.state.config.EXTERNAL_DOCUMENT_LOADER_API_KEY,
+        TIKA_SERVER_URL=request.app.state.config.TIKA_SERVER_URL,
+        DOCLING_SERVER_URL=request.app.state.config.DOCLING_SERVER_URL,
+        DOCLING_PARAMS={
+            "do_ocr": request.app.state.config.DOCLING_DO_OCR,
+            "force_ocr": request.app.state.config.DOCLING_FORCE_OCR,
+            "ocr_engine": request.app.state.config.DOCLING_OCR_ENGINE,
+            "ocr_lang": request.app.state.config.DOCLING_OCR_LANG,
+            "pdf_backend": request.app.state.config.DOCLING_PDF_BACKEND,
+            "table_mode": request.app.state.config.DOCLING_TABLE_MODE,
+            "pipeline": request.app.state.config.DOCLING_PIPELINE,
+            "do_picture_description": request.app.state.config.DOCLING_DO_PICTURE_DESCRIPTION,
+            "picture_description_mode": request.app.state.config.DOCLING_PICTURE_DESCRIPTION_MODE,
+            "picture_description_local": request.app.state.config.DOCLING_PICTURE_DESCRIPTION_LOCAL,
+            "picture_description_api": request.app.state.config.DOCLING_PICTURE_DESCRIPTION_API,
+            **request.app.state.config.DOCLING_PARAMS,
+        },
+        PDF_EXTRACT_IMAGES=request.app.state.config.PDF_EXTRACT_IMAGES,
+        DOCUMENT_INTELLIGENCE_ENDPOINT=request.app.state.config.DOCUMENT_INTELLIGENCE_ENDPOINT,
+        DOCUMENT_INTELLIGENCE_KEY=request.app.state.config.DOCUMENT_INTELLIGENCE_KEY,
+        MISTRAL_OCR_API_KEY=request.app.state.config.MISTRAL_OCR_API_KEY,
+    )
+
+
+def get_file_processing_fingerprint(request: Request) -> str:
+    """
+    Identify the settings that determine a file's extracted text and vectors,
+    so that processing results are only reused when they would be identical.
+    """
+    config = request.app.state.config
+    loader_config = {
+        key: value
+        for key, value in get_loader_config(request).items()
+        if not key.endswith("_KEY")
+    }
+    return calculate_sha256_string(
+        json.dumps(
+            {
+                "loader": loader_config,
+                "embedding": [
+                    config.RAG_EMBEDDING_ENGINE,
+                    config.RAG_EMBEDDING_MODEL,
+                    RAG_EMBEDDING_CONTENT_PREFIX,
+                ],
+                "splitter": [
+                    config.TEXT_SPLITTER,
+                    config.CHUNK_SIZE,
+                    config.CHUNK_OVERLAP,
+                    config.TIKTOKEN_ENCODING_NAME,
+                ],
+                "bypass": config.BYPASS_EMBEDDING_AND_RETRIEVAL,
+            },
+            sort_keys=True,
+            default=str,
+        )
+    )
+
+
+def get_deduplicated_source_file(
+    file: FileModel, fingerprint: str
+) -> Optional[FileModel]:
+    for candidate in get_file_references(file):
+        if candidate.status == "completed" and candidate.fingerprint == fingerprint:
+            return Files.get_file_by_id(candidate.id)
+    return None
+
+
+def detach_file_references(request: Request, file: FileModel):
+    """
+    Reprocess deduplicated files that share this file's vectors before the
+    vectors are replaced with new content.
+    """
+    # Stop the file from being picked as a deduplication source itself
+    Files.update_file_data_by_id(file.id, {"fingerprint": None})
+
+    file_queue = getattr(request.app.state, "file_processing_queue", None)
+    for reference in get_file_references(file):
+        if (reference.meta or {}).get("source_file_id") != file.id:
+            continue
+
+        Files.update_file_metadata_by_id(reference.id, {"source_file_id": None})
+        Files.update_file_data_by_id(
+            reference.id, {"status": "pending", "fingerprint": None}
+        )
+
+        if file_queue:
+            file_queue.enqueue(
+                "process_file",
+                {"file_id": reference.id, "user_id": reference.user_id},
+                priority="low",
+            )
+        else:
+            try:
+                process_file(
+                    request,
+                    ProcessFileForm(file_id=reference.id),
+                    user=Users.get_user_by_id(reference.user_id),
+                )
+            except Exception as e:
+                log.warning(f"Failed to reprocess file {reference.id}: {e}")
+
+
+def reuse_processed_file(
+    request: Request, file: FileModel, source_file: FileModel, fingerprint: str
+):
+    source_file_id = (source_file.meta or {}).get("source_file_id") or source_file.id
+    text_content = source_file.data.get("content", "")
+
+    collection_name = None
+    meta = {"source_file_id": source_file_id}
+    if not request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL:
+        collection_name = f"file-{source_file_id}"
+        meta["collection_name"] = collection_name
+
+    Files.update_file_metadata_by_id(file.id, meta)
+    Files.update_file_hash_by_id(file.id, source_file.hash)
+    Files.update_file_data_by_id(
+        file.id,
+        {"content": text_content, "fingerprint": fingerprint, "status": "completed"},
+    )
+    emit_file_status(file.id, file.user_id, "completed")
+    log.info(f"reused processed content of file {source_file_id} for {file.id}")
+
+    return {
+        "status": True,
+        "collection_name": collection_name,
+        "filename": file.filename,
+        "content": text_content,
+    }
+
+
 class ProcessFileForm(BaseModel):
     file_id: str
     content: Optional[str] = None
@@ -1461,10 +1667,30 @@ def process_file(
             if collection_name is None:
                 collection_name = f"file-{file.id}"
 
+            fingerprint = None
+            if not form_data.content and not form_data.collection_name and file.path:
+                fingerprint = get_file_processing_fingerprint(request)
+
+                source_file = (
+                    get_deduplicated_source_file(file, fingerprint)
+                    if ENABLE_FILE_DEDUPLICATION
+                    else None
+                )
+                if source_file:
+                    # Identical upload processed with the same settings;
+                    # share its content and vectors instead of redoing the work
+                    return reuse_processed_file(request, file, source_file, fingerprint)
+
             if form_data.content:
                 # Update the content in the file
                 # Usage: /files/{file_id}/data/content/update, /files/ (audio file upload pipeline)
 
+                # The new content no longer matches what other uploads of the
+                # same blob were processed into
+                detach_file_references(request, file)
+                if (file.meta or {}).get("source_file_id"):
+                    Files.update_file_metadata_by_id(file.id, {"source_file_id": None})
+
                 try:
                     # /files/{file_id}/data/content/update
                     VECTOR_DB_CLIENT.delete_collection(
@@ -1493,14 +1719,23 @@ def process_file(
                 # Usage: /knowledge/{id}/file/add, /knowledge/{id}/file/update
 
                 result = VECTOR_DB_CLIENT.query(
-                    collection_name=f"file-{file.id}", filter={"file_id": file.id}
+                    collection_name=get_file_collection_name(file),
+                    filter={
+                        "file_id": (file.meta or {}).get("source_file_id") or file.id
+                    },
                 )
 
                 if result is not None and len(result.ids[0]) > 0:
                     docs = [
                         Document(
                             page_content=result.documents[0][idx],
-                            metadata=result.metadatas[0][idx],
+                            metadata={
+                                **result.metadatas[0][idx],
+                                "name": file.filename,
+                                "created_by": file.user_id,
+                                "file_id": file.id,
+                                "source": file.filename,
+                            },
                         )
                         for idx, id in enumerate(result.ids[0])
                     ]
@@ -1525,42 +1760,7 @@ def process_file(
                 file_path = file.path
                 if file_path:
                     file_path = Storage.get_file(file_path)
-                    loader = Loader(
-                        engine=request.app.state.config.CONTENT_EXTRACTION_ENGINE,
-                        DATALAB_MARKER_API_KEY=request.app.state.config.DATALAB_MARKER_API_KEY,
-                        DATALAB_MARKER_API_BASE_URL=request.app.state.config.DATALAB_MARKER_API_BASE_URL,
-                        DATALAB_MARKER_ADDITIONAL_CONFIG=request.app.state.config.DATALAB_MARKER_ADDITIONAL_CONFIG,
-                        DATALAB_MARKER_SKIP_CACHE=request.app.state.config.DATALAB_MARKER_SKIP_CACHE,
-                        DATALAB_MARKER_FORCE_OCR=request.app.state.config.DATALAB_MARKER_FORCE_OCR,
-                        DATALAB_MARKER_PAGINATE=request.app.state.config.DATALAB_MARKER_PAGINATE,
-                        DATALAB_MARKER_STRIP_EXISTING_OCR=request.app.state.config.DATALAB_MARKER_STRIP_EXISTING_OCR,
-                        DATALAB_MARKER_DISABLE_IMAGE_EXTRACTION=request.app.state.config.DATALAB_MARKER_DISABLE_IMAGE_EXTRACTION,
-                        DATALAB_MARKER_FORMAT_LINES=request.app.state.config.DATALAB_MARKER_FORMAT_LINES,
-                        DATALAB_MARKER_USE_LLM=request.app.state.config.DATALAB_MARKER_USE_LLM,
-                        DATALAB_MARKER_OUTPUT_FORMAT=request.app.state.config.DATALAB_MARKER_OUTPUT_FORMAT,
-                        EXTERNAL_DOCUMENT_LOADER_URL=request.app.state.config.EXTERNAL_DOCUMENT_LOADER_URL,
-                        EXTERNAL_DOCUMENT_LOADER_API_KEY=request.app.state.config.EXTERNAL_DOCUMENT_LOADER_API_KEY,
-                        TIKA_SERVER_URL=request.app.state.config.TIKA_SERVER_URL,
-                        DOCLING_SERVER_URL=request.app.state.config.DOCLING_SERVER_URL,
-                        DOCLING_PARAMS={
-                            "do_ocr": request.app.state.config.DOCLING_DO_OCR,
-                            "force_ocr": request.app.state.config.DOCLING_FORCE_OCR,
-                            "ocr_engine": request.app.state.config.DOCLING_OCR_ENGINE,
-                            "ocr_lang": request.app.state.config.DOCLING_OCR_LANG,
-                            "pdf_backend": request.app.state.config.DOCLING_PDF_BACKEND,
-                            "table_mode": request.app.state.config.DOCLING_TABLE_MODE,
-                            "pipeline": request.app.state.config.DOCLING_PIPELINE,
-                            "do_picture_description": request.app.state.config.DOCLING_DO_PICTURE_DESCRIPTION,
-                            "picture_description_mode": request.app.state.config.DOCLING_PICTURE_DESCRIPTION_MODE,
-                            "picture_description_local": request.app.state.config.DOCLING_PICTURE_DESCRIPTION_LOCAL,
-                            "picture_description_api": request.app.state.config.DOCLING_PICTURE_DESCRIPTION_API,
-                            **request.app.state.config.DOCLING_PARAMS,
-                        },
-                        PDF_EXTRACT_IMAGES=request.app.state.config.PDF_EXTRACT_IMAGES,
-                        DOCUMENT_INTELLIGENCE_ENDPOINT=request.app.state.config.DOCUMENT_INTELLIGENCE_ENDPOINT,
-                        DOCUMENT_INTELLIGENCE_KEY=request.app.state.config.DOCUMENT_INTELLIGENCE_KEY,
-                        MISTRAL_OCR_API_KEY=request.app.state.config.MISTRAL_OCR_API_KEY,
-                    )
+                    loader = Loader(**get_loader_config(request))
                     docs = loader.load(
                         file.filename, file.meta.get("content_type"), file_path
                     )
@@ -1596,13 +1796,21 @@ def process_file(
             log.debug(f"text_content: {text_content}")
             Files.update_file_data_by_id(
                 file.id,
-                {"content": text_content},
+                {
+                    "content": text_content,
+                    **(
+                        {"fingerprint": fingerprint}
+                        if not form_data.collection_name
+                        else {}
+                    ),
+                },
             )
             hash = calculate_sha256_string(text_content)
             Files.update_file_hash_by_id(file.id, hash)
 
             if request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL:
                 Files.update_file_data_by_id(file.id, {"status": "completed"})
+                emit_file_status(file.id, file.user_id, "completed")
                 return {
                     "status": True,
                     "collection_name": None,
@@ -1637,6 +1845,7 @@ def process_file(
                             file.id,
                             {"status": "completed"},
                         )
+                        emit_file_status(file.id, file.user_id, "completed")
 
                         return {
                             "status": True,
@@ -1653,8 +1862,9 @@ def process_file(
             log.exception(e)
             Files.update_file_data_by_id(
                 file.id,
-                {"status": "failed"},
+                {"status": "failed", "error": str(e)},
             )
+            emit_file_status(file.id, file.user_id, "failed", str(e))
 
             if "No pandoc was found" in str(e):
                 raise HTTPException(
@@ -2025,6 +2235,26 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
         raise Exception("No search engine API key found in environment variables")
 
 
+async def search_web_with_cache(
+    request: Request, engine: str, query: str
+) -> list[SearchResult]:
+    params = {
+        "count": request.app.state.config.WEB_SEARCH_RESULT_COUNT,
+        "domain_filter_list": request.app.state.config.WEB_SEARCH_DOMAIN_FILTER_LIST,
+    }
+    if WEB_SEARCH_CACHE:
+        results = await WEB_SEARCH_CACHE.get_search_results(engine, query, **params)
+        if results is not None:
+            return [SearchResult(**result) for result in results]
+
+    results = await run_in_threadpool(search_web, request, engine, query)
+    if WEB_SEARCH_CACHE and results:
+        await WEB_SEARCH_CACHE.set_search_results(
+            engine, query, [dict(result) for result in results if result], **params
+        )
+    return results
+
+
 @router.post("/process/web/search")
 async def process_web_search(
     request: Request, form_data: SearchForm, user=Depends(get_verified_user)
@@ -2039,8 +2269,7 @@ async def process_web_search(
         )
 
         search_tasks = [
-            run_in_threadpool(
-                search_web,
+            search_web_with_cache(
                 request,
                 request.app.state.config.WEB_SEARCH_ENGINE,
                 query,
@@ -2074,6 +2303,35 @@ async def process_web_search(
             detail=ERROR_MESSAGES.DEFAULT("No results found from web search"),
         )
 
+    # Create a single collection for all documents
+    collection_name = (
+        f"web-search-{calculate_sha256_string('-'.join(form_data.queries))}"[:63]
+    )
+    # A repeated search reuses the collection while it holds the same results
+    collection_key = calculate_sha256_string(
+        json.dumps(
+            {
+                "urls": urls,
+                "bypass_web_loader": request.app.state.config.BYPASS_WEB_SEARCH_WEB_LOADER,
+                "embedding_model": request.app.state.config.RAG_EMBEDDING_MODEL,
+            }
+        )
+    )
+    if (
+        WEB_SEARCH_CACHE
+        and not request.app.state.config.BYPASS_WEB_SEARCH_EMBEDDING_AND_RETRIEVAL
+    ):
+        entry = await WEB_SEARCH_CACHE.get_collection(collection_name)
+        if (
+            entry
+            and entry["key"] == collection_key
+            and await ASYNC_VECTOR_DB_CLIENT.has_collection(
+                collection_name=collection_name
+            )
+        ):
+            log.debug(f"reusing web search collection {collection_name}")
+            return entry["response"]
+
     try:
         if request.app.state.config.BYPASS_WEB_SEARCH_WEB_LOADER:
             search_results = [
@@ -2125,13 +2383,6 @@ async def process_web_search(
                 "loaded_count": len(docs),
             }
         else:
-            # Create a single collection for all documents
-            collection_name = (
-                f"web-search-{calculate_sha256_string('-'.join(form_data.queries))}"[
-                    :63
-                ]
-            )
-
             try:
                 await run_in_threadpool(
                     save_docs_to_vector_db,
@@ -2144,13 +2395,18 @@ async def process_web_search(
             except Exception as e:
                 log.debug(f"error saving docs: {e}")
 
-            return {
+            response = {
                 "status": True,
                 "collection_names": [collection_name],
                 "items": result_items,
                 "filenames": urls,
                 "loaded_count": len(docs),
             }
+            if WEB_SEARCH_CACHE and docs:
+                await WEB_SEARCH_CACHE.set_collection(
+                    collection_name, {"key": collection_key, "response": response}
+                )
+            return response
     except Exception as e:
         log.exception(e)
         raise HTTPException(
@@ -2169,7 +2425,7 @@ class QueryDocForm(BaseModel):
 
 
 @router.post("/query/doc")
-def query_doc_handler(
+async def query_doc_handler(
     request: Request,
     form_data: QueryDocForm,
     user=Depends(get_verified_user),
@@ -2179,10 +2435,12 @@ def query_doc_handler(
             form_data.hybrid is None or form_data.hybrid
         ):
             collection_results = {}
-            collection_results[form_data.collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=form_data.collection_name
+            collection_results[form_data.collection_name] = (
+                await ASYNC_VECTOR_DB_CLIENT.get(
+                    collection_name=form_data.collection_name
+                )
             )
-            return query_doc_with_hybrid_search(
+            return await query_doc_with_hybrid_search(
                 collection_name=form_data.collection_name,
                 collection_result=collection_results[form_data.collection_name],
                 query=form_data.query,
@@ -2214,10 +2472,13 @@ def query_doc_handler(
                 user=user,
             )
         else:
-            return query_doc(
+            return await query_doc(
                 collection_name=form_data.collection_name,
-                query_embedding=request.app.state.EMBEDDING_FUNCTION(
-                    form_data.query, prefix=RAG_EMBEDDING_QUERY_PREFIX, user=user
+                query_embedding=await run_in_threadpool(
+                    request.app.state.EMBEDDING_FUNCTION,
+                    form_data.query,
+                    prefix=RAG_EMBEDDING_QUERY_PREFIX,
+                    user=user,
                 ),
                 k=form_data.k if form_data.k else request.app.state.config.TOP_K,
                 user=user,
@@ -2241,7 +2502,7 @@ class QueryCollectionsForm(BaseModel):
 
 
 @router.post("/query/collection")
-def query_collection_handler(
+async def query_collection_handler(
     request: Request,
     form_data: QueryCollectionsForm,
     user=Depends(get_verified_user),
@@ -2250,7 +2511,7 @@ def query_collection_handler(
         if request.app.state.config.ENABLE_RAG_HYBRID_SEARCH and (
             form_data.hybrid is None or form_data.hybrid
         ):
-            return query_collection_with_hybrid_search(
+            return await query_collection_with_hybrid_search(
                 collection_names=form_data.collection_names,
                 queries=[form_data.query],
                 embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
@@ -2280,7 +2541,7 @@ def query_collection_handler(
                 ),
             )
         else:
-            return query_collection(
+            return await query_collection(
                 collection_names=form_data.collection_names,
                 queries=[form_data.query],
                 embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
@@ -2334,6 +2595,230 @@ def reset_vector_db(user=Depends(get_admin_user)):
     Knowledges.delete_all_knowledge()
 
 
+# Files moved per consolidation job; every batch is a job of its own, so a
+# consolidation interrupted by a restart resumes after the last batch
+CONSOLIDATE_VECTOR_DB_BATCH_SIZE = 20
+
+CONSOLIDATE_VECTOR_DB_PROGRESS_KEY = f"{REDIS_KEY_PREFIX}:consolidate_vector_db"
+
+
+async def get_consolidate_vector_db_progress(app) -> Optional[dict]:
+    if app.state.redis is not None:
+        progress = await app.state.redis.get(CONSOLIDATE_VECTOR_DB_PROGRESS_KEY)
+        return json.loads(progress) if progress else None
+    return getattr(app.state, "CONSOLIDATE_VECTOR_DB_PROGRESS", None)
+
+
+async def set_consolidate_vector_db_progress(app, progress: dict):
+    if app.state.redis is not None:
+        await app.state.redis.set(
+            CONSOLIDATE_VECTOR_DB_PROGRESS_KEY, json.dumps(progress)
+        )
+    else:
+        app.state.CONSOLIDATE_VECTOR_DB_PROGRESS = progress
+
+
+def consolidate_file_vectors(
+    request: Request, file_id: str, knowledge_ids: list[str], user
+) -> bool:
+    """
+    Move the chunks of a file into the shared collection, returning whether
+    any were moved. Files that were already moved are skipped.
+    """
+    client = VECTOR_DB_CLIENT.client
+    collection_name = f"file-{file_id}"
+
+    migrated = False
+    if not VECTOR_DB_CLIENT.has_file_vectors(file_id):
+        result = None
+        if client.has_collection(collection_name=collection_name):
+            result = client.get(collection_name=collection_name)
+
+        # Files added in batches only have chunks in knowledge bases
+        for knowledge_id in knowledge_ids:
+            if result and result.ids[0]:
+                break
+            result = client.query(
+                collection_name=knowledge_id, filter={"file_id": file_id}
+            )
+
+        if result and result.ids[0]:
+            save_docs_to_vector_db(
+                request,
+                docs=[
+                    Document(page_content=document, metadata=metadata)
+                    for document, metadata in zip(
+                        result.documents[0], result.metadatas[0]
+                    )
+                ],
+                collection_name=collection_name,
+                split=False,
+                user=user,
+            )
+            migrated = True
+
+    if client.has_collection(collection_name=collection_name):
+        client.delete_collection(collection_name=collection_name)
+    return migrated
+
+
+def consolidate_vector_db_batch(request: Request, progress: dict, user) -> dict:
+    """
+    Consolidate the files after `progress["after_id"]`, or drop the knowledge
+    base collections once every file was moved.
+    """
+    client = VECTOR_DB_CLIENT.client
+    knowledge_bases = Knowledges.get_knowledge_bases()
+    failed_file_ids = set(progress["failed_file_ids"])
+
+    files = Files.get_file_metadatas(
+        after_id=progress["after_id"], limit=CONSOLIDATE_VECTOR_DB_BATCH_SIZE
+    )
+    if not files:
+        for knowledge_base in knowledge_bases:
+            file_ids = (knowledge_base.data or {}).get("file_ids", [])
+            if failed_file_ids.intersection(file_ids):
+                continue
+            if client.has_collection(collection_name=knowledge_base.id):
+                client.delete_collection(collection_name=knowledge_base.id)
+
+        log.info(
+            f"consolidated chunks of {progress['migrated']} files, {len(failed_file_ids)} failed"
+        )
+        return {**progress, "status": "completed", "updated_at": int(time.time())}
+
+    knowledge_ids_by_file_id = {}
+    for knowledge_base in knowledge_bases:
+        for file_id in (knowledge_base.data or {}).get("file_ids", []):
+            knowledge_ids_by_file_id.setdefault(file_id, []).append(knowledge_base.id)
+
+    migrated = 0
+    for file in files:
+        if file.meta.get("source_file_id"):
+            # Deduplicated uploads share the chunks of their source file
+            continue
+
+        try:
+            if consolidate_file_vectors(
+                request, file.id, knowledge_ids_by_file_id.get(file.id, []), user
+            ):
+                migrated += 1
+        except Exception as e:
+            log.exception(f"Error consolidating chunks of file {file.id}: {e}")
+            failed_file_ids.add(file.id)
+
+    return {
+        **progress,
+        "after_id": files[-1].id,
+        "processed": progress["processed"] + len(files),
+        "migrated": progress["migrated"] + migrated,
+        "failed_file_ids": sorted(failed_file_ids),
+        "updated_at": int(time.time()),
+    }
+
+
+async def consolidate_vector_db_job(app, payload: dict):
+    user = Users.get_user_by_id(payload["user_id"])
+    request = Request({"type": "http", "app": app, "headers": []})
+
+    progress = await run_in_threadpool(
+        consolidate_vector_db_batch, request, payload["progress"], user
+    )
+    await set_consolidate_vector_db_progress(app, progress)
+
+    if progress["status"] == "running":
+        app.state.file_processing_queue.enqueue(
+            "consolidate_vector_db",
+            {**payload, "progress": progress},
+            priority="low",
+        )
+
+
+async def consolidate_vector_db_job_failed(app, payload: dict, error: Exception):
+    await set_consolidate_vector_db_progress(
+        app,
+        {
+            **payload["progress"],
+            "status": "failed",
+            "error": str(error),
+            "updated_at": int(time.time()),
+        },
+    )
+
+
+@router.get("/consolidate/db")
+async def get_consolidate_vector_db_status(
+    request: Request, user=Depends(get_admin_user)
+):
+    return await get_consolidate_vector_db_progress(request.app) or {
+        "status": "not_started"
+    }
+
+
+@router.post("/consolidate/db")
+async def consolidate_vector_db(request: Request, user=Depends(get_admin_user)):
+    """
+    Move the chunks of per-file and knowledge base collections into the shared
+    collection used when ENABLE_CONSOLIDATED_VECTOR_COLLECTION is set, and drop
+    the old collections. Stored chunks are re-embedded as they are, without
+    re-extracting or re-splitting the files.
+
+    Files are moved in batches by background jobs, and progress is reported
+    by GET /consolidate/db. Running this again resumes a failed or abandoned
+    consolidation after its last batch. Files that were already moved are
+    skipped either way.
+    """
+    if not isinstance(VECTOR_DB_CLIENT, ConsolidatedVectorDBClient):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.DEFAULT(
+                "Consolidated vector collection is not enabled"
+            ),
+        )
+
+    file_processing_queue = request.app.state.file_processing_queue
+    if not file_processing_queue:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=ERROR_MESSAGES.DEFAULT("File processing queue is not running"),
+        )
+
+    now = int(time.time())
+    progress = await get_consolidate_vector_db_progress(request.app)
+    if (
+        progress
+        and progress["status"] == "running"
+        and now - progress["updated_at"] < (file_processing_queue.job_timeout or 3600)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=ERROR_MESSAGES.DEFAULT("Consolidation is already running"),
+        )
+
+    if progress and progress["status"] in ("running", "failed"):
+        # Resume after the last batch of a failed or abandoned consolidation
+        progress = {**progress, "status": "running", "updated_at": now}
+        progress.pop("error", None)
+    else:
+        progress = {
+            "status": "running",
+            "after_id": None,
+            "total": await run_in_threadpool(Files.get_file_count),
+            "processed": 0,
+            "migrated": 0,
+            "failed_file_ids": [],
+            "started_at": now,
+            "updated_at": now,
+        }
+    await set_consolidate_vector_db_progress(request.app, progress)
+    file_processing_queue.enqueue(
+        "consolidate_vector_db",
+        {"user_id": user.id, "progress": progress},
+        priority="low",
+    )
+    return progress
+
+
 @router.post("/reset/uploads")
 def reset_upload_dir(user=Depends(get_admin_user)) -> bool:
     folder = f"{UPLOAD_DIR}"
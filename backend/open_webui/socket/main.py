@@ -5,7 +5,7 @@ import socketio
 import logging
 import sys
 import time
-from typing import Dict, Set
+from typing import Dict, Optional, Set
 from redis import asyncio as aioredis
 import pycrdt as Y
 
@@ -29,7 +29,12 @@ from open_webui.env import (
     REDIS_KEY_PREFIX,
 )
 from open_webui.utils.auth import decode_token
-from open_webui.socket.utils import RedisDict, RedisLock, YdocManager
+from open_webui.socket.utils import (
+    EventBroadcaster,
+    RedisDict,
+    RedisLock,
+    YdocManager,
+)
 from open_webui.tasks import create_task, stop_item_tasks
 from open_webui.utils.redis import get_redis_connection
 from open_webui.utils.access_control import has_access, get_users_with_access
@@ -136,6 +141,15 @@ YDOC_MANAGER = YdocManager(
     redis_key_prefix=f"{REDIS_KEY_PREFIX}:ydoc:documents",
 )
 
+FILE_STATUS_BROADCASTER = EventBroadcaster(
+    f"{REDIS_KEY_PREFIX}:files:status",
+    redis_url=WEBSOCKET_REDIS_URL if WEBSOCKET_MANAGER == "redis" else None,
+    redis_sentinels=get_sentinels_from_env(
+        WEBSOCKET_SENTINEL_HOSTS, WEBSOCKET_SENTINEL_PORT
+    ),
+    redis_cluster=WEBSOCKET_REDIS_CLUSTER,
+)
+
 
 async def periodic_usage_pool_cleanup():
     max_retries = 2
@@ -638,6 +652,41 @@ async def disconnect(sid):
         # print(f"Unknown session ID {sid} disconnected")
 
 
+async def emit_file_event(user_id: str, file_id: str, data: dict):
+    await asyncio.gather(
+        *[
+            sio.emit(
+                "events:file",
+                {"file_id": file_id, "data": data},
+                to=session_id,
+            )
+            for session_id in USER_POOL.get(user_id, [])
+        ]
+    )
+
+
+def emit_file_status(
+    file_id: str, user_id: str, status: str, error: Optional[str] = None
+):
+    """
+    Publish a file processing status change to status stream subscribers
+    and the owner's sockets. Safe to call from worker threads.
+    """
+    data = {"status": status}
+    if error:
+        data["error"] = error
+
+    try:
+        FILE_STATUS_BROADCASTER.publish(file_id, data)
+        if FILE_STATUS_BROADCASTER.loop:
+            asyncio.run_coroutine_threadsafe(
+                emit_file_event(user_id, file_id, data),
+                FILE_STATUS_BROADCASTER.loop,
+            )
+    except Exception as e:
+        log.debug(f"Error emitting file status for {file_id}: {e}")
+
+
 def get_event_emitter(request_info, update_db=True):
     async def __event_emitter__(event_data):
         user_id = request_info["user_id"]
@@ -1,10 +1,16 @@
+import asyncio
 import json
+import logging
 import uuid
+from contextlib import asynccontextmanager
 from open_webui.utils.redis import get_redis_connection
-from open_webui.env import REDIS_KEY_PREFIX
+from open_webui.env import REDIS_KEY_PREFIX, SRC_LOG_LEVELS
 from typing import Optional, List, Tuple
 import pycrdt as Y
 
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["SOCKET"])
+
 
 class RedisLock:
     def __init__(
@@ -212,3 +218,94 @@ class YdocManager:
                 del self._updates[document_id]
             if document_id in self._users:
                 del self._users[document_id]
+
+
+class EventBroadcaster:
+    """
+    Fans out keyed events to in-process async subscribers.
+
+    With a Redis URL, events are published on a pub/sub channel and every
+    instance dispatches them to its own subscribers, so a subscriber receives
+    the event regardless of which instance published it. `publish` is safe to
+    call from worker threads.
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        redis_url: Optional[str] = None,
+        redis_sentinels=[],
+        redis_cluster=False,
+    ):
+        self.channel = channel
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._redis_args = (redis_url, redis_sentinels, redis_cluster)
+        self._redis = None
+        self._listener: Optional[asyncio.Task] = None
+
+        if redis_url:
+            self._redis = get_redis_connection(
+                redis_url,
+                redis_sentinels,
+                redis_cluster=redis_cluster,
+                decode_responses=True,
+            )
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        if self._redis:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            self._listener = None
+
+    def publish(self, key: str, data: dict):
+        if self._redis:
+            self._redis.publish(self.channel, json.dumps({"key": key, "data": data}))
+        elif self.loop:
+            self.loop.call_soon_threadsafe(self._dispatch, key, data)
+
+    @asynccontextmanager
+    async def subscribe(self, key: str):
+        queue = asyncio.Queue()
+        self._subscribers.setdefault(key, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(key)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[key]
+
+    def _dispatch(self, key: str, data: dict):
+        for queue in self._subscribers.get(key, ()):
+            queue.put_nowait(data)
+
+    async def _listen(self):
+        redis_url, redis_sentinels, redis_cluster = self._redis_args
+        redis = get_redis_connection(
+            redis_url,
+            redis_sentinels,
+            redis_cluster=redis_cluster,
+            async_mode=True,
+            decode_responses=True,
+        )
+
+        while True:
+            try:
+                pubsub = redis.pubsub()
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    event = json.loads(message["data"])
+                    self._dispatch(event["key"], event["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.exception(f"Error listening on {self.channel}: {e}")
+                await asyncio.sleep(1)
@@ -0,0 +1,126 @@
+"""
+Measure the throughput (MB/s of document text) of the text splitters used by
+save_docs_to_vector_db.
+
+    python -m open_webui.test.benchmarks.text_splitters --files docs/*.md
+
+Compares LangChain's TokenTextSplitter with Open WebUI's batch-encoding
+TokenTextSplitter, checking that both produce the same chunks, and reports
+the character and markdown header splitters for reference. Without --files, a
+synthetic markdown corpus is generated. The tiktoken encoding must be
+available locally or downloadable.
+"""
+
+import argparse
+import random
+import time
+
+from langchain.text_splitter import (
+    RecursiveCharacterTextSplitter,
+    TokenTextSplitter as LangChainTokenTextSplitter,
+)
+from langchain_core.documents import Document
+from langchain_text_splitters import MarkdownHeaderTextSplitter
+
+from open_webui.retrieval.text_splitter import TokenTextSplitter
+
+WORDS = (
+    "open webui retrieval augmented generation chunk embedding vector "
+    "document knowledge model prompt token überprüfung naïve café 文档 検索"
+).split()
+
+
+def generate_docs(count: int, size: int) -> list[Document]:
+    rng = random.Random(0)
+    docs = []
+    for i in range(count):
+        lines = []
+        while sum(len(line) for line in lines) < size:
+            if rng.random() < 0.05:
+                lines.append(f"{'#' * rng.randint(1, 4)} {rng.choice(WORDS).title()}")
+            else:
+                lines.append(" ".join(rng.choices(WORDS, k=rng.randint(5, 40))))
+        docs.append(Document(page_content="\n".join(lines), metadata={"doc": i}))
+    return docs
+
+
+def split_markdown(docs: list[Document], chunk_size: int, chunk_overlap: int):
+    markdown_splitter = MarkdownHeaderTextSplitter(
+        headers_to_split_on=[("#" * level, f"Header {level}") for level in range(1, 7)],
+        strip_headers=False,
+    )
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap, add_start_index=True
+    )
+    return [
+        chunk
+        for doc in docs
+        for chunk in text_splitter.split_documents(
+            markdown_splitter.split_text(doc.page_content)
+        )
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", nargs="*", help="text files to split")
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--doc-size", type=int, default=50_000)
+    parser.add_argument("--encoding", default="cl100k_base")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.files:
+        docs = []
+        for path in args.files:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                docs.append(Document(page_content=f.read(), metadata={"doc": path}))
+    else:
+        docs = generate_docs(args.docs, args.doc_size)
+    size = sum(len(doc.page_content.encode()) for doc in docs) / 1024 / 1024
+
+    splitters = {
+        "token (langchain)": LangChainTokenTextSplitter(
+            encoding_name=args.encoding,
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.chunk_overlap,
+            add_start_index=True,
+        ).split_documents,
+        "token (open webui)": TokenTextSplitter(
+            encoding_name=args.encoding,
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.chunk_overlap,
+            add_start_index=True,
+        ).split_documents,
+        "character": RecursiveCharacterTextSplitter(
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.chunk_overlap,
+            add_start_index=True,
+        ).split_documents,
+        "markdown_header": lambda docs: split_markdown(
+            docs, args.chunk_size, args.chunk_overlap
+        ),
+    }
+
+    print(f"{len(docs)} documents, {size:.1f} MB")
+    chunks = {}
+    for name, split in splitters.items():
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            chunks[name] = split(docs)
+            timings.append(time.perf_counter() - start)
+        print(
+            f"{name:>20}: {size / min(timings):7.2f} MB/s, {len(chunks[name])} chunks"
+        )
+
+    if [chunk.page_content for chunk in chunks["token (langchain)"]] != [
+        chunk.page_content for chunk in chunks["token (open webui)"]
+    ]:
+        raise SystemExit("Token splitters produced different chunks")
+
+
+if __name__ == "__main__":
+    main()
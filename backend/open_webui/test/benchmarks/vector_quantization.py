@@ -0,0 +1,117 @@
+"""
+Measure recall, latency and memory of VECTOR_DB_QUANTIZATION on the configured
+vector database.
+
+    VECTOR_DB=qdrant QDRANT_URI=http://localhost:6333 VECTOR_DB_QUANTIZATION=int8 \\
+        python -m open_webui.test.benchmarks.vector_quantization --rows 50000
+
+Run it once per VECTOR_DB_QUANTIZATION setting ("", float16, int8, binary) and
+with VECTOR_DB_QUANTIZATION_RESCORE=false to compare. Recall is measured
+against an exact numpy search over the same vectors. Pass --embeddings with a
+.npy file of real embeddings for meaningful numbers; random vectors have no
+neighbourhood structure and are a worst case for quantization. The benchmark
+writes to a throwaway collection that is deleted afterwards.
+"""
+
+import argparse
+import statistics
+import time
+import uuid
+
+import numpy as np
+
+from open_webui.config import (
+    VECTOR_DB,
+    VECTOR_DB_QUANTIZATION,
+    VECTOR_DB_QUANTIZATION_RESCORE,
+)
+from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+
+BYTES_PER_DIMENSION = {"": 4, "float16": 2, "int8": 1, "binary": 1 / 8}
+
+
+def load_vectors(args) -> np.ndarray:
+    if args.embeddings:
+        vectors = np.load(args.embeddings)[: args.rows]
+    else:
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((args.rows, args.dimensions))
+    vectors = vectors.astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--dimensions", type=int, default=768)
+    parser.add_argument("--embeddings", help=".npy file of embeddings to use")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    vectors = load_vectors(args)
+    rows, dimensions = vectors.shape
+    ids = [str(uuid.uuid4()) for _ in range(rows)]
+
+    # Queries are perturbed copies of stored vectors, like a question that is
+    # close to, but not the same as, a stored chunk
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.choice(rows, args.queries, replace=False)]
+    queries = queries + rng.standard_normal(queries.shape).astype(np.float32) * 0.05
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    expected = np.argsort(-(queries @ vectors.T), axis=1)[:, : args.k]
+
+    collection_name = f"benchmark-{uuid.uuid4().hex}"
+    try:
+        for start in range(0, rows, 1_000):
+            VECTOR_DB_CLIENT.insert(
+                collection_name,
+                [
+                    {
+                        "id": ids[i],
+                        "text": f"benchmark chunk {i}",
+                        "vector": vectors[i].tolist(),
+                        "metadata": {"row": i},
+                    }
+                    for i in range(start, min(start + 1_000, rows))
+                ],
+            )
+
+        row_by_id = {id: i for i, id in enumerate(ids)}
+        latencies = []
+        hits = 0
+        for query, neighbours in zip(queries, expected):
+            start = time.perf_counter()
+            result = VECTOR_DB_CLIENT.search(
+                collection_name, vectors=[query.tolist()], limit=args.k
+            )
+            latencies.append(time.perf_counter() - start)
+            found = {row_by_id[id] for id in result.ids[0]}
+            hits += len(found & set(neighbours.tolist()))
+    finally:
+        VECTOR_DB_CLIENT.delete_collection(collection_name)
+
+    latencies.sort()
+    quantization = (
+        VECTOR_DB_QUANTIZATION
+        if VECTOR_DB_QUANTIZATION in VECTOR_DB_CLIENT.supported_quantizations
+        else ""
+    )
+    print(f"{VECTOR_DB}: {rows} x {dimensions} vectors, {args.queries} queries")
+    print(
+        f"quantization: {quantization or 'none'}"
+        f"{' (rescored)' if quantization and VECTOR_DB_QUANTIZATION_RESCORE else ''}"
+    )
+    print(f"recall@{args.k}: {hits / (args.queries * args.k):.3f}")
+    print(
+        f"latency: p50 {statistics.median(latencies) * 1000:.1f}ms, "
+        f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:.1f}ms"
+    )
+    print(
+        f"index vector size: {BYTES_PER_DIMENSION[quantization] * dimensions:,.0f} bytes"
+        f" (float32: {4 * dimensions:,} bytes)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Local stand-in for a Cohere/Jina compatible `/v1/rerank` endpoint.
+
+Scores a document by the share of query words it contains. Used by the tests,
+and can be run on its own to try RAG_RERANKING_ENGINE=external without a
+provider:
+
+    python -m open_webui.test.util.reranker_server --port 8089
+"""
+
+import argparse
+import json
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def score(query: str, document: str) -> float:
+    words = set(query.lower().split())
+    if not words:
+        return 0.0
+    return len(words & set(document.lower().split())) / len(words)
+
+
+class RerankServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), failures: int = 0):
+        super().__init__(address, RerankHandler)
+        # Requests answered with a 503 before serving, to exercise retries
+        self.failures = failures
+        self.requests = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1/rerank"
+
+
+class RerankHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+        with self.server.lock:
+            self.server.requests.append(payload)
+            fail = self.server.failures > 0
+            self.server.failures -= 1 if fail else 0
+
+        if fail:
+            self.send_response(503)
+            self.end_headers()
+            return
+
+        results = sorted(
+            (
+                {"index": idx, "relevance_score": score(payload["query"], doc)}
+                for idx, doc in enumerate(payload["documents"])
+            ),
+            key=lambda result: result["relevance_score"],
+            reverse=True,
+        )[: payload.get("top_n")]
+
+        body = json.dumps({"model": payload.get("model"), "results": results})
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def run_rerank_server(**kwargs):
+    server = RerankServer(**kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    args = parser.parse_args()
+
+    server = RerankServer((args.host, args.port))
+    print(f"Serving {server.url}")
+    server.serve_forever()
@@ -0,0 +1,153 @@
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pytest
+
+from open_webui.utils.code_interpreter import JupyterKernelPool
+
+pytest.importorskip("jupyter_server")
+pytest.importorskip("ipykernel")
+
+TOKEN = "open-webui-test"
+
+
+@pytest.fixture(scope="module")
+def jupyter_url():
+    """A Jupyter server started locally for the tests"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "jupyter_server",
+            f"--ServerApp.port={port}",
+            "--ServerApp.ip=127.0.0.1",
+            f"--IdentityProvider.token={TOKEN}",
+            "--ServerApp.open_browser=False",
+            "--allow-root",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                urllib.request.urlopen(f"{url}/api/status?token={TOKEN}", timeout=1)
+                break
+            except Exception:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise
+                time.sleep(0.2)
+        yield url
+    finally:
+        process.terminate()
+        process.wait(10)
+
+
+async def list_kernel_ids(pool: JupyterKernelPool) -> set[str]:
+    async with pool.client.session.get("api/kernels", params=pool.client.params) as r:
+        return {kernel["id"] for kernel in await r.json()}
+
+
+async def wait_for_warm_kernels(pool: JupyterKernelPool, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while len(pool._warm) < pool.size:
+        if time.monotonic() > deadline:
+            raise TimeoutError("Kernel pool was not filled")
+        await asyncio.sleep(0.1)
+
+
+class TestJupyterKernelPool:
+    """Test the Jupyter kernel pool against a local Jupyter server"""
+
+    @pytest.mark.asyncio
+    async def test_variables_persist_per_session(self, jupyter_url):
+        """Code blocks of a session share a kernel, other sessions don't"""
+        pool = JupyterKernelPool(jupyter_url, token=TOKEN, size=1)
+        try:
+            await pool.execute("x = 41", session_id="chat-1")
+            result = await pool.execute("print(x + 1)", session_id="chat-1")
+            assert result.stdout == "42"
+
+            result = await pool.execute("print(x)", session_id="chat-2")
+            assert "NameError" in result.stderr
+
+            result = await pool.execute("print(x)")
+            assert "NameError" in result.stderr
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_warm_kernels_are_used_and_refilled(self, jupyter_url):
+        """Executions take a started kernel, the pool starts another one"""
+        pool = JupyterKernelPool(jupyter_url, token=TOKEN, size=2)
+        try:
+            await pool.execute("1")
+            await wait_for_warm_kernels(pool)
+            warm_ids = {kernel.id for kernel in pool._warm}
+
+            await pool.execute("1", session_id="chat")
+            assert pool._sessions["chat"].id in warm_ids
+            await wait_for_warm_kernels(pool)
+
+            # Kernels of executions without a session are shut down
+            assert await list_kernel_ids(pool) == {
+                kernel.id for kernel in [*pool._warm, *pool._sessions.values()]
+            }
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_kernels_are_recycled(self, jupyter_url):
+        """Kernels are replaced after `max_executions` executions"""
+        pool = JupyterKernelPool(jupyter_url, token=TOKEN, size=0, max_executions=2)
+        try:
+            await pool.execute("x = 1", session_id="chat")
+            kernel_id = pool._sessions["chat"].id
+            await pool.execute("x += 1", session_id="chat")
+            assert "chat" not in pool._sessions
+
+            result = await pool.execute("print(x)", session_id="chat")
+            assert "NameError" in result.stderr
+            assert pool._sessions["chat"].id != kernel_id
+            assert kernel_id not in await list_kernel_ids(pool)
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_idle_and_excess_kernels_are_shut_down(self, jupyter_url):
+        """Inactive sessions lose their kernel to idleness or to other sessions"""
+        pool = JupyterKernelPool(jupyter_url, token=TOKEN, size=0, max_kernels=2)
+        try:
+            for session_id in ["chat-1", "chat-2", "chat-3"]:
+                await pool.execute("1", session_id=session_id)
+            assert list(pool._sessions) == ["chat-2", "chat-3"]
+
+            pool.idle_timeout = 0
+            await pool.cleanup()
+            assert not pool._sessions
+            assert not await list_kernel_ids(pool)
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_timed_out_execution_is_interrupted(self, jupyter_url):
+        """A timed out execution doesn't keep the session's kernel busy"""
+        pool = JupyterKernelPool(jupyter_url, token=TOKEN, timeout=1, size=0)
+        try:
+            result = await pool.execute("import time; time.sleep(30)", "chat")
+            assert "Execution timed out." in result.stderr
+
+            result = await pool.execute("print('done')", "chat")
+            assert result.stdout == "done"
+        finally:
+            await pool.close()
@@ -0,0 +1,47 @@
+from open_webui.retrieval.models.external import ExternalReranker
+from open_webui.test.util.reranker_server import run_rerank_server, score
+
+QUERY = "open webui reranker"
+DOCS = [f"document {i} about open webui" if i % 2 else f"doc {i}" for i in range(10)]
+
+
+class TestExternalReranker:
+    """Test the external reranker client against a local stand-in server"""
+
+    def test_batches_keep_document_order(self):
+        """Documents split across batches are scored in their original order"""
+        with run_rerank_server() as server:
+            reranker = ExternalReranker(api_key="key", url=server.url, batch_size=3)
+
+            scores = reranker.predict([(QUERY, doc) for doc in DOCS])
+
+            assert scores == [score(QUERY, doc) for doc in DOCS]
+            assert sorted(len(r["documents"]) for r in server.requests) == [1, 3, 3, 3]
+
+    def test_cached_documents_are_not_sent_again(self):
+        """Only documents without a cached score for the query are sent"""
+        with run_rerank_server() as server:
+            reranker = ExternalReranker(api_key="key", url=server.url)
+
+            reranker.predict([(QUERY, doc) for doc in DOCS[:6]])
+            scores = reranker.predict([(QUERY, doc) for doc in DOCS])
+
+            assert scores == [score(QUERY, doc) for doc in DOCS]
+            assert [r["documents"] for r in server.requests] == [DOCS[:6], DOCS[6:]]
+
+            # Another query is scored again
+            reranker.predict([("other query", doc) for doc in DOCS])
+            assert len(server.requests) == 3
+
+    def test_retries_unavailable_server(self):
+        """Failed requests are retried before giving up"""
+        with run_rerank_server(failures=2) as server:
+            reranker = ExternalReranker(api_key="key", url=server.url)
+
+            assert reranker.predict([(QUERY, doc) for doc in DOCS]) is not None
+            assert len(server.requests) == 3
+
+        with run_rerank_server(failures=10) as server:
+            reranker = ExternalReranker(api_key="key", url=server.url, max_retries=1)
+
+            assert reranker.predict([(QUERY, doc) for doc in DOCS]) is None
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+
+import pytest
+
+from open_webui.utils.job_queue import JobFailedError, LocalJobQueue
+
+
+async def wait_for_idle(queue: LocalJobQueue, timeout: float = 10):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
+        status = await queue.get_status()
+        if not any(status["depth"].values()) and status["in_flight"] == 0:
+            return status
+        await asyncio.sleep(0.05)
+    raise TimeoutError("Job queue did not drain")
+
+
+class TestLocalJobQueue:
+    """Test the in-process job queue backend"""
+
+    @pytest.mark.asyncio
+    async def test_high_priority_jobs_run_first(self):
+        """Queued high priority jobs are picked up before low priority ones"""
+        queue = LocalJobQueue("test", workers=1)
+        order = []
+        gate = threading.Event()
+
+        def handler(app, payload):
+            gate.wait(5)
+            order.append(payload["id"])
+
+        queue.register("job", handler)
+        await queue.start(None)
+
+        # The first job blocks the only worker while the rest are queued
+        queue.enqueue("job", {"id": "first"})
+        await asyncio.sleep(0.1)
+        queue.enqueue("job", {"id": "low-1"}, priority="low")
+        queue.enqueue("job", {"id": "low-2"}, priority="low")
+        queue.enqueue("job", {"id": "high"}, priority="high")
+        await asyncio.sleep(0.1)
+        gate.set()
+
+        await wait_for_idle(queue)
+        await queue.stop()
+
+        assert order == ["first", "high", "low-1", "low-2"]
+
+    @pytest.mark.asyncio
+    async def test_non_retryable_failure_is_dead_lettered(self):
+        """JobFailedError skips retries and calls the failure hook once"""
+        queue = LocalJobQueue("test", workers=1, max_retries=3)
+        calls = []
+        failures = []
+
+        def handler(app, payload):
+            calls.append(payload)
+            raise JobFailedError("unsupported file")
+
+        queue.register(
+            "job",
+            handler,
+            on_failure=lambda app, payload, error: failures.append(str(error)),
+        )
+        await queue.start(None)
+        queue.enqueue("job", {"id": 1})
+        await asyncio.sleep(0.1)
+
+        status = await wait_for_idle(queue)
+        await queue.stop()
+
+        assert len(calls) == 1
+        assert failures == ["unsupported file"]
+        assert status["dead_letters"]["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_transient_failure_is_retried(self):
+        """Unexpected errors are retried before the job is given up on"""
+        queue = LocalJobQueue("test", workers=1, max_retries=1)
+        calls = []
+
+        def handler(app, payload):
+            calls.append(payload)
+            if len(calls) == 1:
+                raise ConnectionError("embedding server unavailable")
+
+        queue.register("job", handler)
+        await queue.start(None)
+        queue.enqueue("job", {"id": 1})
+
+        # First retry is scheduled with a 2s backoff
+        await asyncio.sleep(2.5)
+        status = await wait_for_idle(queue)
+        await queue.stop()
+
+        assert len(calls) == 2
+        assert status["dead_letters"]["count"] == 0
+        assert status["timings"]["processing"]["count"] == 2
+
+    def test_enqueue_unknown_job(self):
+        """Enqueueing a job without a registered handler fails fast"""
+        queue = LocalJobQueue("test")
+        with pytest.raises(ValueError):
+            queue.enqueue("missing", {})
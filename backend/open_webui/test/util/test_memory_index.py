@@ -0,0 +1,228 @@
+from types import SimpleNamespace
+
+import pytest
+
+from open_webui.models.memories import MemoryModel
+from open_webui.retrieval.memory_index import MemoryIndex, MemoryIndexEntry
+from open_webui.routers import memories
+
+USER = SimpleNamespace(id="user")
+
+VECTORS = {
+    "north": [0.0, 1.0],
+    "east": [2.0, 0.0],
+    "south": [0.0, -1.0],
+    "north east": [1.0, 1.0],
+}
+
+
+def make_entry(vectors: dict[str, list[float]]) -> MemoryIndexEntry:
+    return MemoryIndexEntry(
+        {
+            id: {"id": id, "text": id, "metadata": {"name": id}, "vector": vector}
+            for id, vector in vectors.items()
+        }
+    )
+
+
+def make_memory(id: str, content: str) -> MemoryModel:
+    return MemoryModel(
+        id=id, user_id=USER.id, content=content, created_at=0, updated_at=0
+    )
+
+
+class FakeEmbeddings:
+    """Embedding function of a request, recording what it embedded"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, user=None):
+        self.calls.append(texts)
+        if isinstance(texts, str):
+            return VECTORS[texts]
+        return [VECTORS[text] for text in texts]
+
+
+@pytest.fixture
+def request_():
+    return SimpleNamespace(
+        app=SimpleNamespace(
+            state=SimpleNamespace(
+                config=SimpleNamespace(
+                    RAG_EMBEDDING_ENGINE="", RAG_EMBEDDING_MODEL="model"
+                ),
+                EMBEDDING_FUNCTION=FakeEmbeddings(),
+            )
+        )
+    )
+
+
+@pytest.fixture
+def memory_index(monkeypatch):
+    index = MemoryIndex(size=10, max_memories=3)
+    monkeypatch.setattr(memories, "MEMORY_INDEX", index)
+    return index
+
+
+class TestMemoryIndexEntry:
+    """Test searching the memories of a user"""
+
+    def test_results_are_ordered_by_similarity(self):
+        """The closest memories come first, regardless of vector length"""
+        entry = make_entry(VECTORS)
+
+        result = entry.search([3.0, 0.1], limit=3)
+
+        assert result.ids == [["east", "north east", "north"]]
+        assert result.documents == [["east", "north east", "north"]]
+        assert result.metadatas[0][0] == {"name": "east"}
+
+    def test_distances_are_scaled_to_vector_db_scores(self):
+        """Cosine similarities of -1..1 are reported as 0 (worst) to 1 (best)"""
+        entry = make_entry(VECTORS)
+
+        result = entry.search([0.0, 5.0], limit=10)
+
+        assert result.ids == [["north", "north east", "east", "south"]]
+        assert result.distances[0] == pytest.approx([1.0, 0.8535534, 0.5, 0.0])
+
+    def test_empty_entry(self):
+        result = make_entry({}).search([1.0, 0.0], limit=3)
+
+        assert result.ids == [[]]
+        assert result.distances == [[]]
+
+
+async def build_memory_index(request_, user_memories):
+    result = await memories.search_memory_index(
+        request_, user_memories, VECTORS["north"], 1, USER
+    )
+    assert result is None
+    await memories.MEMORY_INDEX_BUILDS[USER.id]
+
+
+class TestSearchMemoryIndex:
+    """Test reconciling the memory index with the database before a search"""
+
+    @pytest.mark.asyncio
+    async def test_missing_index_is_built_in_background(self, request_, memory_index):
+        embeddings = request_.app.state.EMBEDDING_FUNCTION
+
+        await build_memory_index(
+            request_, [make_memory("1", "north"), make_memory("2", "east")]
+        )
+
+        assert embeddings.calls == [["north", "east"]]
+        assert USER.id not in memories.MEMORY_INDEX_BUILDS
+        entry = await memory_index.get(USER.id, ":model")
+        assert entry is not None and list(entry.items) == ["1", "2"]
+
+    @pytest.mark.asyncio
+    async def test_only_new_and_edited_memories_are_embedded(
+        self, request_, memory_index
+    ):
+        embeddings = request_.app.state.EMBEDDING_FUNCTION
+        await build_memory_index(
+            request_, [make_memory("1", "north"), make_memory("2", "east")]
+        )
+        assert embeddings.calls == [["north", "east"]]
+
+        result = await memories.search_memory_index(
+            request_,
+            [
+                make_memory("1", "north"),
+                make_memory("2", "south"),
+                make_memory("3", "north east"),
+            ],
+            VECTORS["south"],
+            1,
+            USER,
+        )
+
+        assert embeddings.calls[1] == ["south", "north east"]
+        assert result.ids == [["2"]]
+
+        await memories.search_memory_index(
+            request_,
+            [
+                make_memory("1", "north"),
+                make_memory("2", "south"),
+                make_memory("3", "north east"),
+            ],
+            VECTORS["south"],
+            1,
+            USER,
+        )
+        assert len(embeddings.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_deleted_memories_are_dropped(self, request_, memory_index):
+        embeddings = request_.app.state.EMBEDDING_FUNCTION
+        await build_memory_index(
+            request_, [make_memory("1", "north"), make_memory("2", "east")]
+        )
+
+        result = await memories.search_memory_index(
+            request_, [make_memory("2", "east")], VECTORS["north"], 5, USER
+        )
+
+        assert result.ids == [["2"]]
+        assert len(embeddings.calls) == 1
+        entry = await memory_index.get(USER.id, ":model")
+        assert entry is not None and list(entry.items) == ["2"]
+
+
+class TestQueryMemory:
+    """Test choosing between the memory index and the vector DB"""
+
+    @pytest.mark.asyncio
+    async def test_users_with_many_memories_are_searched_in_the_vector_db(
+        self, request_, memory_index, monkeypatch
+    ):
+        searches = []
+
+        async def search(collection_name, vectors, limit):
+            searches.append(collection_name)
+            return "vector db result"
+
+        user_memories = [make_memory(str(i), text) for i, text in enumerate(VECTORS)]
+        monkeypatch.setattr(
+            memories.Memories, "get_memories_by_user_id", lambda user_id: user_memories
+        )
+        monkeypatch.setattr(
+            memories, "ASYNC_VECTOR_DB_CLIENT", SimpleNamespace(search=search)
+        )
+
+        result = await memories.query_memory(
+            request_, memories.QueryMemoryForm(content="north", k=1), user=USER
+        )
+
+        assert result == "vector db result"
+        assert searches == [f"user-memory-{USER.id}"]
+        # Only the query was embedded, the memories were not indexed
+        assert request_.app.state.EMBEDDING_FUNCTION.calls == ["north"]
+        assert await memory_index.get(USER.id, ":model") is None
+
+    @pytest.mark.asyncio
+    async def test_vector_db_is_searched_while_the_index_is_built(
+        self, request_, memory_index, monkeypatch
+    ):
+        async def search(collection_name, vectors, limit):
+            return "vector db result"
+
+        user_memories = [make_memory("1", "north"), make_memory("2", "east")]
+        monkeypatch.setattr(
+            memories.Memories, "get_memories_by_user_id", lambda user_id: user_memories
+        )
+        monkeypatch.setattr(
+            memories, "ASYNC_VECTOR_DB_CLIENT", SimpleNamespace(search=search)
+        )
+        form_data = memories.QueryMemoryForm(content="east", k=1)
+
+        result = await memories.query_memory(request_, form_data, user=USER)
+        assert result == "vector db result"
+
+        await memories.MEMORY_INDEX_BUILDS[USER.id]
+        result = await memories.query_memory(request_, form_data, user=USER)
+        assert result.ids == [["2"]]
@@ -0,0 +1,62 @@
+import pytest
+from fpdf import FPDF
+from langchain_community.document_loaders import PyPDFLoader
+
+from open_webui.retrieval.loaders.pdf import (
+    ParallelPyPDFLoader,
+    load_pdf_pages,
+    merge_text_and_extras,
+)
+
+
+@pytest.fixture(scope="module")
+def pdf_path(tmp_path_factory):
+    pdf = FPDF()
+    pdf.set_title("Test document")
+    pdf.set_author("Open WebUI")
+    pdf.set_font("helvetica", size=12)
+    for page in range(7):
+        pdf.add_page()
+        pdf.multi_cell(0, 10, f"Page {page + 1} title")
+        pdf.ln()
+        pdf.multi_cell(0, 10, f"First paragraph of page {page + 1}.")
+        pdf.ln()
+        pdf.multi_cell(0, 10, f"Footer {page + 1}")
+
+    path = tmp_path_factory.mktemp("pdf") / "test.pdf"
+    pdf.output(str(path))
+    return str(path)
+
+
+class TestParallelPyPDFLoader:
+    """Test extracting PDFs in page ranges like PyPDFLoader"""
+
+    def test_pages_match_pypdf_loader(self, pdf_path):
+        """Extracted ranges have the content and metadata of PyPDFLoader"""
+        expected = PyPDFLoader(pdf_path).load()
+
+        assert load_pdf_pages(pdf_path, 2, 5) == expected[2:5]
+
+        docs = ParallelPyPDFLoader(pdf_path, workers=3, min_pages_per_worker=2).load()
+        assert docs == expected
+        assert [doc.metadata["page"] for doc in docs] == list(range(7))
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "",
+            "single paragraph",
+            "title\n\nbody\n\nfooter",
+            "title\n\n\nbody\n\nfooter",
+            "no footer\n\nbody",
+        ],
+    )
+    @pytest.mark.parametrize("extras", [[], [""], ["image text"], ["a", "b"]])
+    def test_extras_are_merged_like_pypdf_parser(self, text, extras):
+        from langchain_community.document_loaders.parsers.pdf import (
+            _merge_text_and_extras,
+        )
+
+        assert merge_text_and_extras(extras, text) == _merge_text_and_extras(
+            extras, text
+        )
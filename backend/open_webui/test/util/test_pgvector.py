@@ -0,0 +1,122 @@
+import os
+import uuid
+
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("PGVECTOR_DB_URL"),
+    reason="PGVECTOR_DB_URL is not set",
+)
+
+pytest.importorskip("asyncpg")
+
+
+@pytest.fixture
+def collection():
+    from open_webui.retrieval.vector.dbs.pgvector import PgvectorClient
+
+    client = PgvectorClient()
+    collection_name = f"test-{uuid.uuid4()}"
+    client.insert(
+        collection_name,
+        [
+            {
+                "id": f"{collection_name}-{i}",
+                "text": f"chunk {i}",
+                "vector": [1.0, float(i)],
+                "metadata": {"index": i},
+            }
+            for i in range(5)
+        ],
+    )
+    try:
+        yield client, collection_name
+    finally:
+        client.delete_collection(collection_name)
+
+
+class TestPgvectorClient:
+    """Test the pgvector client against the database at PGVECTOR_DB_URL"""
+
+    def test_partial_index_is_built_in_background(self, collection, monkeypatch):
+        """Collections above the threshold get a valid index of their own"""
+        from sqlalchemy import text
+
+        from open_webui.retrieval.vector.dbs import pgvector
+
+        client, collection_name = collection
+        monkeypatch.setattr(pgvector, "PGVECTOR_PARTIAL_INDEX_THRESHOLD", 5)
+        index_name = pgvector.get_partial_index_name(collection_name)
+
+        client.ensure_partial_index(collection_name)
+        client.index_executor.submit(lambda: None).result()
+
+        valid = client.session.execute(
+            text(
+                "SELECT indisvalid FROM pg_index "
+                "WHERE indexrelid = to_regclass(:name)"
+            ),
+            {"name": index_name},
+        ).scalar()
+        client.session.rollback()
+        assert valid is True
+        assert collection_name in client.partial_indexes
+
+        client.delete_collection(collection_name)
+        assert collection_name not in client.partial_indexes
+
+    def test_superseded_vector_index_is_dropped(self, collection):
+        """The vector index is built in the background and replaces older ones"""
+        from sqlalchemy import text
+
+        from open_webui.retrieval.vector.dbs import pgvector
+
+        client, _ = collection
+        client.session.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS idx_document_chunk_vector_superseded "
+                "ON document_chunk (collection_name)"
+            )
+        )
+        client.session.commit()
+
+        client.index_executor.submit(client.build_vector_index).result()
+
+        indexes = client.session.execute(
+            text(
+                "SELECT indexrelid::regclass::text, indisvalid FROM pg_index "
+                "WHERE indrelid = 'document_chunk'::regclass"
+            )
+        ).all()
+        client.session.rollback()
+        assert (pgvector.get_vector_index_name(), True) in indexes
+        assert "idx_document_chunk_vector_superseded" not in dict(indexes)
+
+
+class TestAsyncPgvectorClient:
+    """Test the asyncpg reads against the database at PGVECTOR_DB_URL"""
+
+    @pytest.mark.asyncio
+    async def test_search_returns_rows(self, collection):
+        """Searches return the closest chunks, as the synchronous client does"""
+        from open_webui.retrieval.vector.dbs.pgvector import AsyncPgvectorClient
+
+        client, collection_name = collection
+        async_client = AsyncPgvectorClient(client, max_workers=1)
+        try:
+            result = await async_client.search(
+                collection_name, [[1.0, 0.0], [1.0, 4.0]], limit=2
+            )
+
+            assert result is not None
+            assert result.ids == [
+                [f"{collection_name}-0", f"{collection_name}-1"],
+                [f"{collection_name}-4", f"{collection_name}-3"],
+            ]
+            assert result.documents[0] == ["chunk 0", "chunk 1"]
+            assert result.metadatas[1][0] == {"index": 4}
+            assert result == client.search(
+                collection_name, [[1.0, 0.0], [1.0, 4.0]], limit=2
+            )
+        finally:
+            await async_client.engine.dispose()
@@ -0,0 +1,43 @@
+import pytest
+from langchain_core.documents import Document
+from langchain_text_splitters import TokenTextSplitter as LangChainTokenTextSplitter
+
+from open_webui.retrieval.text_splitter import TokenTextSplitter
+
+ENCODING = "cl100k_base"
+DOCS = [
+    Document(page_content=" ".join(["open webui"] * 500), metadata={"doc": 0}),
+    Document(page_content="naïve café 文档検索 😀 " * 200, metadata={"doc": 1}),
+    Document(page_content="", metadata={"doc": 2}),
+    Document(page_content="short", metadata={"doc": 3}),
+]
+
+
+class TestTokenTextSplitter:
+    """Test the batch-encoding token splitter against LangChain's"""
+
+    @pytest.mark.parametrize("chunk_size,chunk_overlap", [(50, 0), (50, 10), (7, 6)])
+    def test_same_chunks_as_langchain(self, chunk_size, chunk_overlap):
+        """Documents are split into the same chunks, with the same metadata"""
+        kwargs = dict(
+            encoding_name=ENCODING, chunk_size=chunk_size, chunk_overlap=chunk_overlap
+        )
+        expected = LangChainTokenTextSplitter(**kwargs).split_documents(DOCS)
+        chunks = TokenTextSplitter(**kwargs).split_documents(DOCS)
+
+        assert [(c.page_content, c.metadata) for c in chunks] == [
+            (c.page_content, c.metadata) for c in expected
+        ]
+
+    def test_start_index(self):
+        """Overlapping chunks start at the offset of their first token"""
+        splitter = TokenTextSplitter(
+            encoding_name=ENCODING, chunk_size=20, chunk_overlap=5, add_start_index=True
+        )
+
+        for chunk in splitter.split_documents(DOCS[:1]):
+            text = DOCS[0].page_content
+            start_index = chunk.metadata["start_index"]
+            assert text[start_index : start_index + len(chunk.page_content)] == (
+                chunk.page_content
+            )
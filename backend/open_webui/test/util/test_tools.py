@@ -0,0 +1,124 @@
+import asyncio
+import threading
+import time
+from functools import partial
+
+import pytest
+
+from open_webui.utils.tools import (
+    call_tool,
+    execute_tool_calls,
+    get_async_tool_function_and_apply_extra_params,
+)
+
+
+def make_tool(function, tool_id="tool", **metadata) -> dict:
+    return {
+        "tool_id": tool_id,
+        "callable": get_async_tool_function_and_apply_extra_params(function, {}),
+        "metadata": metadata,
+    }
+
+
+def make_call(tool: dict, name: str, **params):
+    return (tool, partial(call_tool, tool, name, params, metadata={}))
+
+
+class TestExecuteToolCalls:
+    """Test running the tool calls of a response"""
+
+    @pytest.mark.asyncio
+    async def test_sync_tools_run_concurrently_in_order(self):
+        """Blocking tools run side by side, results keep the order of the calls"""
+
+        def wait(seconds: float) -> float:
+            time.sleep(seconds)
+            return seconds
+
+        tool = make_tool(wait)
+        start = time.monotonic()
+        results = await execute_tool_calls(
+            [make_call(tool, "wait", seconds=s) for s in [0.6, 0.2, 0.4]]
+        )
+
+        assert results == [0.6, 0.2, 0.4]
+        assert time.monotonic() - start < 1.0
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """No more than max_concurrency calls run at once"""
+        running = 0
+        max_running = 0
+        lock = threading.Lock()
+
+        def count() -> None:
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            time.sleep(0.1)
+            with lock:
+                running -= 1
+
+        tool = make_tool(count)
+        await execute_tool_calls(
+            [make_call(tool, "count") for _ in range(6)], max_concurrency=2
+        )
+
+        assert max_running == 2
+
+    @pytest.mark.asyncio
+    async def test_non_concurrent_tool_runs_one_call_at_a_time(self):
+        """Calls of a tool with `concurrent = False` are serialized"""
+        events = []
+
+        async def record(label: str) -> str:
+            events.append(f"start {label}")
+            await asyncio.sleep(0.05)
+            events.append(f"end {label}")
+            return label
+
+        tool = make_tool(record, "serial", concurrent=False)
+        other = make_tool(record, "other")
+        results = await execute_tool_calls(
+            [
+                make_call(tool, "record", label="a"),
+                make_call(tool, "record", label="b"),
+                make_call(other, "record", label="c"),
+            ]
+        )
+
+        assert results == ["a", "b", "c"]
+        assert events.index("end a") < events.index("start b")
+        # Other tools are not held up by the serialized one
+        assert events.index("start c") < events.index("end a")
+
+    @pytest.mark.asyncio
+    async def test_blocking_tool_times_out(self):
+        """A blocking tool fails after its timeout without stalling the others"""
+
+        def hang() -> None:
+            time.sleep(1.5)
+
+        def answer() -> int:
+            return 42
+
+        slow = make_tool(hang, "slow", timeout=0.2)
+        fast = make_tool(answer, "fast")
+
+        async def safe_call(tool, name):
+            try:
+                return await call_tool(tool, name, {}, metadata={})
+            except Exception as e:
+                return str(e)
+
+        start = time.monotonic()
+        results = await execute_tool_calls(
+            [
+                (slow, partial(safe_call, slow, "hang")),
+                (fast, partial(safe_call, fast, "answer")),
+            ]
+        )
+
+        assert results == ["Tool hang timed out after 0.2 seconds", 42]
+        assert time.monotonic() - start < 1.0
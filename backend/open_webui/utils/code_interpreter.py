@@ -1,14 +1,23 @@
 import asyncio
+import hashlib
 import json
 import logging
+import time
 import uuid
+from collections import OrderedDict
 from typing import Optional
 
 import aiohttp
 import websockets
 from pydantic import BaseModel
 
-from open_webui.env import SRC_LOG_LEVELS
+from open_webui.env import (
+    JUPYTER_KERNEL_POOL_IDLE_TIMEOUT,
+    JUPYTER_KERNEL_POOL_MAX_EXECUTIONS,
+    JUPYTER_KERNEL_POOL_MAX_KERNELS,
+    JUPYTER_KERNEL_POOL_SIZE,
+    SRC_LOG_LEVELS,
+)
 
 logger = logging.getLogger(__name__)
 logger.setLevel(SRC_LOG_LEVELS["MAIN"])
@@ -24,62 +33,36 @@ class ResultModel(BaseModel):
     result: Optional[str] = ""
 
 
-class JupyterCodeExecuter:
+class JupyterClient:
     """
-    Execute code in jupyter notebook
+    Client of a Jupyter server, managing kernels and executing code in them
     """
 
     def __init__(
         self,
         base_url: str,
-        code: str,
         token: str = "",
         password: str = "",
         timeout: int = 60,
     ):
         """
         :param base_url: Jupyter server URL (e.g., "http://localhost:8888")
-        :param code: Code to execute
         :param token: Jupyter authentication token (optional)
         :param password: Jupyter password (optional)
         :param timeout: WebSocket timeout in seconds (default: 60s)
         """
         self.base_url = base_url
-        self.code = code
         self.token = token
         self.password = password
         self.timeout = timeout
-        self.kernel_id = ""
         if self.base_url[-1] != "/":
             self.base_url += "/"
         self.session = aiohttp.ClientSession(trust_env=True, base_url=self.base_url)
         self.params = {}
-        self.result = ResultModel()
-
-    async def __aenter__(self):
-        return self
 
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.kernel_id:
-            try:
-                async with self.session.delete(
-                    f"api/kernels/{self.kernel_id}", params=self.params
-                ) as response:
-                    response.raise_for_status()
-            except Exception as err:
-                logger.exception("close kernel failed, %s", err)
+    async def close(self) -> None:
         await self.session.close()
 
-    async def run(self) -> ResultModel:
-        try:
-            await self.sign_in()
-            await self.init_kernel()
-            await self.execute_code()
-        except Exception as err:
-            logger.exception("execute code failed, %s", err)
-            self.result.stderr = f"Error: {err}"
-        return self.result
-
     async def sign_in(self) -> None:
         # password authentication
         if self.password and not self.token:
@@ -102,16 +85,28 @@ class JupyterCodeExecuter:
         if self.token:
             self.params.update({"token": self.token})
 
-    async def init_kernel(self) -> None:
+    async def create_kernel(self) -> str:
         async with self.session.post(url="api/kernels", params=self.params) as response:
             response.raise_for_status()
             kernel_data = await response.json()
-            self.kernel_id = kernel_data["id"]
+            return kernel_data["id"]
+
+    async def delete_kernel(self, kernel_id: str) -> None:
+        async with self.session.delete(
+            f"api/kernels/{kernel_id}", params=self.params
+        ) as response:
+            response.raise_for_status()
+
+    async def interrupt_kernel(self, kernel_id: str) -> None:
+        async with self.session.post(
+            f"api/kernels/{kernel_id}/interrupt", params=self.params
+        ) as response:
+            response.raise_for_status()
 
-    def init_ws(self) -> (str, dict):
+    def init_ws(self, kernel_id: str) -> (str, dict):
         ws_base = self.base_url.replace("http", "ws", 1)
         ws_params = "?" + "&".join([f"{key}={val}" for key, val in self.params.items()])
-        websocket_url = f"{ws_base}api/kernels/{self.kernel_id}/channels{ws_params if len(ws_params) > 1 else ''}"
+        websocket_url = f"{ws_base}api/kernels/{kernel_id}/channels{ws_params if len(ws_params) > 1 else ''}"
         ws_headers = {}
         if self.password and not self.token:
             ws_headers = {
@@ -125,18 +120,40 @@ class JupyterCodeExecuter:
             }
         return websocket_url, ws_headers
 
-    async def execute_code(self) -> None:
+    async def execute(self, kernel_id: str, code: str) -> ResultModel:
+        """Execute code in a kernel, interrupting it if the execution times out."""
         # initialize ws
-        websocket_url, ws_headers = self.init_ws()
+        websocket_url, ws_headers = self.init_ws(kernel_id)
         # execute
+        msg_id = uuid.uuid4().hex
         async with websockets.connect(
             websocket_url, additional_headers=ws_headers
         ) as ws:
-            await self.execute_in_jupyter(ws)
+            result, timed_out = await self.execute_in_jupyter(ws, code, msg_id)
+            if timed_out:
+                try:
+                    await self.interrupt_kernel(kernel_id)
+                    # The kernel aborts the requests it gets until then
+                    await asyncio.wait_for(self.wait_for_idle(ws, msg_id), self.timeout)
+                except Exception as err:
+                    logger.warning("interrupt kernel failed, %s", err)
+        return result
+
+    async def wait_for_idle(self, ws, msg_id: str) -> None:
+        while True:
+            message_data = json.loads(await ws.recv())
+            if (
+                message_data.get("parent_header", {}).get("msg_id") == msg_id
+                and message_data.get("msg_type") == "status"
+                and message_data["content"]["execution_state"] == "idle"
+            ):
+                return
 
-    async def execute_in_jupyter(self, ws) -> None:
+    async def execute_in_jupyter(
+        self, ws, code: str, msg_id: Optional[str] = None
+    ) -> (ResultModel, bool):
         # send message
-        msg_id = uuid.uuid4().hex
+        msg_id = msg_id or uuid.uuid4().hex
         await ws.send(
             json.dumps(
                 {
@@ -151,7 +168,7 @@ class JupyterCodeExecuter:
                     "parent_header": {},
                     "metadata": {},
                     "content": {
-                        "code": self.code,
+                        "code": code,
                         "silent": False,
                         "store_history": True,
                         "user_expressions": {},
@@ -164,6 +181,7 @@ class JupyterCodeExecuter:
         )
         # parse message
         stdout, stderr, result = "", "", []
+        timed_out = False
         while True:
             try:
                 # wait for message
@@ -194,15 +212,333 @@ class JupyterCodeExecuter:
 
             except asyncio.TimeoutError:
                 stderr += "\nExecution timed out."
+                timed_out = True
                 break
-        self.result.stdout = stdout.strip()
-        self.result.stderr = stderr.strip()
-        self.result.result = "\n".join(result).strip() if result else ""
+        return (
+            ResultModel(
+                stdout=stdout.strip(),
+                stderr=stderr.strip(),
+                result="\n".join(result).strip() if result else "",
+            ),
+            timed_out,
+        )
+
+
+class JupyterCodeExecuter(JupyterClient):
+    """
+    Execute code in jupyter notebook
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        code: str,
+        token: str = "",
+        password: str = "",
+        timeout: int = 60,
+    ):
+        """
+        :param base_url: Jupyter server URL (e.g., "http://localhost:8888")
+        :param code: Code to execute
+        :param token: Jupyter authentication token (optional)
+        :param password: Jupyter password (optional)
+        :param timeout: WebSocket timeout in seconds (default: 60s)
+        """
+        super().__init__(base_url, token, password, timeout)
+        self.code = code
+        self.kernel_id = ""
+        self.result = ResultModel()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.kernel_id:
+            try:
+                await self.delete_kernel(self.kernel_id)
+            except Exception as err:
+                logger.exception("close kernel failed, %s", err)
+        await self.close()
+
+    async def run(self) -> ResultModel:
+        try:
+            await self.sign_in()
+            self.kernel_id = await self.create_kernel()
+            self.result = await self.execute(self.kernel_id, self.code)
+        except Exception as err:
+            logger.exception("execute code failed, %s", err)
+            self.result.stderr = f"Error: {err}"
+        return self.result
+
+
+class JupyterKernel:
+    def __init__(self, id: str):
+        self.id = id
+        self.executions = 0
+        self.last_used = time.monotonic()
+        self.lock = asyncio.Lock()
+        self.closed = False
+
+
+class JupyterKernelPool:
+    """
+    Kernels of a Jupyter server, `size` of which are started ahead of time so
+    that code doesn't wait for a kernel to start.
+
+    Executions with a session id (the chat) keep their kernel, so variables
+    persist between the code blocks of a chat, until the kernel has been idle
+    for `idle_timeout` seconds or has run `max_executions` times. Executions
+    without one get a kernel of their own, shut down afterwards. The pool
+    keeps up to `max_kernels` kernels, shutting down the kernels of the least
+    recently active chats to make room.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str = "",
+        password: str = "",
+        timeout: int = 60,
+        size: int = 2,
+        max_kernels: int = 16,
+        idle_timeout: int = 600,
+        max_executions: int = 100,
+    ):
+        self.client = JupyterClient(base_url, token, password, timeout)
+        self.size = size
+        self.max_kernels = max(max_kernels, 1)
+        self.idle_timeout = idle_timeout
+        self.max_executions = max_executions
+
+        self._signed_in = False
+        self._closed = False
+        self._warm: list[JupyterKernel] = []
+        self._sessions: OrderedDict[str, JupyterKernel] = OrderedDict()
+        self._starting = 0
+        self._last_activity = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._fill_task: Optional[asyncio.Task] = None
+        self._cleanup_task: Optional[asyncio.Task] = None
+
+    @property
+    def kernel_count(self) -> int:
+        return len(self._warm) + len(self._sessions) + self._starting
+
+    async def _start_kernel(self) -> JupyterKernel:
+        if not self._signed_in:
+            await self.client.sign_in()
+            self._signed_in = True
+        return JupyterKernel(await self.client.create_kernel())
+
+    async def _shutdown_kernel(self, kernel: JupyterKernel) -> None:
+        kernel.closed = True
+        try:
+            await self.client.delete_kernel(kernel.id)
+        except Exception as err:
+            logger.warning("close kernel failed, %s", err)
+
+    async def _fill(self) -> None:
+        while (
+            not self._closed
+            and len(self._warm) < self.size
+            and self.kernel_count < self.max_kernels
+        ):
+            self._starting += 1
+            try:
+                kernel = await self._start_kernel()
+            except Exception as err:
+                logger.warning("start kernel failed, %s", err)
+                return
+            finally:
+                self._starting -= 1
+            self._warm.append(kernel)
+
+    def _start_background_tasks(self) -> None:
+        if self._fill_task is None or self._fill_task.done():
+            self._fill_task = asyncio.create_task(self._fill())
+        if self._cleanup_task is None or self._cleanup_task.done():
+            self._cleanup_task = asyncio.create_task(self._periodic_cleanup())
+
+    async def _acquire(self, session_id: Optional[str]) -> JupyterKernel:
+        evicted = []
+        async with self._lock:
+            self._last_activity = time.monotonic()
+
+            kernel = self._sessions.get(session_id) if session_id else None
+            if kernel is not None:
+                self._sessions.move_to_end(session_id)
+                return kernel
+
+            if self._warm:
+                kernel = self._warm.pop(0)
+            else:
+                # Make room by shutting down the kernels of inactive chats
+                for id, session_kernel in list(self._sessions.items()):
+                    if self.kernel_count < self.max_kernels:
+                        break
+                    if not session_kernel.lock.locked():
+                        evicted.append(self._sessions.pop(id))
+                self._starting += 1
+
+        for session_kernel in evicted:
+            await self._shutdown_kernel(session_kernel)
+
+        if kernel is None:
+            try:
+                kernel = await self._start_kernel()
+            finally:
+                self._starting -= 1
+
+        if session_id:
+            async with self._lock:
+                if session_id in self._sessions:
+                    # Another execution of the chat got a kernel first
+                    self._warm.append(kernel)
+                    kernel = self._sessions[session_id]
+                else:
+                    self._sessions[session_id] = kernel
+
+        self._start_background_tasks()
+        return kernel
+
+    async def _release(self, kernel: JupyterKernel, session_id: Optional[str]):
+        """Shut down a kernel that is done, or won't be used by its chat again."""
+        if session_id and self._sessions.get(session_id) is kernel:
+            if kernel.executions < self.max_executions:
+                return
+            del self._sessions[session_id]
+        await self._shutdown_kernel(kernel)
+
+    async def execute(self, code: str, session_id: Optional[str] = None) -> ResultModel:
+        for attempt in range(2):
+            kernel = await self._acquire(session_id)
+            async with kernel.lock:
+                try:
+                    result = await self.client.execute(kernel.id, code)
+                except Exception as err:
+                    # The kernel died, the server restarted, or the kernel was
+                    # shut down to make room for another chat: don't reuse it
+                    closed = kernel.closed
+                    if session_id and self._sessions.get(session_id) is kernel:
+                        del self._sessions[session_id]
+                    await self._shutdown_kernel(kernel)
+                    self._signed_in = False
+
+                    # Retry once with a new kernel if the kernel hadn't run
+                    # any code yet, or was shut down by the pool
+                    if attempt == 0 and (kernel.executions == 0 or closed):
+                        logger.warning("execute code failed, retrying, %s", err)
+                        continue
+                    raise
+
+                kernel.executions += 1
+                kernel.last_used = time.monotonic()
+
+            await self._release(kernel, session_id)
+            return result
+
+    async def cleanup(self) -> None:
+        """Shut down the kernels of inactive chats, and warm kernels if unused."""
+        now = time.monotonic()
+        kernels = []
+        async with self._lock:
+            for id, kernel in list(self._sessions.items()):
+                if (
+                    not kernel.lock.locked()
+                    and now - kernel.last_used > self.idle_timeout
+                ):
+                    kernels.append(self._sessions.pop(id))
+            if now - self._last_activity > self.idle_timeout:
+                kernels.extend(self._warm)
+                self._warm = []
+
+        for kernel in kernels:
+            await self._shutdown_kernel(kernel)
+
+    async def _periodic_cleanup(self) -> None:
+        while True:
+            await asyncio.sleep(max(self.idle_timeout / 2, 1))
+            try:
+                await self.cleanup()
+            except Exception as err:
+                logger.warning("kernel pool cleanup failed, %s", err)
+
+            if not (self._sessions or self._warm or self._starting):
+                return
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
+        # Kernels being started are shut down with the others
+        if self._fill_task is not None:
+            await asyncio.wait([self._fill_task], timeout=self.client.timeout)
+
+        async with self._lock:
+            kernels = self._warm + list(self._sessions.values())
+            self._warm = []
+            self._sessions.clear()
+
+        await asyncio.gather(*[self._shutdown_kernel(kernel) for kernel in kernels])
+        await self.client.close()
+
+
+JUPYTER_KERNEL_POOLS: dict[tuple, JupyterKernelPool] = {}
+
+
+def get_jupyter_kernel_pool(
+    base_url: str, token: str = "", password: str = "", timeout: int = 60
+) -> JupyterKernelPool:
+    key = (
+        base_url,
+        hashlib.sha256(f"{token or ''}:{password or ''}".encode()).hexdigest(),
+        timeout,
+    )
+    if key not in JUPYTER_KERNEL_POOLS:
+        JUPYTER_KERNEL_POOLS[key] = JupyterKernelPool(
+            base_url,
+            token,
+            password,
+            timeout,
+            size=JUPYTER_KERNEL_POOL_SIZE,
+            max_kernels=JUPYTER_KERNEL_POOL_MAX_KERNELS,
+            idle_timeout=JUPYTER_KERNEL_POOL_IDLE_TIMEOUT,
+            max_executions=JUPYTER_KERNEL_POOL_MAX_EXECUTIONS,
+        )
+    return JUPYTER_KERNEL_POOLS[key]
+
+
+async def close_jupyter_kernel_pools() -> None:
+    pools = list(JUPYTER_KERNEL_POOLS.values())
+    JUPYTER_KERNEL_POOLS.clear()
+    for pool in pools:
+        try:
+            await pool.close()
+        except Exception as err:
+            logger.warning("close kernel pool failed, %s", err)
 
 
 async def execute_code_jupyter(
-    base_url: str, code: str, token: str = "", password: str = "", timeout: int = 60
+    base_url: str,
+    code: str,
+    token: str = "",
+    password: str = "",
+    timeout: int = 60,
+    session_id: Optional[str] = None,
 ) -> dict:
+    """
+    Execute code on a Jupyter server, in the kernel of `session_id` (e.g. the
+    chat) when the kernel pool is enabled.
+    """
+    if JUPYTER_KERNEL_POOL_SIZE > 0:
+        pool = get_jupyter_kernel_pool(base_url, token, password, timeout)
+        try:
+            result = await pool.execute(code, session_id)
+        except Exception as err:
+            logger.exception("execute code failed, %s", err)
+            result = ResultModel(stderr=f"Error: {err}")
+        return result.model_dump()
+
     async with JupyterCodeExecuter(
         base_url, code, token, password, timeout
     ) as executor:
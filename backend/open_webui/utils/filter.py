@@ -1,11 +1,13 @@
 import inspect
 import logging
+import time
+from typing import Optional
 
 from open_webui.utils.plugin import (
     load_function_module_by_id,
     get_function_module_from_cache,
 )
-from open_webui.models.functions import Functions
+from open_webui.models.functions import FunctionModel, Functions
 from open_webui.env import SRC_LOG_LEVELS
 
 log = logging.getLogger(__name__)
@@ -22,39 +24,123 @@ def get_function_module(request, function_id, load_from_db=True):
     return function_module
 
 
-def get_sorted_filter_ids(request, model: dict, enabled_filter_ids: list = None):
-    def get_priority(function_id):
-        function = Functions.get_function_by_id(function_id)
-        if function is not None:
-            valves = Functions.get_function_valves_by_id(function_id)
-            return valves.get("priority", 0) if valves else 0
-        return 0
+class CompiledFilter:
+    """
+    A filter function of a model's pipeline, with its module, priority and
+    valves resolved once for every request that runs it.
+    """
+
+    def __init__(self, function: FunctionModel, module, valves: Optional[dict]):
+        self.id = function.id
+        self.function = function
+        self.module = module
+        self.toggle = bool(getattr(module, "toggle", None))
+        self.priority = valves.get("priority", 0) if valves else 0
+
+        self._valves = valves if valves else {}
+        self._handlers = {}
+
+    def get_valves(self):
+        """
+        Return a new Valves instance, as filters may change their valves while
+        handling a request.
+        """
+        return self.module.Valves(**self._valves)
+
+    def get_handler(self, filter_type: str):
+        """Return the handler for `filter_type` and its parameter names."""
+        if filter_type not in self._handlers:
+            handler = getattr(self.module, filter_type, None)
+            self._handlers[filter_type] = (
+                (handler, set(inspect.signature(handler).parameters))
+                if handler
+                else (None, set())
+            )
+        return self._handlers[filter_type]
 
+
+def compile_filter_pipeline(request, model: dict) -> list[CompiledFilter]:
     filter_ids = [function.id for function in Functions.get_global_filter_functions()]
     if "info" in model and "meta" in model["info"]:
         filter_ids.extend(model["info"]["meta"].get("filterIds", []))
-        filter_ids = list(set(filter_ids))
-    active_filter_ids = [
-        function.id
+
+    active_filters = {
+        function.id: function
         for function in Functions.get_functions_by_type("filter", active_only=True)
+    }
+
+    filters = [
+        CompiledFilter(
+            active_filters[filter_id],
+            get_function_module(request, filter_id),
+            Functions.get_function_valves_by_id(filter_id),
+        )
+        for filter_id in dict.fromkeys(filter_ids)
+        if filter_id in active_filters
     ]
+    filters.sort(key=lambda filter: filter.priority)
+    return filters
 
-    def get_active_status(filter_id):
-        function_module = get_function_module(request, filter_id)
 
-        if getattr(function_module, "toggle", None):
-            return filter_id in (enabled_filter_ids or [])
+def get_filter_pipeline(request, model: dict) -> list[CompiledFilter]:
+    """
+    Return the active filters of a model, sorted by priority.
 
-        return True
+    Pipelines are cached by model, and only compiled again when the model's
+    filters change or a filter function is added, updated (including its
+    valves) or deleted. `updated_at` has a resolution of seconds, so a
+    pipeline compiled in the same second as the last update is compiled
+    again, like plugin modules.
+    """
+    if not hasattr(request.app.state, "FILTER_PIPELINES"):
+        request.app.state.FILTER_PIPELINES = {}
 
-    active_filter_ids = [
-        filter_id for filter_id in active_filter_ids if get_active_status(filter_id)
+    filter_ids = (
+        tuple(model["info"]["meta"].get("filterIds", []))
+        if "info" in model and "meta" in model["info"]
+        else ()
+    )
+    version = Functions.get_functions_version_by_type("filter")
+
+    pipeline = request.app.state.FILTER_PIPELINES.get(model["id"])
+    if (
+        pipeline is not None
+        and pipeline["filter_ids"] == filter_ids
+        and pipeline["version"] == version
+        and version[1] < pipeline["compiled_at"]
+    ):
+        return pipeline["filters"]
+
+    compiled_at = int(time.time())
+    filters = compile_filter_pipeline(request, model)
+    request.app.state.FILTER_PIPELINES[model["id"]] = {
+        "filter_ids": filter_ids,
+        "version": version,
+        "compiled_at": compiled_at,
+        "filters": filters,
+    }
+    return filters
+
+
+def get_sorted_filter_functions(
+    request, model: dict, enabled_filter_ids: list = None
+) -> list[CompiledFilter]:
+    """
+    Return the filters to run for a model, leaving out the toggleable filters
+    that aren't in `enabled_filter_ids`.
+    """
+    return [
+        filter
+        for filter in get_filter_pipeline(request, model)
+        if not filter.toggle or filter.id in (enabled_filter_ids or [])
     ]
 
-    filter_ids = [fid for fid in filter_ids if fid in active_filter_ids]
-    filter_ids.sort(key=get_priority)
 
-    return filter_ids
+def get_sorted_filter_ids(request, model: dict, enabled_filter_ids: list = None):
+    return [
+        filter.id
+        for filter in get_sorted_filter_functions(request, model, enabled_filter_ids)
+    ]
 
 
 async def process_filter_functions(
@@ -62,17 +148,12 @@ async def process_filter_functions(
 ):
     skip_files = None
 
-    for function in filter_functions:
-        filter = function
-        filter_id = function.id
-        if not filter:
-            continue
+    for filter in filter_functions:
+        filter_id = filter.id
+        function_module = filter.module
 
-        function_module = get_function_module(
-            request, filter_id, load_from_db=(filter_type != "stream")
-        )
         # Prepare handler function
-        handler = getattr(function_module, filter_type, None)
+        handler, parameters = filter.get_handler(filter_type)
         if not handler:
             continue
 
@@ -82,15 +163,10 @@ async def process_filter_functions(
 
         # Apply valves to the function
         if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
-            valves = Functions.get_function_valves_by_id(filter_id)
-            function_module.valves = function_module.Valves(
-                **(valves if valves else {})
-            )
+            function_module.valves = filter.get_valves()
 
         try:
             # Prepare parameters
-            sig = inspect.signature(handler)
-
             params = {"body": form_data}
             if filter_type == "stream":
                 params = {"event": form_data}
@@ -101,11 +177,11 @@ async def process_filter_functions(
                     **extra_params,
                     "__id__": filter_id,
                 }.items()
-                if k in sig.parameters
+                if k in parameters
             }
 
             # Handle user parameters
-            if "__user__" in sig.parameters:
+            if "__user__" in parameters:
                 if hasattr(function_module, "UserValves"):
                     try:
                         params["__user__"]["valves"] = function_module.UserValves(
@@ -0,0 +1,576 @@
+import asyncio
+import inspect
+from abc import ABC, abstractmethod
+import json
+import logging
+import time
+from collections import deque
+from itertools import count
+from typing import Any, Callable, Literal, Optional
+from uuid import uuid4
+
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+
+from open_webui.env import INSTANCE_ID, REDIS_KEY_PREFIX, SRC_LOG_LEVELS
+from open_webui.utils.redis import get_redis_connection
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+# Ordered from most to least urgent; workers always drain earlier entries first.
+JOB_PRIORITIES = ("high", "low")
+JobPriority = Literal["high", "low"]
+
+DEAD_LETTER_HISTORY_SIZE = 100
+
+# Failed jobs are retried after 2, 4, 8, ... seconds, up to this delay
+MAX_RETRY_DELAY = 30
+
+
+class JobFailedError(Exception):
+    """
+    Raised by a handler when a job failed in a way that retrying will not fix.
+    The job is dead-lettered immediately instead of being retried.
+    """
+
+
+class Job(BaseModel):
+    id: str
+    name: str
+    payload: dict
+    priority: JobPriority = "high"
+    attempts: int = 0
+    enqueued_at: float
+    # Retried jobs are not run before this time
+    not_before: Optional[float] = None
+    error: Optional[str] = None
+
+
+class JobHandler(BaseModel):
+    handler: Callable
+    on_failure: Optional[Callable] = None
+
+
+class JobQueue(ABC):
+    """
+    Base class for background job queues.
+
+    Handlers are registered by name and receive `(app, payload)`. Sync handlers
+    run in the thread pool so they never block the event loop. Failed jobs are
+    retried up to `max_retries` times and then moved to a dead-letter list, at
+    which point the handler's `on_failure(app, payload, error)` hook is called.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        workers: int = 2,
+        max_retries: int = 2,
+        job_timeout: Optional[int] = None,
+    ):
+        self.name = name
+        self.workers = workers
+        self.max_retries = max_retries
+        self.job_timeout = job_timeout
+
+        self.app = None
+        self._handlers: dict[str, JobHandler] = {}
+        self._worker_tasks: list[asyncio.Task] = []
+        self._in_flight = 0
+        self._timings: dict[str, dict[str, float]] = {}
+
+    def register(
+        self,
+        name: str,
+        handler: Callable,
+        on_failure: Optional[Callable] = None,
+    ):
+        self._handlers[name] = JobHandler(handler=handler, on_failure=on_failure)
+
+    def enqueue(self, name: str, payload: dict, priority: JobPriority = "high") -> str:
+        """
+        Submit a job. Safe to call from the event loop as well as from the
+        thread pool (sync route handlers).
+        """
+        if name not in self._handlers:
+            raise ValueError(f"No handler registered for job '{name}'")
+        if priority not in JOB_PRIORITIES:
+            priority = JOB_PRIORITIES[-1]
+
+        job = Job(
+            id=str(uuid4()),
+            name=name,
+            payload=payload,
+            priority=priority,
+            enqueued_at=time.time(),
+        )
+        self._push(job)
+        log.debug(f"Enqueued job {job.id} ({job.name}, priority={priority})")
+        return job.id
+
+    async def start(self, app):
+        self.app = app
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(idx)) for idx in range(self.workers)
+        ]
+        log.info(
+            f"Started {self.workers} '{self.name}' job queue workers ({self.__class__.__name__})"
+        )
+
+    async def stop(self):
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    async def get_status(self) -> dict:
+        return {
+            "name": self.name,
+            "backend": self.backend,
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "timings": self._get_timings(),
+        }
+
+    ####################
+    # Internals
+    ####################
+
+    backend = ""
+
+    @abstractmethod
+    def _push(self, job: Job):
+        pass
+
+    @abstractmethod
+    async def _worker(self, idx: int):
+        pass
+
+    def _record_timing(self, stage: str, duration: float):
+        timing = self._timings.setdefault(
+            stage, {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0}
+        )
+        timing["count"] += 1
+        timing["total"] += duration
+        timing["max"] = max(timing["max"], duration)
+        timing["last"] = duration
+
+    def _get_timings(self) -> dict:
+        return {
+            stage: {
+                "count": int(timing["count"]),
+                "avg": (timing["total"] / timing["count"]) if timing["count"] else 0.0,
+                "max": timing.get("max", 0.0),
+                "last": timing.get("last", 0.0),
+            }
+            for stage, timing in self._timings.items()
+        }
+
+    async def _run(self, job: Job) -> Optional[Exception]:
+        """
+        Execute a job and return the raised exception, if any.
+        """
+        job_handler = self._handlers.get(job.name)
+        if job_handler is None:
+            return JobFailedError(f"No handler registered for job '{job.name}'")
+
+        self._record_timing("queued", time.time() - (job.not_before or job.enqueued_at))
+        self._in_flight += 1
+        start = time.time()
+        try:
+            if inspect.iscoroutinefunction(job_handler.handler):
+                coroutine = job_handler.handler(self.app, job.payload)
+            else:
+                coroutine = run_in_threadpool(
+                    job_handler.handler, self.app, job.payload
+                )
+
+            # NOTE: a timed out sync handler keeps running in its thread, but the
+            # job is treated as failed and its worker slot is released.
+            await asyncio.wait_for(coroutine, timeout=self.job_timeout)
+            return None
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            return TimeoutError(f"Job timed out after {self.job_timeout}s")
+        except Exception as e:
+            return e
+        finally:
+            self._in_flight -= 1
+            self._record_timing("processing", time.time() - start)
+
+    def _should_retry(self, job: Job, error: Exception) -> bool:
+        return (
+            not isinstance(error, JobFailedError) and job.attempts <= self.max_retries
+        )
+
+    def _get_retry_delay(self, job: Job) -> float:
+        return min(2**job.attempts, MAX_RETRY_DELAY)
+
+    async def _fail(self, job: Job, error: Exception):
+        log.error(f"Job {job.id} ({job.name}) failed permanently: {error}")
+        job_handler = self._handlers.get(job.name)
+        if job_handler and job_handler.on_failure:
+            try:
+                if inspect.iscoroutinefunction(job_handler.on_failure):
+                    await job_handler.on_failure(self.app, job.payload, error)
+                else:
+                    await run_in_threadpool(
+                        job_handler.on_failure, self.app, job.payload, error
+                    )
+            except Exception as e:
+                log.exception(f"Error in failure hook for job {job.id}: {e}")
+
+
+class LocalJobQueue(JobQueue):
+    """
+    In-process queue backed by an asyncio.PriorityQueue. Jobs do not survive a
+    restart; use the Redis backend when durability is required.
+    """
+
+    backend = "local"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._counter = count()
+        self._depth = {priority: 0 for priority in JOB_PRIORITIES}
+        self._dead_letters: deque = deque(maxlen=DEAD_LETTER_HISTORY_SIZE)
+        self._dead_letter_count = 0
+
+    async def start(self, app):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.PriorityQueue()
+        await super().start(app)
+
+    def _push(self, job: Job):
+        if self._loop is None:
+            raise RuntimeError(f"Job queue '{self.name}' has not been started")
+
+        entry = (JOB_PRIORITIES.index(job.priority), next(self._counter), job)
+        self._loop.call_soon_threadsafe(self._put, entry)
+
+    def _put(self, entry):
+        self._depth[entry[2].priority] += 1
+        self._queue.put_nowait(entry)
+
+    async def _worker(self, idx: int):
+        while True:
+            _, _, job = await self._queue.get()
+            self._depth[job.priority] -= 1
+            try:
+                error = await self._run(job)
+                if error is None:
+                    continue
+
+                job.attempts += 1
+                job.error = str(error)
+                if self._should_retry(job, error):
+                    log.warning(
+                        f"Job {job.id} ({job.name}) failed, retrying ({job.attempts}/{self.max_retries}): {error}"
+                    )
+                    # Exponential backoff without holding the worker
+                    delay = self._get_retry_delay(job)
+                    job.not_before = time.time() + delay
+                    self._loop.call_later(delay, self._push, job)
+                else:
+                    self._dead_letter_count += 1
+                    self._dead_letters.append(job)
+                    await self._fail(job, error)
+            except Exception as e:
+                log.exception(f"Error in '{self.name}' job queue worker {idx}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def get_status(self) -> dict:
+        return {
+            **(await super().get_status()),
+            "depth": dict(self._depth),
+            "dead_letters": {
+                "count": self._dead_letter_count,
+                "recent": [job.model_dump() for job in self._dead_letters],
+            },
+        }
+
+
+class RedisJobQueue(JobQueue):
+    """
+    Durable queue backed by Redis Streams, shared by every instance connected
+    to the same Redis.
+
+    Each priority has its own stream read through a consumer group. Entries are
+    acknowledged only after the handler finishes, so work owned by a crashed
+    or restarted instance stays pending and is re-queued by the reclaim loop
+    once it has been idle for longer than the job timeout.
+
+    Jobs to retry wait in a sorted set scored by their `not_before` time, and
+    are moved back to their stream once due.
+    """
+
+    backend = "redis"
+
+    GROUP = "workers"
+    BLOCK_MS = 1000
+    RECLAIM_INTERVAL = 30
+    DELAYED_INTERVAL = 1
+
+    def __init__(
+        self,
+        *args,
+        redis_url: str,
+        redis_sentinels: Optional[list] = [],
+        redis_cluster: bool = False,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self._redis_args = (redis_url, redis_sentinels, redis_cluster)
+        # The hash tag keeps every key of the queue in one cluster slot, so the
+        # streams can be read together and jobs moved between keys
+        self._key = f"{REDIS_KEY_PREFIX}:jobs:{{{self.name}}}"
+        self._streams = [f"{self._key}:{priority}" for priority in JOB_PRIORITIES]
+        self._dead_stream = f"{self._key}:dead"
+        self._delayed_key = f"{self._key}:delayed"
+        self._timings_key = f"{self._key}:timings"
+        # Sync client so `enqueue` can be called from sync route handlers
+        self._sync_redis = get_redis_connection(
+            redis_url, redis_sentinels, redis_cluster, decode_responses=True
+        )
+        self._redis = None
+        self._reclaim_task: Optional[asyncio.Task] = None
+        self._delayed_task: Optional[asyncio.Task] = None
+
+    async def start(self, app):
+        self._redis = get_redis_connection(
+            *self._redis_args, async_mode=True, decode_responses=True
+        )
+        for stream in self._streams:
+            try:
+                await self._redis.xgroup_create(
+                    stream, self.GROUP, id="0", mkstream=True
+                )
+            except Exception as e:
+                # BUSYGROUP: the group was already created by another instance
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+        await super().start(app)
+        self._reclaim_task = asyncio.create_task(self._reclaim_loop())
+        self._delayed_task = asyncio.create_task(self._delayed_loop())
+
+    async def stop(self):
+        for task in (self._reclaim_task, self._delayed_task):
+            if task:
+                task.cancel()
+        await super().stop()
+
+    def _push(self, job: Job):
+        self._sync_redis.xadd(
+            self._streams[JOB_PRIORITIES.index(job.priority)],
+            {"job": job.model_dump_json()},
+        )
+
+    async def _push_async(self, job: Job):
+        await self._redis.xadd(
+            self._streams[JOB_PRIORITIES.index(job.priority)],
+            {"job": job.model_dump_json()},
+        )
+
+    def _record_timing(self, stage: str, duration: float):
+        super()._record_timing(stage, duration)
+        try:
+            asyncio.get_running_loop().create_task(
+                self._record_timing_redis(stage, duration)
+            )
+        except RuntimeError:
+            pass
+
+    async def _record_timing_redis(self, stage: str, duration: float):
+        try:
+            pipe = self._redis.pipeline()
+            pipe.hincrby(self._timings_key, f"{stage}:count", 1)
+            pipe.hincrbyfloat(self._timings_key, f"{stage}:total", duration)
+            pipe.hset(self._timings_key, f"{stage}:last", duration)
+            await pipe.execute()
+        except Exception as e:
+            log.debug(f"Error recording job timing: {e}")
+
+    async def _read(self, consumer: str):
+        # Poll the streams in priority order first so that a backlog of
+        # low-priority work never delays high-priority jobs.
+        for stream in self._streams:
+            result = await self._redis.xreadgroup(
+                self.GROUP, consumer, {stream: ">"}, count=1
+            )
+            if result:
+                return result
+
+        return await self._redis.xreadgroup(
+            self.GROUP,
+            consumer,
+            {stream: ">" for stream in self._streams},
+            count=1,
+            block=self.BLOCK_MS,
+        )
+
+    async def _ack(self, stream: str, entry_id: str):
+        pipe = self._redis.pipeline()
+        pipe.xack(stream, self.GROUP, entry_id)
+        pipe.xdel(stream, entry_id)
+        await pipe.execute()
+
+    async def _handle_failure(self, job: Job, error: Exception):
+        job.attempts += 1
+        job.error = str(error)
+        if self._should_retry(job, error):
+            log.warning(
+                f"Job {job.id} ({job.name}) failed, retrying ({job.attempts}/{self.max_retries}): {error}"
+            )
+            # Retried by the delayed loop, without holding the worker
+            job.not_before = time.time() + self._get_retry_delay(job)
+            await self._redis.zadd(
+                self._delayed_key, {job.model_dump_json(): job.not_before}
+            )
+        else:
+            await self._redis.xadd(
+                self._dead_stream,
+                {"job": job.model_dump_json()},
+                maxlen=DEAD_LETTER_HISTORY_SIZE,
+                approximate=True,
+            )
+            await self._fail(job, error)
+
+    async def _worker(self, idx: int):
+        consumer = f"{INSTANCE_ID}:{idx}"
+        while True:
+            try:
+                result = await self._read(consumer)
+                if not result:
+                    continue
+
+                stream, entries = result[0]
+                entry_id, fields = entries[0]
+                job = Job.model_validate_json(fields["job"])
+
+                error = await self._run(job)
+                if error is not None:
+                    await self._handle_failure(job, error)
+                await self._ack(stream, entry_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.exception(f"Error in '{self.name}' job queue worker {idx}: {e}")
+                await asyncio.sleep(1)
+
+    async def _push_due_jobs(self):
+        entries = await self._redis.zrangebyscore(
+            self._delayed_key, "-inf", time.time(), start=0, num=100
+        )
+        for entry in entries:
+            # Only the instance that removed the entry pushes the job
+            if await self._redis.zrem(self._delayed_key, entry):
+                await self._push_async(Job.model_validate_json(entry))
+
+    async def _delayed_loop(self):
+        while True:
+            await asyncio.sleep(self.DELAYED_INTERVAL)
+            try:
+                await self._push_due_jobs()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.exception(f"Error re-queueing delayed '{self.name}' jobs: {e}")
+
+    async def _reclaim_loop(self):
+        consumer = f"{INSTANCE_ID}:reclaim"
+        min_idle_time = ((self.job_timeout or 3600) + 60) * 1000
+        while True:
+            await asyncio.sleep(self.RECLAIM_INTERVAL)
+            try:
+                for stream in self._streams:
+                    result = await self._redis.xautoclaim(
+                        stream,
+                        self.GROUP,
+                        consumer,
+                        min_idle_time=min_idle_time,
+                        start_id="0-0",
+                        count=100,
+                    )
+                    for entry_id, fields in result[1] if result else []:
+                        if fields and "job" in fields:
+                            job = Job.model_validate_json(fields["job"])
+                            log.warning(
+                                f"Reclaiming abandoned job {job.id} ({job.name})"
+                            )
+                            await self._handle_failure(
+                                job, RuntimeError("Worker stopped before finishing")
+                            )
+                        await self._ack(stream, entry_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.exception(f"Error reclaiming '{self.name}' jobs: {e}")
+
+    def _get_shared_timings(self, raw: dict) -> dict:
+        timings = {}
+        for field, value in raw.items():
+            stage, _, metric = field.rpartition(":")
+            timings.setdefault(stage, {})[metric] = float(value)
+
+        return {
+            stage: {
+                "count": int(timing.get("count", 0)),
+                "avg": (
+                    (timing.get("total", 0.0) / timing["count"])
+                    if timing.get("count")
+                    else 0.0
+                ),
+                "last": timing.get("last", 0.0),
+            }
+            for stage, timing in timings.items()
+        }
+
+    async def get_status(self) -> dict:
+        depth = {}
+        for priority, stream in zip(JOB_PRIORITIES, self._streams):
+            length = await self._redis.xlen(stream)
+            pending = await self._redis.xpending(stream, self.GROUP)
+            depth[priority] = max(length - (pending or {}).get("pending", 0), 0)
+
+        dead_letters = await self._redis.xrevrange(
+            self._dead_stream, count=DEAD_LETTER_HISTORY_SIZE
+        )
+
+        return {
+            **(await super().get_status()),
+            "depth": depth,
+            "delayed": await self._redis.zcard(self._delayed_key),
+            "cluster_timings": self._get_shared_timings(
+                await self._redis.hgetall(self._timings_key)
+            ),
+            "dead_letters": {
+                "count": await self._redis.xlen(self._dead_stream),
+                "recent": [json.loads(fields["job"]) for _, fields in dead_letters],
+            },
+        }
+
+
+def get_job_queue(
+    backend: str,
+    name: str,
+    redis_url: Optional[str] = None,
+    redis_sentinels: Optional[list] = [],
+    redis_cluster: bool = False,
+    **kwargs: Any,
+) -> JobQueue:
+    if backend == "redis":
+        return RedisJobQueue(
+            name,
+            redis_url=redis_url,
+            redis_sentinels=redis_sentinels,
+            redis_cluster=redis_cluster,
+            **kwargs,
+        )
+    return LocalJobQueue(name, **kwargs)
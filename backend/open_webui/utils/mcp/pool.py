@@ -0,0 +1,223 @@
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import time
+from typing import Optional
+
+from mcp import types
+
+from open_webui.env import (
+    MCP_SESSION_HEALTH_CHECK_INTERVAL,
+    MCP_SESSION_IDLE_TIMEOUT,
+    SRC_LOG_LEVELS,
+)
+from open_webui.utils.mcp.client import MCPClient
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class MCPSession:
+    """
+    A session with an MCP server that can be shared by chats.
+
+    The session is opened and closed by a task of its own, as the MCP client
+    must leave its transport in the task that entered it, which the chat that
+    opens the session may not outlive. The server's tool specs are listed
+    once, and again after the server notifies that its tools changed.
+    """
+
+    def __init__(self, key: tuple, url: str, headers: Optional[dict] = None):
+        self.key = key
+        self.url = url
+        self.headers = headers
+        self.client = MCPClient()
+
+        self.references = 0
+        self.last_used = time.monotonic()
+
+        self._tool_specs: Optional[list[dict]] = None
+        self._tool_specs_version = 0
+        self._closing = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def closed(self) -> bool:
+        return self._task is None or self._task.done() or self._closing.is_set()
+
+    async def open(self):
+        ready = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run(ready))
+        try:
+            await ready
+        except BaseException:
+            self._closing.set()
+            raise
+
+    async def _run(self, ready: asyncio.Future):
+        try:
+            await self.client.connect(
+                self.url, headers=self.headers, message_handler=self._handle_message
+            )
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            return
+
+        if not ready.done():
+            ready.set_result(None)
+
+        try:
+            await self._closing.wait()
+        finally:
+            try:
+                await self.client.disconnect()
+            except Exception as e:
+                log.debug(f"Error disconnecting from MCP server {self.url}: {e}")
+
+    async def _handle_message(self, message):
+        if isinstance(message, types.ServerNotification) and isinstance(
+            message.root, types.ToolListChangedNotification
+        ):
+            log.debug(f"Tools of MCP server {self.url} changed")
+            self._tool_specs = None
+            self._tool_specs_version += 1
+
+    async def list_tool_specs(self) -> list[dict]:
+        if self._tool_specs is None:
+            version = self._tool_specs_version
+            tool_specs = await self.client.list_tool_specs()
+            # Unless the tools changed while they were listed
+            if version == self._tool_specs_version:
+                self._tool_specs = tool_specs
+            return copy.deepcopy(tool_specs)
+
+        return copy.deepcopy(self._tool_specs)
+
+    async def check(self, interval: int) -> bool:
+        """Whether the session is open, pinging it if unused for `interval`."""
+        if self.closed:
+            return False
+
+        if time.monotonic() - self.last_used < interval:
+            return True
+
+        try:
+            await asyncio.wait_for(self.client.session.send_ping(), timeout=10)
+            return True
+        except Exception as e:
+            log.debug(f"MCP server {self.url} did not respond to ping: {e}")
+            return False
+
+    async def close(self):
+        self._closing.set()
+        if self._task is not None:
+            await asyncio.wait([self._task], timeout=10)
+
+
+class MCPSessionPool:
+    """
+    Sessions with MCP servers, by server URL and authentication headers, kept
+    open across chats.
+
+    Chats acquire a session and release it when they are done. Sessions are
+    closed once they have been idle for `idle_timeout` seconds, and checked
+    with a ping before being reused after `health_check_interval` seconds.
+    With an `idle_timeout` of 0, every chat opens its own session.
+    """
+
+    def __init__(self, idle_timeout: int, health_check_interval: int):
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+
+        self._sessions: dict[tuple, MCPSession] = {}
+        self._locks: dict[tuple, asyncio.Lock] = {}
+        self._cleanup_task: Optional[asyncio.Task] = None
+
+    def _get_key(self, url: str, headers: Optional[dict]) -> tuple:
+        # Headers carry credentials, so only their hash is kept
+        return (
+            url,
+            hashlib.sha256(
+                json.dumps(headers or {}, sort_keys=True).encode()
+            ).hexdigest(),
+        )
+
+    async def acquire(self, url: str, headers: Optional[dict] = None) -> MCPSession:
+        key = self._get_key(url, headers)
+
+        if self.idle_timeout <= 0:
+            session = MCPSession(key, url, headers)
+            await session.open()
+            session.references += 1
+            return session
+
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            session = self._sessions.get(key)
+            if session is not None and not await session.check(
+                self.health_check_interval
+            ):
+                log.debug(f"Reconnecting to MCP server {url}")
+                del self._sessions[key]
+                if session.references == 0:
+                    await session.close()
+                session = None
+
+            if session is None:
+                session = MCPSession(key, url, headers)
+                await session.open()
+                self._sessions[key] = session
+
+            session.references += 1
+            session.last_used = time.monotonic()
+
+        if self._cleanup_task is None or self._cleanup_task.done():
+            self._cleanup_task = asyncio.create_task(self._periodic_cleanup())
+
+        return session
+
+    async def release(self, session: MCPSession):
+        session.references -= 1
+        session.last_used = time.monotonic()
+
+        # Sessions no longer in the pool are closed by their last user
+        if session.references <= 0 and self._sessions.get(session.key) is not session:
+            await session.close()
+
+    async def cleanup(self):
+        """Close the sessions that are idle or were closed by the server."""
+        now = time.monotonic()
+        for key, session in list(self._sessions.items()):
+            if session.references <= 0 and (
+                session.closed or now - session.last_used > self.idle_timeout
+            ):
+                log.debug(f"Closing idle session with MCP server {session.url}")
+                del self._sessions[key]
+                self._locks.pop(key, None)
+                await session.close()
+
+    async def _periodic_cleanup(self):
+        while self._sessions:
+            await asyncio.sleep(max(self.idle_timeout / 2, 1))
+            try:
+                await self.cleanup()
+            except Exception as e:
+                log.debug(f"Error cleaning up MCP sessions: {e}")
+
+    async def close(self):
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
+
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        self._locks.clear()
+        await asyncio.gather(
+            *[session.close() for session in sessions], return_exceptions=True
+        )
+
+
+MCP_SESSION_POOL = MCPSessionPool(
+    MCP_SESSION_IDLE_TIMEOUT, MCP_SESSION_HEALTH_CHECK_INTERVAL
+)
@@ -15,8 +15,8 @@ import inspect
 import re
 import ast
 
+from functools import partial
 from uuid import uuid4
-from concurrent.futures import ThreadPoolExecutor
 
 
 from fastapi import Request, HTTPException
@@ -65,7 +65,6 @@ from open_webui.utils.files import (
 
 
 from open_webui.models.users import UserModel
-from open_webui.models.functions import Functions
 from open_webui.models.models import Models
 
 from open_webui.retrieval.utils import get_sources_from_items
@@ -91,15 +90,15 @@ from open_webui.utils.misc import (
     convert_logit_bias_input_to_json,
     get_content_from_message,
 )
-from open_webui.utils.tools import get_tools
+from open_webui.utils.tools import call_tool, execute_tool_calls, get_tools
 from open_webui.utils.plugin import load_function_module_by_id
 from open_webui.utils.filter import (
-    get_sorted_filter_ids,
+    get_sorted_filter_functions,
     process_filter_functions,
 )
 from open_webui.utils.code_interpreter import execute_code_jupyter
 from open_webui.utils.payload import apply_system_prompt_to_body
-from open_webui.utils.mcp.client import MCPClient
+from open_webui.utils.mcp.pool import MCP_SESSION_POOL
 
 
 from open_webui.config import (
@@ -107,6 +106,7 @@ from open_webui.config import (
     DEFAULT_TOOLS_FUNCTION_CALLING_PROMPT_TEMPLATE,
     DEFAULT_CODE_INTERPRETER_PROMPT,
     CODE_INTERPRETER_BLOCKED_MODULES,
+    RAG_FULL_CONTEXT_TOKEN_BUDGET,
 )
 from open_webui.env import (
     SRC_LOG_LEVELS,
@@ -365,25 +365,15 @@ async def chat_completion_tools_handler(
 
             result = json.loads(content)
 
-            async def tool_call_handler(tool_call):
-                nonlocal skip_files
-
-                log.debug(f"{tool_call=}")
-
+            async def execute_tool_call(tool_call):
                 tool_function_name = tool_call.get("name", None)
                 if tool_function_name not in tools:
-                    return body, {}
+                    return None
 
                 tool_function_params = tool_call.get("parameters", {})
 
-                tool = None
-                tool_type = ""
-                direct_tool = False
-
                 try:
                     tool = tools[tool_function_name]
-                    tool_type = tool.get("type", "")
-                    direct_tool = tool.get("direct", False)
 
                     spec = tool.get("spec", {})
                     allowed_params = (
@@ -395,26 +385,34 @@ async def chat_completion_tools_handler(
                         if k in allowed_params
                     }
 
-                    if tool.get("direct", False):
-                        tool_result = await event_caller(
-                            {
-                                "type": "execute:tool",
-                                "data": {
-                                    "id": str(uuid4()),
-                                    "name": tool_function_name,
-                                    "params": tool_function_params,
-                                    "server": tool.get("server", {}),
-                                    "session_id": metadata.get("session_id", None),
-                                },
-                            }
-                        )
-                    else:
-                        tool_function = tool["callable"]
-                        tool_result = await tool_function(**tool_function_params)
+                    tool_result = await call_tool(
+                        tool,
+                        tool_function_name,
+                        tool_function_params,
+                        event_caller,
+                        metadata,
+                    )
 
                 except Exception as e:
                     tool_result = str(e)
 
+                return tool_function_params, tool_result
+
+            async def tool_call_handler(tool_call, tool_call_result):
+                nonlocal skip_files
+
+                log.debug(f"{tool_call=}")
+
+                tool_function_name = tool_call.get("name", None)
+                if tool_call_result is None:
+                    return body, {}
+
+                tool_function_params, tool_result = tool_call_result
+
+                tool = tools[tool_function_name]
+                tool_type = tool.get("type", "")
+                direct_tool = tool.get("direct", False)
+
                 tool_result, tool_result_files, tool_result_embeds = (
                     process_tool_result(
                         request,
@@ -495,11 +493,21 @@ async def chat_completion_tools_handler(
                         skip_files = True
 
             # check if "tool_calls" in result
-            if result.get("tool_calls"):
-                for tool_call in result.get("tool_calls"):
-                    await tool_call_handler(tool_call)
-            else:
-                await tool_call_handler(result)
+            tool_calls = result.get("tool_calls") or [result]
+
+            # Independent tool calls are executed concurrently, their results
+            # are added to the messages in the order of the calls
+            tool_call_results = await execute_tool_calls(
+                [
+                    (
+                        tools.get(tool_call.get("name")),
+                        partial(execute_tool_call, tool_call),
+                    )
+                    for tool_call in tool_calls
+                ]
+            )
+            for tool_call, tool_call_result in zip(tool_calls, tool_call_results):
+                await tool_call_handler(tool_call, tool_call_result)
 
         except Exception as e:
             log.debug(f"Error: {e}")
@@ -877,38 +885,39 @@ async def chat_completion_files_handler(
         if len(queries) == 0:
             queries = [get_last_user_message(body["messages"])]
 
+        model = body.get("metadata", {}).get("model") or {}
+        model_params = (model.get("info") or {}).get("params") or {}
+
         try:
-            # Offload get_sources_from_items to a separate thread
-            loop = asyncio.get_running_loop()
-            with ThreadPoolExecutor() as executor:
-                sources = await loop.run_in_executor(
-                    executor,
-                    lambda: get_sources_from_items(
-                        request=request,
-                        items=files,
-                        queries=queries,
-                        embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
-                            query, prefix=prefix, user=user
-                        ),
-                        k=request.app.state.config.TOP_K,
-                        reranking_function=(
-                            (
-                                lambda sentences: request.app.state.RERANKING_FUNCTION(
-                                    sentences, user=user
-                                )
-                            )
-                            if request.app.state.RERANKING_FUNCTION
-                            else None
-                        ),
-                        k_reranker=request.app.state.config.TOP_K_RERANKER,
-                        r=request.app.state.config.RELEVANCE_THRESHOLD,
-                        hybrid_bm25_weight=request.app.state.config.HYBRID_BM25_WEIGHT,
-                        hybrid_search=request.app.state.config.ENABLE_RAG_HYBRID_SEARCH,
-                        full_context=all_full_context
-                        or request.app.state.config.RAG_FULL_CONTEXT,
-                        user=user,
-                    ),
-                )
+            sources = await get_sources_from_items(
+                request=request,
+                items=files,
+                queries=queries,
+                embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
+                    query, prefix=prefix, user=user
+                ),
+                k=request.app.state.config.TOP_K,
+                reranking_function=(
+                    (
+                        lambda sentences: request.app.state.RERANKING_FUNCTION(
+                            sentences, user=user
+                        )
+                    )
+                    if request.app.state.RERANKING_FUNCTION
+                    else None
+                ),
+                k_reranker=request.app.state.config.TOP_K_RERANKER,
+                r=request.app.state.config.RELEVANCE_THRESHOLD,
+                hybrid_bm25_weight=request.app.state.config.HYBRID_BM25_WEIGHT,
+                hybrid_search=request.app.state.config.ENABLE_RAG_HYBRID_SEARCH,
+                full_context=all_full_context
+                or request.app.state.config.RAG_FULL_CONTEXT,
+                user=user,
+                token_budget=(
+                    model_params.get("full_context_token_budget")
+                    or RAG_FULL_CONTEXT_TOKEN_BUDGET
+                ),
+            )
         except Exception as e:
             log.exception(e)
 
@@ -957,6 +966,7 @@ def apply_params_to_form_data(form_data, model):
         "function_calling": str,
         "reasoning_tags": list,
         "system": str,
+        "full_context_token_budget": int,
     }
 
     for key in list(params.keys()):
@@ -1128,12 +1138,9 @@ async def process_chat_payload(request, form_data, user, metadata, model):
         raise e
 
     try:
-        filter_functions = [
-            Functions.get_function_by_id(filter_id)
-            for filter_id in get_sorted_filter_ids(
-                request, model, metadata.get("filter_ids", [])
-            )
-        ]
+        filter_functions = get_sorted_filter_functions(
+            request, model, metadata.get("filter_ids", [])
+        )
 
         form_data, flags = await process_filter_functions(
             request=request,
@@ -1216,7 +1223,7 @@ async def process_chat_payload(request, form_data, user, metadata, model):
 
     tools_dict = {}
 
-    mcp_clients = {}
+    mcp_sessions = {}
     mcp_tools_dict = {}
 
     if tool_ids:
@@ -1277,13 +1284,14 @@ async def process_chat_payload(request, form_data, user, metadata, model):
                             log.error(f"Error getting OAuth token: {e}")
                             oauth_token = None
 
-                    mcp_clients[server_id] = MCPClient()
-                    await mcp_clients[server_id].connect(
+                    # Sessions are shared with other chats using the server with
+                    # the same credentials, and released when the chat is done
+                    mcp_sessions[server_id] = await MCP_SESSION_POOL.acquire(
                         url=mcp_server_connection.get("url", ""),
                         headers=headers if headers else None,
                     )
 
-                    tool_specs = await mcp_clients[server_id].list_tool_specs()
+                    tool_specs = await mcp_sessions[server_id].list_tool_specs()
                     for tool_spec in tool_specs:
 
                         def make_tool_function(client, function_name):
@@ -1296,7 +1304,7 @@ async def process_chat_payload(request, form_data, user, metadata, model):
                             return tool_function
 
                         tool_function = make_tool_function(
-                            mcp_clients[server_id], tool_spec["name"]
+                            mcp_sessions[server_id].client, tool_spec["name"]
                         )
 
                         mcp_tools_dict[f"{server_id}_{tool_spec['name']}"] = {
@@ -1306,7 +1314,7 @@ async def process_chat_payload(request, form_data, user, metadata, model):
                             },
                             "callable": tool_function,
                             "type": "mcp",
-                            "client": mcp_clients[server_id],
+                            "client": mcp_sessions[server_id].client,
                             "direct": False,
                         }
                 except Exception as e:
@@ -1338,8 +1346,8 @@ async def process_chat_payload(request, form_data, user, metadata, model):
                     "server": tool_server,
                 }
 
-    if mcp_clients:
-        metadata["mcp_clients"] = mcp_clients
+    if mcp_sessions:
+        metadata["mcp_sessions"] = mcp_sessions
 
     if tools_dict:
         if metadata.get("params", {}).get("function_calling") == "native":
@@ -1852,12 +1860,9 @@ async def process_chat_response(
         "__request__": request,
         "__model__": model,
     }
-    filter_functions = [
-        Functions.get_function_by_id(filter_id)
-        for filter_id in get_sorted_filter_ids(
-            request, model, metadata.get("filter_ids", [])
-        )
-    ]
+    filter_functions = get_sorted_filter_functions(
+        request, model, metadata.get("filter_ids", [])
+    )
 
     # Streaming response
     if event_emitter and event_caller:
@@ -2668,10 +2673,7 @@ async def process_chat_response(
 
                     tools = metadata.get("tools", {})
 
-                    results = []
-
-                    for tool_call in response_tool_calls:
-
+                    async def execute_tool_call(tool_call):
                         print("tool_call", tool_call)
                         tool_call_id = tool_call.get("id", "")
                         tool_function_name = tool_call.get("function", {}).get(
@@ -2730,27 +2732,13 @@ async def process_chat_response(
                                     if k in allowed_params
                                 }
 
-                                if direct_tool:
-                                    tool_result = await event_caller(
-                                        {
-                                            "type": "execute:tool",
-                                            "data": {
-                                                "id": str(uuid4()),
-                                                "name": tool_function_name,
-                                                "params": tool_function_params,
-                                                "server": tool.get("server", {}),
-                                                "session_id": metadata.get(
-                                                    "session_id", None
-                                                ),
-                                            },
-                                        }
-                                    )
-
-                                else:
-                                    tool_function = tool["callable"]
-                                    tool_result = await tool_function(
-                                        **tool_function_params
-                                    )
+                                tool_result = await call_tool(
+                                    tool,
+                                    tool_function_name,
+                                    tool_function_params,
+                                    event_caller,
+                                    metadata,
+                                )
 
                             except Exception as e:
                                 tool_result = str(e)
@@ -2767,22 +2755,34 @@ async def process_chat_response(
                             )
                         )
 
-                        results.append(
-                            {
-                                "tool_call_id": tool_call_id,
-                                "content": tool_result or "",
-                                **(
-                                    {"files": tool_result_files}
-                                    if tool_result_files
-                                    else {}
-                                ),
-                                **(
-                                    {"embeds": tool_result_embeds}
-                                    if tool_result_embeds
-                                    else {}
+                        return {
+                            "tool_call_id": tool_call_id,
+                            "content": tool_result or "",
+                            **(
+                                {"files": tool_result_files}
+                                if tool_result_files
+                                else {}
+                            ),
+                            **(
+                                {"embeds": tool_result_embeds}
+                                if tool_result_embeds
+                                else {}
+                            ),
+                        }
+
+                    # Independent tool calls are executed concurrently, their
+                    # results are kept in the order of the calls
+                    results = await execute_tool_calls(
+                        [
+                            (
+                                tools.get(
+                                    tool_call.get("function", {}).get("name", "")
                                 ),
-                            }
-                        )
+                                partial(execute_tool_call, tool_call),
+                            )
+                            for tool_call in response_tool_calls
+                        ]
+                    )
 
                     content_blocks[-1]["results"] = results
                     content_blocks.append(
@@ -2911,6 +2911,8 @@ async def process_chat_response(
                                             else None
                                         ),
                                         request.app.state.config.CODE_INTERPRETER_JUPYTER_TIMEOUT,
+                                        # Code blocks of a chat share a kernel
+                                        session_id=metadata.get("chat_id"),
                                     )
                                 else:
                                     output = {
@@ -5,6 +5,7 @@ import sys
 from importlib import util
 import types
 import tempfile
+import time
 import logging
 
 from open_webui.env import SRC_LOG_LEVELS, PIP_OPTIONS, PIP_PACKAGE_INDEX_OPTIONS
@@ -166,9 +167,45 @@ def load_function_module_by_id(function_id: str, content: str | None = None):
         os.unlink(temp_file.name)
 
 
+def is_cached_module_current(versions: dict, id: str, updated_at) -> bool:
+    """
+    Whether the module cached for `id` was loaded from the content the plugin
+    had at `updated_at`.
+
+    `versions` holds the `updated_at` the cached module was checked against,
+    and when that check started. `updated_at` has a resolution of seconds, so
+    a module checked in the same second as its last update could predate
+    another update in that second, and is checked against the content again.
+    """
+    version = versions.get(id)
+    return (
+        updated_at is not None
+        and version is not None
+        and version[0] == updated_at
+        and updated_at < version[1]
+    )
+
+
 def get_tool_module_from_cache(request, tool_id, load_from_db=True):
+    if not hasattr(request.app.state, "TOOL_VERSIONS"):
+        request.app.state.TOOL_VERSIONS = {}
+
     if load_from_db:
-        # Always load from the database by default
+        # Reuse the cached module while the tool is unchanged, without
+        # loading its content
+        if (
+            hasattr(request.app.state, "TOOLS")
+            and tool_id in request.app.state.TOOLS
+            and is_cached_module_current(
+                request.app.state.TOOL_VERSIONS,
+                tool_id,
+                Tools.get_tool_updated_at_by_id(tool_id),
+            )
+        ):
+            return request.app.state.TOOLS[tool_id], None
+
+        # Otherwise load from the database, and compare the content
+        checked_at = int(time.time())
         tool = Tools.get_tool_by_id(tool_id)
         if not tool:
             raise Exception(f"Tool not found: {tool_id}")
@@ -187,9 +224,14 @@ def get_tool_module_from_cache(request, tool_id, load_from_db=True):
             hasattr(request.app.state, "TOOLS") and tool_id in request.app.state.TOOLS
         ):
             if request.app.state.TOOL_CONTENTS[tool_id] == content:
+                request.app.state.TOOL_VERSIONS[tool_id] = (
+                    tool.updated_at,
+                    checked_at,
+                )
                 return request.app.state.TOOLS[tool_id], None
 
         tool_module, frontmatter = load_tool_module_by_id(tool_id, content)
+        request.app.state.TOOL_VERSIONS[tool_id] = (tool.updated_at, checked_at)
     else:
         if hasattr(request.app.state, "TOOLS") and tool_id in request.app.state.TOOLS:
             return request.app.state.TOOLS[tool_id], None
@@ -209,11 +251,29 @@ def get_tool_module_from_cache(request, tool_id, load_from_db=True):
 
 
 def get_function_module_from_cache(request, function_id, load_from_db=True):
+    if not hasattr(request.app.state, "FUNCTION_VERSIONS"):
+        request.app.state.FUNCTION_VERSIONS = {}
+
     if load_from_db:
-        # Always load from the database by default
+        # Check the database by default
         # This is useful for hooks like "inlet" or "outlet" where the content might change
         # and we want to ensure the latest content is used.
 
+        # Reuse the cached module while the function is unchanged, without
+        # loading its content
+        if (
+            hasattr(request.app.state, "FUNCTIONS")
+            and function_id in request.app.state.FUNCTIONS
+            and is_cached_module_current(
+                request.app.state.FUNCTION_VERSIONS,
+                function_id,
+                Functions.get_function_updated_at_by_id(function_id),
+            )
+        ):
+            return request.app.state.FUNCTIONS[function_id], None, None
+
+        # Otherwise load from the database, and compare the content
+        checked_at = int(time.time())
         function = Functions.get_function_by_id(function_id)
         if not function:
             raise Exception(f"Function not found: {function_id}")
@@ -233,11 +293,19 @@ def get_function_module_from_cache(request, function_id, load_from_db=True):
             and function_id in request.app.state.FUNCTIONS
         ):
             if request.app.state.FUNCTION_CONTENTS[function_id] == content:
+                request.app.state.FUNCTION_VERSIONS[function_id] = (
+                    function.updated_at,
+                    checked_at,
+                )
                 return request.app.state.FUNCTIONS[function_id], None, None
 
         function_module, function_type, frontmatter = load_function_module_by_id(
             function_id, content
         )
+        request.app.state.FUNCTION_VERSIONS[function_id] = (
+            function.updated_at,
+            checked_at,
+        )
     else:
         # Load from cache (e.g. "stream" hook)
         # This is useful for performance reasons
@@ -6,6 +6,8 @@ import aiohttp
 import asyncio
 import yaml
 import json
+import time
+from uuid import uuid4
 
 from pydantic import BaseModel
 from pydantic.fields import FieldInfo
@@ -23,10 +25,12 @@ from typing import (
     Optional,
     Type,
 )
+from contextlib import nullcontext
 from functools import update_wrapper, partial
 
 
 from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field, create_model
 
 from langchain_core.utils.function_calling import (
@@ -36,12 +40,17 @@ from langchain_core.utils.function_calling import (
 
 from open_webui.models.tools import Tools
 from open_webui.models.users import UserModel
-from open_webui.utils.plugin import load_tool_module_by_id
+from open_webui.utils.plugin import (
+    get_tool_module_from_cache,
+    is_cached_module_current,
+)
 from open_webui.env import (
     SRC_LOG_LEVELS,
     AIOHTTP_CLIENT_TIMEOUT,
     AIOHTTP_CLIENT_TIMEOUT_TOOL_SERVER_DATA,
     AIOHTTP_CLIENT_SESSION_TOOL_SERVER_SSL,
+    CHAT_RESPONSE_MAX_CONCURRENT_TOOL_CALLS,
+    CHAT_RESPONSE_TOOL_CALL_TIMEOUT,
 )
 
 import copy
@@ -51,9 +60,11 @@ log.setLevel(SRC_LOG_LEVELS["MODELS"])
 
 
 def get_async_tool_function_and_apply_extra_params(
-    function: Callable, extra_params: dict
+    function: Callable,
+    extra_params: dict,
+    sig: Optional[inspect.Signature] = None,
 ) -> Callable[..., Awaitable]:
-    sig = inspect.signature(function)
+    sig = sig or inspect.signature(function)
     extra_params = {k: v for k, v in extra_params.items() if k in sig.parameters}
     partial_func = partial(function, **extra_params)
 
@@ -78,9 +89,11 @@ def get_async_tool_function_and_apply_extra_params(
             return await partial_func(*args, **kwargs)
 
     else:
-        # Make it a coroutine function when it is not already
+        # Make it a coroutine function when it is not already, running it in
+        # the thread pool so it doesn't block the event loop (and concurrent
+        # tool calls or their timeouts)
         async def new_function(*args, **kwargs):
-            return partial_func(*args, **kwargs)
+            return await run_in_threadpool(partial_func, *args, **kwargs)
 
     update_wrapper(new_function, function)
     new_function.__signature__ = new_sig
@@ -88,13 +101,106 @@ def get_async_tool_function_and_apply_extra_params(
     return new_function
 
 
+def get_cached_tool(request: Request, tool_id: str) -> Optional[dict]:
+    """
+    Return the module of a tool with its valves, and its functions with their
+    specs and signatures, or None if there is no such tool.
+
+    They are cached until the tool, its specs or valves are updated, so that
+    chats don't read the tool's content and specs from the database and
+    prepare them every time.
+    """
+    if not hasattr(request.app.state, "TOOL_SPECS"):
+        request.app.state.TOOL_SPECS = {}
+    if not hasattr(request.app.state, "TOOL_SPEC_VERSIONS"):
+        request.app.state.TOOL_SPEC_VERSIONS = {}
+
+    updated_at = Tools.get_tool_updated_at_by_id(tool_id)
+    if updated_at is None:
+        return None
+
+    if tool_id in request.app.state.TOOL_SPECS and is_cached_module_current(
+        request.app.state.TOOL_SPEC_VERSIONS, tool_id, updated_at
+    ):
+        return request.app.state.TOOL_SPECS[tool_id]
+
+    checked_at = int(time.time())
+    tool = Tools.get_tool_by_id(tool_id)
+    if tool is None:
+        return None
+    module, _ = get_tool_module_from_cache(request, tool_id)
+
+    valves = None
+    if hasattr(module, "valves") and hasattr(module, "Valves"):
+        # Validated once, but each request builds its own Valves from them
+        valves = module.Valves(
+            **(Tools.get_tool_valves_by_id(tool_id) or {})
+        ).model_dump()
+
+    functions = []
+    for spec in copy.deepcopy(tool.specs):
+        # TODO: Fix hack for OpenAI API
+        # Some times breaks OpenAI but others don't. Leaving the comment
+        for val in spec.get("parameters", {}).get("properties", {}).values():
+            if val.get("type") == "str":
+                val["type"] = "string"
+
+        # Remove internal reserved parameters (e.g. __id__, __user__)
+        spec["parameters"]["properties"] = {
+            key: val
+            for key, val in spec["parameters"]["properties"].items()
+            if not key.startswith("__")
+        }
+
+        function_name = spec["name"]
+        function = getattr(module, function_name)
+
+        # TODO: Support Pydantic models as parameters
+        if function.__doc__ and function.__doc__.strip() != "":
+            s = re.split(":(param|return)", function.__doc__, 1)
+            spec["description"] = s[0]
+        else:
+            spec["description"] = function_name
+
+        functions.append((function_name, spec, function, inspect.signature(function)))
+
+    request.app.state.TOOL_SPECS[tool_id] = {
+        "module": module,
+        "valves": valves,
+        "functions": functions,
+    }
+    request.app.state.TOOL_SPEC_VERSIONS[tool_id] = (tool.updated_at, checked_at)
+    return request.app.state.TOOL_SPECS[tool_id]
+
+
+def apply_user_valves(
+    function: Callable[..., Awaitable], module, tool_id: str, user: dict
+) -> Callable[..., Awaitable]:
+    """
+    Wrap a tool function to set the user's valves of the tool in `user` (the
+    `__user__` it is called with) when it is called.
+    """
+
+    async def new_function(*args, **kwargs):
+        try:
+            user["valves"] = module.UserValves(
+                **Tools.get_user_valves_by_id_and_user_id(tool_id, user["id"])
+            )
+        except Exception as e:
+            log.exception(f"Failed to get user valves of {tool_id}: {e}")
+        return await function(*args, **kwargs)
+
+    update_wrapper(new_function, function)
+    return new_function
+
+
 async def get_tools(
     request: Request, tool_ids: list[str], user: UserModel, extra_params: dict
 ) -> dict[str, dict]:
     tools_dict = {}
 
     for tool_id in tool_ids:
-        tool = Tools.get_tool_by_id(tool_id)
+        tool = get_cached_tool(request, tool_id)
         if tool is None:
 
             if tool_id.startswith("server:"):
@@ -210,59 +316,37 @@ async def get_tools(
             else:
                 continue
         else:
-            module = request.app.state.TOOLS.get(tool_id, None)
-            if module is None:
-                module, _ = load_tool_module_by_id(tool_id)
-                request.app.state.TOOLS[tool_id] = module
-
-            extra_params["__id__"] = tool_id
+            module = tool["module"]
+            tool_extra_params = {**extra_params, "__id__": tool_id}
 
             # Set valves for the tool
-            if hasattr(module, "valves") and hasattr(module, "Valves"):
-                valves = Tools.get_tool_valves_by_id(tool_id) or {}
-                module.valves = module.Valves(**valves)
+            if tool["valves"] is not None:
+                module.valves = module.Valves(**tool["valves"])
             if hasattr(module, "UserValves"):
-                extra_params["__user__"]["valves"] = module.UserValves(  # type: ignore
-                    **Tools.get_user_valves_by_id_and_user_id(tool_id, user.id)
-                )
-
-            for spec in tool.specs:
-                # TODO: Fix hack for OpenAI API
-                # Some times breaks OpenAI but others don't. Leaving the comment
-                for val in spec.get("parameters", {}).get("properties", {}).values():
-                    if val.get("type") == "str":
-                        val["type"] = "string"
-
-                # Remove internal reserved parameters (e.g. __id__, __user__)
-                spec["parameters"]["properties"] = {
-                    key: val
-                    for key, val in spec["parameters"]["properties"].items()
-                    if not key.startswith("__")
-                }
+                # Each tool gets its own user valves, read when it is called
+                tool_extra_params["__user__"] = {**extra_params["__user__"]}
 
+            for function_name, spec, function, signature in tool["functions"]:
                 # convert to function that takes only model params and inserts custom params
-                function_name = spec["name"]
-                tool_function = getattr(module, function_name)
                 callable = get_async_tool_function_and_apply_extra_params(
-                    tool_function, extra_params
+                    function, tool_extra_params, signature
                 )
-
-                # TODO: Support Pydantic models as parameters
-                if callable.__doc__ and callable.__doc__.strip() != "":
-                    s = re.split(":(param|return)", callable.__doc__, 1)
-                    spec["description"] = s[0]
-                else:
-                    spec["description"] = function_name
+                if hasattr(module, "UserValves"):
+                    callable = apply_user_valves(
+                        callable, module, tool_id, tool_extra_params["__user__"]
+                    )
 
                 tool_dict = {
                     "tool_id": tool_id,
                     "callable": callable,
-                    "spec": spec,
+                    "spec": copy.deepcopy(spec),
                     # Misc info
                     "metadata": {
                         "file_handler": hasattr(module, "file_handler")
                         and module.file_handler,
                         "citation": hasattr(module, "citation") and module.citation,
+                        "concurrent": getattr(module, "concurrent", True),
+                        "timeout": getattr(module, "timeout", None),
                     },
                 }
 
@@ -279,6 +363,67 @@ async def get_tools(
     return tools_dict
 
 
+async def call_tool(
+    tool: dict,
+    name: str,
+    params: dict,
+    event_caller: Optional[Callable] = None,
+    metadata: Optional[dict] = None,
+) -> Any:
+    """
+    Call a tool, or have the client call it for direct tools, failing after
+    the tool's `timeout` (or CHAT_RESPONSE_TOOL_CALL_TIMEOUT) seconds.
+    """
+    if tool.get("direct", False):
+        call = event_caller(
+            {
+                "type": "execute:tool",
+                "data": {
+                    "id": str(uuid4()),
+                    "name": name,
+                    "params": params,
+                    "server": tool.get("server", {}),
+                    "session_id": (metadata or {}).get("session_id", None),
+                },
+            }
+        )
+    else:
+        call = tool["callable"](**params)
+
+    timeout = tool.get("metadata", {}).get("timeout") or CHAT_RESPONSE_TOOL_CALL_TIMEOUT
+    try:
+        return await asyncio.wait_for(call, timeout)
+    except asyncio.TimeoutError:
+        raise Exception(f"Tool {name} timed out after {timeout} seconds")
+
+
+async def execute_tool_calls(
+    calls: list[tuple[Optional[dict], Callable[[], Awaitable]]],
+    max_concurrency: int = CHAT_RESPONSE_MAX_CONCURRENT_TOOL_CALLS,
+) -> list:
+    """
+    Run the tool calls of a response concurrently, `max_concurrency` at a
+    time, and return their results in the order of the calls.
+
+    `calls` pairs the tool being called (None if unknown) with a function
+    running the call. Tools that set `concurrent = False` have their calls
+    run one at a time.
+    """
+    semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+    locks = {}
+
+    async def run(tool, call):
+        lock = nullcontext()
+        if tool and not tool.get("metadata", {}).get("concurrent", True):
+            lock = locks.setdefault(tool.get("tool_id", ""), asyncio.Lock())
+
+        async with lock:
+            async with semaphore:
+                return await call()
+
+    return await asyncio.gather(*[run(tool, call) for tool, call in calls])
+
+
 def parse_description(docstring: str | None) -> str:
     """
     Parse a function's docstring to extract the description.
@@ -1,7 +1,12 @@
 import { WEBUI_API_BASE_URL } from '$lib/constants';
 import { splitStream } from '$lib/utils';
 
-export const uploadFile = async (token: string, file: File, metadata?: object | null) => {
+export const uploadFile = async (
+	token: string,
+	file: File,
+	metadata?: object | null,
+	priority: 'high' | 'low' = 'high'
+) => {
 	const data = new FormData();
 	data.append('file', file);
 	if (metadata) {
@@ -10,7 +15,7 @@ export const uploadFile = async (token: string, file: File, metadata?: object |
 
 	let error = null;
 
-	const res = await fetch(`${WEBUI_API_BASE_URL}/files/`, {
+	const res = await fetch(`${WEBUI_API_BASE_URL}/files/?priority=${priority}`, {
 		method: 'POST',
 		headers: {
 			Accept: 'application/json',